@@ -0,0 +1,219 @@
+"""
+Generate the AhoCorasick word files of the parser classes from the
+literals that every match of their regexes must contain, so that the
+words stay in step with the regexes after every regex update.
+"""
+
+from collections.abc import Callable, Iterable
+from glob import glob
+from pathlib import Path
+from typing import NamedTuple
+from urllib.parse import unquote
+
+import ahocorasick_rs
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+from .device_detector import DeviceDetector, ParserClass
+from .lazy_regex import RegexLazyIgnore
+from .regex_literals import required_literals, word_literals
+from .settings import BOUNDED_REGEX, ROOT, DDCache
+
+
+class FixtureWords(NamedTuple):
+    """
+    words: AhoCorasick words derived from the regexes of the fixture file
+    unindexed: regexes without usable literals, that need manually defined words
+    scrubbed: regexes whose literals are all ScrubWords of the parser class
+    """
+
+    parser: str
+    fixture: str
+    words: frozenset[str]
+    unindexed: tuple[str, ...]
+    scrubbed: tuple[str, ...]
+
+
+class GateMiss(NamedTuple):
+    """
+    Fixture UA that a regex of the parser matches, but that
+    the AhoCorasick words of the parser filter out.
+
+    scrubbed: the regex is deliberately left to manually defined Words,
+        as its literals are all ScrubWords or too short to be words
+    """
+
+    parser: str
+    position: int
+    regex: str
+    user_agent: str
+    scrubbed: bool
+
+
+def ahocorasick_parsers() -> tuple[ParserClass, ...]:
+    """
+    Parser classes that check their regexes with AhoCorasick words.
+    """
+    return tuple(
+        Parser for Parser in DeviceDetector('').prefilter_parsers() if Parser.fixture_files
+    )
+
+
+def minimal_words(words: Iterable[str]) -> frozenset[str]:
+    """
+    Drop the words containing another word, as any
+    UA containing them also contains the shorter word.
+    """
+    words = frozenset(words)
+    if not words:
+        return words
+
+    automaton = ahocorasick_rs.AhoCorasick(list(words))
+    return frozenset(
+        word
+        for word in words
+        if all(found == word for found in automaton.find_matches_as_strings(word, overlapping=True))
+    )
+
+
+def derive_fixture_words(Parser: ParserClass, fixture: str) -> FixtureWords:
+    """
+    Derive the AhoCorasick words of one fixture file of the parser.
+
+    Literals listed as ScrubWords of the parser class are left out,
+    so the regexes requiring them only match UAs containing one of the
+    manually defined Words. Regexes requiring a literal shorter than
+    MIN_WORD_LENGTH are unindexed, as their words would let nearly
+    every UA through to all regexes of the parser.
+    """
+    parser = Parser('', None)
+    manual = parser.load_manually_defined_words()
+    scrub_words = {word.lower() for word in manual.get('ScrubWords') or ()}
+    words: set[str] = set()
+    unindexed = []
+    scrubbed = []
+
+    for ua_data in parser.yaml_to_list(f'regexes/{fixture}'):
+        if 'regex' not in ua_data:
+            continue
+        pattern = RegexLazyIgnore(BOUNDED_REGEX.format(ua_data['regex'])).pattern
+        if not (literals := word_literals(pattern)):
+            unindexed.append(ua_data['regex'])
+        elif literals := literals - scrub_words:
+            words.update(literals)
+        else:
+            scrubbed.append(ua_data['regex'])
+
+    return FixtureWords(
+        Parser.__name__,
+        fixture,
+        minimal_words(words),
+        tuple(unindexed),
+        tuple(scrubbed),
+    )
+
+
+def build_ahocorasick_words(
+    message_callback: Callable[[str], None] = print,
+) -> list[FixtureWords]:
+    """
+    Write the derived words of every fixture file to regexes/ahocorasick,
+    and report the regexes that manually defined words must cover.
+    """
+    all_fixture_words = []
+
+    for Parser in ahocorasick_parsers():
+        for fixture in Parser.fixture_files:
+            fixture_words = derive_fixture_words(Parser, fixture)
+            all_fixture_words.append(fixture_words)
+
+            path = Path(ROOT) / 'regexes' / 'ahocorasick' / fixture
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as yf:
+                yaml.safe_dump(set(fixture_words.words), yf, allow_unicode=True, width=1000)
+
+            message_callback(f'{fixture}: {len(fixture_words.words)} words')
+            for regex in fixture_words.unindexed:
+                message_callback(
+                    f'{fixture}: no literals in regex, words in '
+                    f'classes/{Parser.__name__}.yml must cover it: {regex}'
+                )
+            for regex in fixture_words.scrubbed:
+                message_callback(f'{fixture}: only ScrubWords in regex: {regex}')
+
+    # reload the words on next use
+    for cache_name in ('corasick', 'prefilter'):
+        DDCache[cache_name].clear()
+
+    return all_fixture_words
+
+
+def fixture_user_agents(pattern: str = 'tests/**/fixtures/**/*.yml') -> list[str]:
+    """
+    User agents of the test fixture files.
+    """
+    user_agents: dict[str, None] = {}
+    for fixture_file in sorted(glob(f'{ROOT}/{pattern}', recursive=True)):
+        with open(fixture_file, 'r', encoding='utf-8') as yf:
+            fixtures = yaml.load(yf, SafeLoader)
+        if not isinstance(fixtures, list):
+            continue
+        for fixture in fixtures:
+            if isinstance(fixture, dict) and 'user_agent' in fixture:
+                user_agents[unquote(str(fixture['user_agent']))] = None
+
+    return list(user_agents)
+
+
+def check_ahocorasick_words(
+    user_agents: Iterable[str],
+    parsers: Iterable[ParserClass] | None = None,
+) -> list[GateMiss]:
+    """
+    Find UAs where one of the regexes matches, but the AhoCorasick
+    words keep the parser from checking its regexes at all.
+
+    Regexes are searched one by one, independent of the literal analysis.
+    """
+    parsers = ahocorasick_parsers() if parsers is None else tuple(parsers)
+    scrub_words = {
+        Parser.__name__: {
+            word.lower()
+            for word in Parser('', None).load_manually_defined_words().get('ScrubWords') or ()
+        }
+        for Parser in parsers
+    }
+    misses = []
+
+    for user_agent in user_agents:
+        for Parser in parsers:
+            parser = Parser(user_agent, None)
+            if parser.check_all_regexes():
+                continue
+            for position, ua_data in enumerate(parser.regex_list):
+                if 'regex' not in ua_data or not ua_data['regex'].search(parser.user_agent):
+                    continue
+                pattern = ua_data['regex'].pattern
+                literals = required_literals(pattern)
+                words = word_literals(pattern) or frozenset()
+                scrubbed = bool(literals) and words <= scrub_words[Parser.__name__]
+                misses.append(GateMiss(Parser.__name__, position, pattern, user_agent, scrubbed))
+                break
+
+    return misses
+
+
+__all__ = (
+    'FixtureWords',
+    'GateMiss',
+    'ahocorasick_parsers',
+    'build_ahocorasick_words',
+    'check_ahocorasick_words',
+    'derive_fixture_words',
+    'fixture_user_agents',
+    'minimal_words',
+)
@@ -0,0 +1,121 @@
+"""
+Index of the bot regexes, to tell most UAs apart from bots without
+searching any regex.
+
+Many bot regexes are long alternations of bot names, like the Generic Bot
+entries at the end of bots.yml. The literals required by the whole
+alternation include those of alternatives anchored to the whole UA, such
+as ^(?:chrome|firefox|...)$, so the literal index of the whole regexes
+selects these generic entries for almost every browser UA. BotIndex
+indexes every alternative of the regexes by itself instead, so anchored
+alternatives only select their entries for UAs with their affixes, and
+a UA without the literals of any alternative can't be a bot.
+
+UAs that are one of the strings an anchored alternative matches are
+looked up in a dict of these exact bot UAs, with the first regex that
+matches each of them.
+"""
+
+from collections.abc import Iterable
+from typing import Any
+
+from .regex_literals import LiteralIndex, anchored_exact, top_level_alternatives
+from .settings import BOUNDED_REGEX
+
+BOUNDED_PREFIX, BOUNDED_SUFFIX = BOUNDED_REGEX.split('{}')
+
+
+def unbounded_pattern(pattern: str) -> str | None:
+    """
+    Fixture pattern of a BOUNDED_REGEX, or None for other patterns.
+    """
+    if pattern.startswith(BOUNDED_PREFIX) and pattern.endswith(BOUNDED_SUFFIX):
+        return pattern[len(BOUNDED_PREFIX) : -len(BOUNDED_SUFFIX)]
+    return None
+
+
+class BotIndex(LiteralIndex):
+    """
+    Literal index of the alternatives of the bot regexes, returning the
+    positions of the regexes with candidate alternatives, in order.
+    """
+
+    __slots__ = ('exact_positions', 'exact_strings', 'owners', 'regexes')
+
+    def __init__(self, regexes: list[Any]) -> None:
+        patterns: list[str | None] = []
+        owners = []
+        exact_strings: set[str] = set()
+
+        for position, regex in enumerate(regexes):
+            if regex is None or (pattern := unbounded_pattern(regex.pattern)) is None:
+                patterns.append(regex.pattern if regex is not None else None)
+                owners.append(position)
+                continue
+
+            for alternative in top_level_alternatives(pattern):
+                patterns.append(BOUNDED_REGEX.format(alternative))
+                owners.append(position)
+                exact_strings.update(anchored_exact(alternative) or ())
+
+        super().__init__(patterns)
+        self.size = len(regexes)
+        self.regexes = regexes
+        self.owners = tuple(owners)
+        self.exact_strings = frozenset(exact_strings)
+        self.exact_positions: dict[str, int | None] = {}
+
+    def candidates(
+        self,
+        user_agent_lower: str,
+        found_literals: Iterable[str] | None = None,
+    ) -> Iterable[int]:
+        """
+        Positions of the regexes with an alternative that could match the UA.
+        """
+        if not user_agent_lower.isascii():
+            return range(self.size)
+
+        owners = self.owners
+        return sorted({
+            owners[position] for position in super().candidates(user_agent_lower, found_literals)
+        })
+
+    def exact_match(self, user_agent: str) -> tuple[int, Any] | None:
+        """
+        Position and match of the first regex matching a UA that is one of
+        the exact bot UAs, or None for other UAs, which Bot then searches
+        as usual.
+
+        Regexes match ASCII strings regardless of case, so the first regex
+        matching the lowercased UA is looked up once and kept. A regex
+        that only matches the lowercased UA, as it doesn't ignore case,
+        leaves the UA to the usual search.
+        """
+        if not user_agent.isascii():
+            return None
+
+        user_agent_lower = user_agent.lower()
+        if user_agent_lower not in self.exact_strings:
+            return None
+
+        if (position := self.exact_positions.get(user_agent_lower, -1)) == -1:
+            position = next(
+                (
+                    candidate
+                    for candidate in self.candidates(user_agent_lower)
+                    if self.regexes[candidate].search(user_agent_lower)
+                ),
+                None,
+            )
+            self.exact_positions[user_agent_lower] = position
+
+        if position is None or (matched := self.regexes[position].search(user_agent)) is None:
+            return None
+        return position, matched
+
+
+__all__ = (
+    'BotIndex',
+    'unbounded_pattern',
+)
@@ -5,8 +5,18 @@ import warnings
 from pathlib import Path
 from . import DeviceDetector
 from dataclasses import dataclass, asdict
-from typing import Optional, Dict, Any, Union
+from typing import Annotated, Optional, Dict, Any, Union
 from .update_regex import Regexes, UpdateMethod
+from .ahocorasick_words import (
+    ahocorasick_parsers,
+    build_ahocorasick_words,
+    check_ahocorasick_words,
+    fixture_user_agents,
+)
+from .regex_benchmark import benchmark_fixture_files
+from .regex_conflicts import build_regex_orders, save_regex_orders
+from .regex_profile import load_regex_profiles
+from .settings import DDCache
 
 ROOT_PATH = Path(__file__).parent.resolve()
 
@@ -79,6 +89,59 @@ def rollback_regexes():
     Regexes(message_callback=print).rollback_regexes()
 
 
+@app.command(name="build_ahocorasick", help="Generate AhoCorasick words from regex literals")
+def build_ahocorasick(
+    check: bool = typer.Option(
+        False,
+        "--check",
+        help="Check that the words filter out no regex match of the test fixtures",
+    ),
+):
+    build_ahocorasick_words(message_callback=message_callback)
+    if not check:
+        return
+
+    misses = check_ahocorasick_words(fixture_user_agents())
+    for miss in misses:
+        reason = "ScrubWords" if miss.scrubbed else "MISSED"
+        message_callback(f"{reason} {miss.parser} {miss.regex}: {miss.user_agent}")
+
+    if any(not miss.scrubbed for miss in misses):
+        raise typer.Exit(code=1)
+
+
+@app.command(name="benchmark_regexes", help="Time the fixture regexes with each regex engine")
+def benchmark_regexes(
+    stride: int = typer.Option(
+        1,
+        "--stride",
+        min=1,
+        help="Only use every nth user agent of the test fixtures",
+    ),
+):
+    benchmarks = benchmark_fixture_files(
+        fixture_user_agents()[::stride],
+        message_callback=message_callback,
+    )
+    regex_seconds = sum(benchmark.regex_seconds for benchmark in benchmarks)
+    chosen_seconds = sum(benchmark.chosen_seconds for benchmark in benchmarks)
+    message_callback(f"total: regex {regex_seconds:.3f}s, chosen {chosen_seconds:.3f}s")
+
+
+@app.command(name="reorder_regexes", help="Order the regexes by a recorded regex profile")
+def reorder_regexes(
+    profile: Annotated[Path, typer.Option("--profile", help="Regex profile saved by the parsers")],
+    output: Annotated[Path, typer.Option("--output", help="File for the orders of the regexes")],
+):
+    load_regex_profiles(str(profile))
+    orders = build_regex_orders(
+        ahocorasick_parsers(),
+        DDCache["regex_hits"],
+        message_callback=message_callback,
+    )
+    save_regex_orders(orders, str(output))
+
+
 def parse_device(ua: str, headers) -> ParsedDevice:
     d = DeviceDetector(ua, headers=headers).parse()
 
@@ -0,0 +1,95 @@
+from typing import Any
+
+import regex
+from regex import IGNORECASE
+from regex._regex_core import error as RegexError
+
+# Number of regexes joined into one alternation
+CHUNK_SIZE = 64
+
+
+class RegexChunk:
+    """
+    Alternation of regexes where each alternative is a lookahead that
+    scans the whole string for its regex. Matching at the start of the
+    string tries the alternatives in order, so the first alternative
+    that succeeds is the lowest-index regex matching anywhere in the UA.
+
+    Every alternative is wrapped in a group named after its position,
+    and that group is the last one closed when the alternative matches.
+    """
+
+    __slots__ = ('compiled', 'failed', 'pattern', 'positions')
+
+    def __init__(self, patterns: dict[int, str]) -> None:
+        self.positions = tuple(patterns)
+        self.pattern = '|'.join(
+            rf'(?=[\s\S]*?(?P<_{position}>{pattern}))' for position, pattern in patterns.items()
+        )
+        self.compiled: regex.Pattern | None = None
+        self.failed = False
+
+    def match(self, user_agent: str) -> int | None:
+        """
+        Position of the first regex of the chunk that matches the UA.
+        """
+        if self.compiled is None:
+            self.compiled = regex.compile(self.pattern, IGNORECASE)
+
+        if matched := self.compiled.match(user_agent):
+            return int(matched.lastgroup[1:])  # type: ignore[index]
+        return None
+
+
+class CombinedRegex:
+    """
+    Find the first matching regex of a fixture file with a few
+    searches over chunked alternations of all its regexes, instead
+    of a Python-level search call per regex.
+
+    The winning regex is searched once more by itself, so that the
+    match has that regex's own group numbering for substitutions.
+    """
+
+    __slots__ = ('chunks', 'regexes')
+
+    def __init__(self, regexes: list[Any], chunk_size: int = CHUNK_SIZE) -> None:
+        self.regexes = regexes
+        self.chunks = []
+
+        patterns = {
+            position: regex.pattern for position, regex in enumerate(regexes) if regex is not None
+        }
+        positions = list(patterns)
+        for start in range(0, len(positions), chunk_size):
+            chunk = positions[start : start + chunk_size]
+            self.chunks.append(RegexChunk({position: patterns[position] for position in chunk}))
+
+    def first_match(self, user_agent: str) -> tuple[int, regex.Match] | None:
+        """
+        Position and match of the first regex that matches the UA.
+        """
+        regexes = self.regexes
+        for chunk in self.chunks:
+            if not chunk.failed:
+                try:
+                    position = chunk.match(user_agent)
+                except RegexError:
+                    # Regexes that can't be joined are matched individually
+                    chunk.failed = True
+                else:
+                    if position is None:
+                        continue
+                    return position, regexes[position].search(user_agent)
+
+            for position in chunk.positions:
+                if matched := regexes[position].search(user_agent):
+                    return position, matched
+
+        return None
+
+
+__all__ = (
+    'CombinedRegex',
+    'RegexChunk',
+)
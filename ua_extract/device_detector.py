@@ -4,7 +4,6 @@ try:
     from typing import Self
 except ImportError:
     from typing_extensions import Self
-from .lazy_regex import RegexLazy
 from .enums import DeviceType
 
 from .parser import (  # type: ignore[attr-defined]
@@ -12,16 +11,19 @@ from .parser import (  # type: ignore[attr-defined]
     BaseDeviceParser,
     ClientHints,
     OS,
+    OSFragment,
     # Device extractors
     Bot,
     Camera,
     CarBrowser,
     Console,
     Device,
+    Engine,
     HbbTv,
     PortableMediaPlayer,
     Notebook,
     ShellTv,
+    VendorFragment,
     MOBILE_DEVICE_TYPES,
     # Clients
     AdobeCC,
@@ -42,21 +44,18 @@ from .parser import (  # type: ignore[attr-defined]
     NameVersionExtractor,
     WholeNameExtractor,
 )
+from .junk_classifier import is_gibberish, is_numeric, is_uuid, junk_type
+from .normalize_index import NORMALIZE_OWNER
+from .parser.parse_context import ParseContext
+from .parser.device.device import DEVICE_FRAGMENTS, DEVICE_FRAGMENTS_OWNER
 from .parser.settings import APPLE_OS_NAMES, TV_CLIENTS
-from .settings import BOUNDED_REGEX, DDCache, WORTHLESS_UA_TYPES
-from .utils import (
-    clean_ua,
-    long_ua_no_punctuation,
-    mostly_numerals,
-    mostly_repeating_characters,
-    only_numerals_and_punctuation,
-    random_alphanumeric_string,
-    uuid_like_name,
-    ua_hash_key,
-)
-from .yaml_loader import normalized_regex_list
+from .prefilter import PrefilterHits, SharedPrefilter
+from .settings import DDCache, WORTHLESS_UA_TYPES
+from .utils import clean_ua, ua_hash_key
+from .yaml_loader import normalized_literal_index
 
-DESKTOP_FRAGMENT = RegexLazy(BOUNDED_REGEX.format(r'(?:Windows (?:NT|IoT)|X11; Linux x86_64)'))
+# Parser classes run by the DeviceDetector
+ParserClass = type[OS | BaseClientParser | BaseDeviceParser]
 
 
 class DeviceDetector:
@@ -113,7 +112,8 @@ class DeviceDetector:
         'parsed',
         'headers',
         'client_hints',
-        '_normalized_regex_list',
+        '_prefilter_hits',
+        '_parse_context',
     )
 
     def __new__(
@@ -175,12 +175,93 @@ class DeviceDetector:
         self.all_details: dict = {'normalized': ''}  # type: ignore[type-arg]
         self.headers = headers or {}
         self.client_hints = ClientHints.new(headers) if headers else None
-        self._normalized_regex_list = normalized_regex_list(self.fixture_files)
+        self._prefilter_hits: PrefilterHits | None = None
+        self._parse_context: ParseContext | None = None
 
     @property
     def class_name(self) -> str:
         return self.__class__.__name__
 
+    def prefilter_parsers(self) -> tuple[ParserClass, ...]:
+        """
+        Parser classes whose AhoCorasick words and regex literals
+        are checked by the shared prefilter.
+        """
+        parsers: tuple[ParserClass, ...] = (OS, *self.CLIENT_PARSERS, Engine)
+        if not self.skip_bot_detection:
+            parsers = (Bot, *parsers)
+        if not self.skip_device_detection:
+            parsers = (*parsers, *self.DEVICE_PARSERS)
+        return parsers
+
+    def fragment_parsers(self) -> tuple[ParserClass, ...]:
+        """
+        Fragment parsers whose regex literals are checked by the shared prefilter.
+        """
+        if self.skip_device_detection:
+            return (OSFragment,)
+        return (OSFragment, VendorFragment)
+
+    def shared_prefilter(self) -> SharedPrefilter:
+        """
+        Load the AhoCorasick automaton shared by all prefilter parsers.
+        """
+        parsers = self.prefilter_parsers()
+        cache_key = tuple(Parser.__name__ for Parser in parsers)
+        try:
+            return DDCache['prefilter'][cache_key]
+        except KeyError:
+            pass
+
+        words = {}
+        literals = {}
+        for Parser in parsers:
+            parser = Parser('', None)
+            words[parser.cache_name] = parser.load_ahocorasick_words()
+            literals[parser.cache_name] = parser.literal_index.literals
+        literals[NORMALIZE_OWNER] = normalized_literal_index(self.fixture_files).literals
+        if not self.skip_device_detection:
+            literals[DEVICE_FRAGMENTS_OWNER] = DEVICE_FRAGMENTS.literal_index.literals
+        # Fragment parsers run by the OS and Device parsers
+        for Parser in self.fragment_parsers():
+            parser = Parser('', None)
+            literals[parser.cache_name] = parser.fragment_table.literal_index.literals
+
+        prefilter = SharedPrefilter(words, literals)
+        DDCache['prefilter'][cache_key] = prefilter
+
+        return prefilter
+
+    def prefilter_hits(self) -> PrefilterHits:
+        """
+        Scan the UA once for the words and literals of all parsers.
+        """
+        if self._prefilter_hits is None:
+            self._prefilter_hits = self.shared_prefilter().scan(self.user_agent.lower())
+        return self._prefilter_hits
+
+    def parse_context(self) -> ParseContext:
+        """
+        Details of the UA shared by all parsers, derived once per UA.
+        """
+        if self._parse_context is None:
+            self._parse_context = ParseContext(
+                self.user_agent, self.client_hints, self.prefilter_hits()
+            )
+        return self._parse_context
+
+    def skip_parser(self, parser_class: ParserClass) -> bool:
+        """
+        Parsers that can only match on their AhoCorasick words
+        need not run if the UA contains none of those words,
+        nor parsers that can tell they can't match the UA.
+        """
+        if not parser_class.can_match(self.parse_context()):
+            return True
+        if not parser_class.REQUIRES_AC_MATCH:
+            return False
+        return self.prefilter_hits().words(parser_class.__name__) == []
+
     # -----------------------------------------------------------------------------
     # UA parsing methods
     # -----------------------------------------------------------------------------
@@ -195,10 +276,7 @@ class DeviceDetector:
         Or if entire string is mostly numeric, discard
         15B93
         """
-        if only_numerals_and_punctuation(self.user_agent):
-            return True
-
-        return mostly_numerals(self.user_agent)
+        return is_numeric(self.user_agent)
 
     def is_uuid(self) -> bool:
         """
@@ -211,23 +289,13 @@ class DeviceDetector:
         A:08338459-4ca1-457f-a596-94c3a9037d20
         I:5DFF6AEC-DCED-4BA0-B122-B1826C1CEB02
         """
-        ua = self.user_agent.strip('({})')
-        if len(ua) >= 2 and ua[1] == ':':
-            ua = self.user_agent[2:]
-
-        return uuid_like_name(ua)
+        return is_uuid(self.user_agent)
 
     def is_gibberish(self) -> bool:
         """
         Check for frequently occurring patterns of meaninglessness
         """
-        if mostly_repeating_characters(self.user_agent_lower):
-            return True
-
-        if random_alphanumeric_string(self.user_agent_lower):
-            return True
-
-        return long_ua_no_punctuation(self.user_agent_lower)
+        return is_gibberish(self.user_agent_lower)
 
     def normalize(self) -> str:
         """
@@ -242,22 +310,12 @@ class DeviceDetector:
         if normalized := self.all_details.get('normalized'):
             return normalized
 
-        if self.is_digit():
-            self.all_details['normalized'] = 'Numeric'
-        elif self.is_uuid():
-            self.all_details['normalized'] = 'UUID'
-        elif self.is_gibberish():
-            self.all_details['normalized'] = 'Gibberish'
+        if junk := junk_type(self.user_agent, self.user_agent_lower):
+            self.all_details['normalized'] = junk
         else:
-            for nr in self._normalized_regex_list:
-                regex = nr['regex']
-                groups = r'{}'.format(nr['groups'])
-                ua = regex.sub(groups, self.user_agent)
-                if ua != self.user_agent:
-                    self.all_details['normalized'] = ua
-                    break
-            else:
-                self.all_details['normalized'] = ''
+            index = normalized_literal_index(self.fixture_files)
+            found_literals = self.prefilter_hits().literals(NORMALIZE_OWNER)
+            self.all_details['normalized'] = index.normalize(self.user_agent, found_literals)
 
         return self.all_details['normalized']
 
@@ -324,11 +382,16 @@ class DeviceDetector:
             return None
 
         os_details = self.all_details.get('os', {})
+        context = self.parse_context()
         for Parser in self.CLIENT_PARSERS:
+            if self.skip_parser(Parser):
+                continue
+
             parser = Parser(
                 self.user_agent,
                 self.client_hints,
                 os_details=os_details,
+                context=context,
             ).parse()
 
             if parser.ua_data:
@@ -366,12 +429,17 @@ class DeviceDetector:
             return
 
         os_details = self.all_details.get('os', {})
+        context = self.parse_context()
 
         for Parser in self.DEVICE_PARSERS:
+            if self.skip_parser(Parser):
+                continue
+
             parser = Parser(
                 self.user_agent,
                 self.client_hints,
                 os_details=os_details,
+                context=context,
             ).parse()
             if parser.ua_data:
                 self.device = parser
@@ -386,7 +454,11 @@ class DeviceDetector:
         Parses the UA for bot information using the Bot parser
         """
         if not self.skip_bot_detection and not self.bot:
-            self.bot = Bot(self.user_agent, self.client_hints).parse()
+            self.bot = Bot(
+                self.user_agent,
+                self.client_hints,
+                context=self.parse_context(),
+            ).parse()
             self.all_details['bot'] = self.bot.ua_data
 
     def parse_os(self) -> None:
@@ -394,7 +466,11 @@ class DeviceDetector:
         Parses the UA for Operating System information using the OS parser
         """
         if not self.os:
-            os = OS(self.user_agent, self.client_hints).parse()
+            os = OS(
+                self.user_agent,
+                self.client_hints,
+                context=self.parse_context(),
+            ).parse()
             if os:
                 self.os = os
                 self.all_details['os'] = os.ua_data
@@ -0,0 +1,114 @@
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from .lazy_regex import RegexLazy
+from .regex_literals import LiteralIndex
+
+
+class FragmentScanner:
+    """
+    Find which of a set of fragment regexes are in a UA with one scan,
+    as a bitset with the bit of each fragment regex set if it matches,
+    or find the first fragment regex in the UA.
+
+    The required literals of the fragments are found in one pass over
+    the lowercased UA, and only the fragments with their literals in the
+    UA are searched, so callers test bits instead of searching the
+    fragments one by one.
+    """
+
+    __slots__ = ('bits', 'fragments', 'literal_index')
+
+    def __init__(self, fragments: Sequence[RegexLazy]) -> None:
+        self.fragments = tuple(fragments)
+        # Equal fragment regexes get their own bits, so bits are keyed by identity
+        self.bits = {id(fragment): 1 << position for position, fragment in enumerate(fragments)}
+        self.literal_index = LiteralIndex([fragment.pattern for fragment in self.fragments])
+
+    def bit(self, fragment: RegexLazy) -> int:
+        """
+        Bit of the fragment regex in the bitsets of scan.
+        """
+        return self.bits[id(fragment)]
+
+    def scan(
+        self,
+        user_agent: str,
+        user_agent_lower: str,
+        found_literals: Iterable[str] | None = None,
+    ) -> int:
+        """
+        Bitset of the fragment regexes found in the UA.
+
+        found_literals are the literals of the literal index contained
+        in the UA, if the UA was already scanned for them.
+        """
+        fragments = self.fragments
+        found = 0
+        for position in self.literal_index.candidates(user_agent_lower, found_literals):
+            if fragments[position].search(user_agent) is not None:
+                found |= 1 << position
+        return found
+
+    def first_match(
+        self,
+        user_agent: str,
+        user_agent_lower: str,
+        found_literals: Iterable[str] | None = None,
+    ) -> tuple[int, Any] | None:
+        """
+        Position and match of the first fragment regex found in the UA.
+
+        Candidates are searched in the order of the fragments, so the first
+        match is the same as searching every fragment one after another.
+        """
+        fragments = self.fragments
+        for position in self.literal_index.candidates(user_agent_lower, found_literals):
+            if matched := fragments[position].search(user_agent):
+                return position, matched
+        return None
+
+    def __len__(self) -> int:
+        return len(self.fragments)
+
+
+class FragmentTable(FragmentScanner):
+    """
+    Scanner of the fragment regexes of all entries of a regex list, like
+    vendorfragments.yml, where each entry has a list of 'regexes'.
+    Matches are found in the order of the entries and of their regexes.
+    """
+
+    __slots__ = ('entries',)
+
+    def __init__(self, regex_list: list[dict[str, Any]]) -> None:
+        fragments = []
+        entries = []
+        for position, ua_data in enumerate(regex_list):
+            for fragment in ua_data.get('regexes', ()):
+                fragments.append(fragment)
+                entries.append(position)
+
+        super().__init__(fragments)
+        self.entries = tuple(entries)
+
+    def first_match(
+        self,
+        user_agent: str,
+        user_agent_lower: str,
+        found_literals: Iterable[str] | None = None,
+    ) -> tuple[int, Any] | None:
+        """
+        Position of the first entry with a fragment regex found in the UA,
+        and the match of that fragment.
+        """
+        if found := super().first_match(user_agent, user_agent_lower, found_literals):
+            position, matched = found
+            return self.entries[position], matched
+        return None
+
+
+__all__ = (
+    'FragmentScanner',
+    'FragmentTable',
+)
@@ -0,0 +1,92 @@
+"""
+Classify the UAs that are numeric, UUIDs or gibberish, which DeviceDetector
+normalizes to one of the WORTHLESS_UA_TYPES without parsing them.
+
+The checks use the n-gram lookup tables and translate tables of utils, and
+the cheapest checks that rule out most UAs come first, so well punctuated
+UAs are told apart from junk without any n-gram lookups.
+"""
+
+from collections.abc import Iterable
+
+from .utils import (
+    clean_ua,
+    long_ua_no_punctuation,
+    mostly_numerals,
+    mostly_repeating_characters,
+    only_numerals_and_punctuation,
+    random_alphanumeric_string,
+    uuid_like_name,
+)
+
+
+def is_numeric(user_agent: str) -> bool:
+    """
+    UA is only digits and punctuation, or mostly digits.
+    """
+    return only_numerals_and_punctuation(user_agent) or mostly_numerals(user_agent)
+
+
+def is_uuid(user_agent: str) -> bool:
+    """
+    UA is a UUID, which may be enclosed in curly braces
+    or prefixed with a letter and colon.
+    """
+    ua = user_agent.strip('({})')
+    if len(ua) >= 2 and ua[1] == ':':
+        ua = user_agent[2:]
+
+    return uuid_like_name(ua)
+
+
+def is_gibberish(user_agent_lower: str) -> bool:
+    """
+    Lowercased UA is repeating characters, generated names
+    or long without any punctuation.
+    """
+    return (
+        mostly_repeating_characters(user_agent_lower)
+        or random_alphanumeric_string(user_agent_lower)
+        or long_ua_no_punctuation(user_agent_lower)
+    )
+
+
+def junk_type(user_agent: str, user_agent_lower: str) -> str | None:
+    """
+    Worthless UA type of the cleaned UA and the lowercased UA,
+    or None if the UA is worth parsing.
+    """
+    if is_numeric(user_agent):
+        return 'Numeric'
+    if is_uuid(user_agent):
+        return 'UUID'
+    if is_gibberish(user_agent_lower):
+        return 'Gibberish'
+    return None
+
+
+def junk_types(user_agents: Iterable[str]) -> list[str | None]:
+    """
+    Worthless UA types of a batch of UAs, classifying each distinct UA once.
+    """
+    found: dict[str, str | None] = {}
+    types = []
+
+    for user_agent in user_agents:
+        try:
+            types.append(found[user_agent])
+        except KeyError:
+            user_agent_lower = user_agent.lower()
+            cleaned = clean_ua(user_agent, user_agent_lower)
+            types.append(found.setdefault(user_agent, junk_type(cleaned, user_agent_lower)))
+
+    return types
+
+
+__all__ = (
+    'is_gibberish',
+    'is_numeric',
+    'is_uuid',
+    'junk_type',
+    'junk_types',
+)
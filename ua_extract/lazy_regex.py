@@ -1,9 +1,20 @@
+from string import ascii_lowercase, ascii_uppercase, digits
+from typing import Any, Literal
 from urllib.parse import unquote
+import re
 import regex
 from regex import IGNORECASE
 
+from .regex_literals import (
+    MIN_LITERAL_LENGTH,
+    literal_alternatives,
+    required_literals,
+    starts_with_literal,
+)
+from .settings import BOUNDED_REGEX
+
 
-# When one of these attributes is called, compile the regex
+# Methods of the compiled regex that RegexLazy keeps once compiled
 REGEX_ATTRS = {
     'match',
     'fullmatch',
@@ -11,21 +22,128 @@ REGEX_ATTRS = {
     'sub',
     'subf',
     'subfn',
+    'subn',
     'split',
     'splititer',
     'findall',
     'finditer',
-    'purge',
-    'escape',
-    'compiled',
 }
 
 
+# Flags that stdlib re and the regex module interpret the same way
+STDLIB_FLAGS = re.IGNORECASE | re.MULTILINE | re.DOTALL | re.VERBOSE | re.UNICODE
+
+# Syntax that stdlib re and the regex module match differently in ASCII
+# strings: \s and \S also match \x1c-\x1f with stdlib re, escapes may
+# stand for non-ASCII characters that fold to ASCII, [:alpha:] is a
+# POSIX class for the regex module only. Escaped backslashes are not
+# told apart, which only keeps a few more patterns on the regex module.
+STDLIB_DIFFERENT = re.compile(r'\\[sSxuUN0-7]|\[:')
+
+
+def prefer_stdlib(pattern: str, flags: int = 0) -> bool:
+    """
+    Check if the pattern should be compiled with stdlib re.
+
+    Stdlib re compiles faster, and is faster at matching UAs that contain
+    the literals of the pattern, which is what the literal indexes leave
+    to the regexes. But the regex module first looks for a string that
+    every match contains, such as "chr" of Chr[o0]me/, so it rejects most
+    UAs faster for patterns whose literals share a prefix or suffix.
+    """
+    if flags & ~STDLIB_FLAGS or not pattern.isascii() or STDLIB_DIFFERENT.search(pattern):
+        return False
+    if (literals := required_literals(pattern)) is None:
+        return True
+
+    prefixes = {literal[:MIN_LITERAL_LENGTH] for literal in literals}
+    suffixes = {literal[-MIN_LITERAL_LENGTH:] for literal in literals}
+    return len(prefixes) > 1 and len(suffixes) > 1
+
+
+class StdlibRegex:
+    """
+    Pattern compiled with stdlib re, to match ASCII strings. Other strings
+    are matched with the pattern compiled with the regex module, as the
+    engines differ in case folding and in the characters of some classes.
+    """
+
+    __slots__ = ('_unicode', 'stdlib')
+
+    def __init__(self, stdlib: re.Pattern[str]) -> None:
+        self.stdlib = stdlib
+        self._unicode: regex.Pattern | None = None
+
+    @property
+    def unicode(self) -> regex.Pattern:
+        if self._unicode is None:
+            self._unicode = regex.compile(self.stdlib.pattern, self.stdlib.flags)
+        return self._unicode
+
+    def engine(self, string: str) -> re.Pattern[str] | regex.Pattern:
+        return self.stdlib if string.isascii() else self.unicode
+
+    def match(self, string: str, *args: Any) -> re.Match[str] | regex.Match | None:
+        return self.engine(string).match(string, *args)
+
+    def fullmatch(self, string: str, *args: Any) -> re.Match[str] | regex.Match | None:
+        return self.engine(string).fullmatch(string, *args)
+
+    def search(self, string: str, *args: Any) -> re.Match[str] | regex.Match | None:
+        return self.engine(string).search(string, *args)
+
+    def sub(self, repl: Any, string: str, *args: Any) -> str:
+        return self.engine(string).sub(repl, string, *args)
+
+    def subn(self, repl: Any, string: str, *args: Any) -> tuple[str, int]:
+        return self.engine(string).subn(repl, string, *args)
+
+    def split(self, string: str, *args: Any) -> list[Any]:
+        return self.engine(string).split(string, *args)
+
+    def findall(self, string: str, *args: Any) -> list[Any]:
+        return self.engine(string).findall(string, *args)
+
+    def finditer(self, string: str, *args: Any) -> Any:
+        return self.engine(string).finditer(string, *args)
+
+    def __getattr__(self, attribute: str) -> Any:
+        if attribute in ('pattern', 'flags', 'groups', 'groupindex'):
+            return getattr(self.stdlib, attribute)
+        return getattr(self.unicode, attribute)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.stdlib!r})'
+
+    def __hash__(self) -> int:
+        return hash(self.stdlib)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, StdlibRegex) and self.stdlib == other.stdlib
+
+
+def compile_regex(pattern: str, flags: int = 0) -> regex.Pattern | StdlibRegex:
+    """
+    Compile the pattern with the engine expected to match it fastest,
+    finding the same matches as the regex module.
+    """
+    if prefer_stdlib(pattern, flags):
+        try:
+            return StdlibRegex(re.compile(pattern, flags))
+        except (re.error, OverflowError, RecursionError):
+            # variable-width lookbehinds, etc
+            pass
+    return regex.compile(pattern, flags)
+
+
 class RegexLazy:
     """
     Defer compilation of regex until it's actually called.
     Some regexes, especially on device models will almost
     never be called, so save the compilation time.
+
+    The methods of the compiled regex are kept on the instance when
+    first called, so later calls go straight to the compiled regex.
     """
 
     def __init__(self, pattern: str, flags: int = 0) -> None:
@@ -33,29 +151,35 @@ class RegexLazy:
         # Pic%20Collage/(\d+[\.\d]+) CFNetwork
         self.pattern = unquote(pattern)
         self.flags = flags
-        self.compiled = None
 
-    def __getattribute__(self, attribute: str) -> regex.Regex:
-        compiled_regex = super().__getattribute__('compiled')
-        if compiled_regex is None and attribute in REGEX_ATTRS:
-            pattern = super().__getattribute__('pattern')
-            flags = super().__getattribute__('flags')
-            compiled_regex = regex.compile(pattern, flags)
-            self.compiled = compiled_regex
+    def __getattr__(self, attribute: str) -> Any:
+        """
+        Compile the regex on first use of the compiled regex or its
+        attributes, which are only looked up here until they're kept.
+        """
+        if attribute.startswith('__') or attribute in ('pattern', 'flags'):
+            raise AttributeError(attribute)
 
         if attribute == 'compiled':
-            return compiled_regex
+            compiled: regex.Pattern | StdlibRegex = compile_regex(self.pattern, self.flags)
+            self.compiled = compiled
+            return compiled
 
-        return getattr(compiled_regex, attribute)
+        value = getattr(self.compiled, attribute)
+        if attribute in REGEX_ATTRS:
+            setattr(self, attribute, value)
+        return value
 
     def __repr__(self) -> str:
-        return repr(self.compiled)
+        return f'{self.__class__.__name__}({self.pattern!r}, {self.flags!r})'
 
     def __hash__(self) -> int:
-        return hash(self.compiled)
+        return hash((self.pattern, self.flags))
 
-    def __eq__(self, other: regex.Regex) -> bool:
-        return self.compiled == other.compiled
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RegexLazy):
+            return NotImplemented
+        return self.pattern == other.pattern and self.flags == other.flags
 
 
 class RegexLazyIgnore(RegexLazy):
@@ -63,7 +187,414 @@ class RegexLazyIgnore(RegexLazy):
         super().__init__(pattern, IGNORECASE)
 
 
+# Characters before a bounded regex that keep it from matching,
+# unless they're preceded by sprd- or MZ-. See BOUNDED_REGEX.
+WORD_CHARACTERS = frozenset(ascii_lowercase + digits)
+BOUNDARY_BLOCKING = WORD_CHARACTERS | {'_', '-'}
+UNDERSCORE_BLOCKING = WORD_CHARACTERS | {'-'}
+BOUNDARY_PREFIXES = ('sprd-', 'mz-')
+
+
+def bounded_start(string_lower: str, start: int) -> bool:
+    """
+    Check the left boundary of BOUNDED_REGEX for a match at start.
+    """
+    if start == 0:
+        return True
+
+    previous = string_lower[start - 1]
+    if previous not in BOUNDARY_BLOCKING:
+        return True
+    if previous == '_' and start > 1 and string_lower[start - 2] not in UNDERSCORE_BLOCKING:
+        return True
+    return string_lower.endswith(BOUNDARY_PREFIXES, 0, start)
+
+
+def boundary_start(string_lower: str, start: int) -> int:
+    """
+    Start of the text that the left boundary of BOUNDED_REGEX matches,
+    for a match at start that passes bounded_start. The regex matches
+    the longest boundary text, as it tries the leftmost positions first.
+    """
+    if string_lower.endswith(BOUNDARY_PREFIXES, 0, start):
+        return start - (5 if string_lower.endswith('sprd-', 0, start) else 3)
+    if start > 1 and string_lower[start - 1] == '_':
+        return start - 2
+    return max(start - 1, 0)
+
+
+class RegexLiteral:
+    """
+    Bounded regex of a pattern that only matches a few literal strings.
+
+    Search for the literals in the lowercased string, and check the left
+    boundary of BOUNDED_REGEX, instead of compiling the regex. The regex
+    is compiled only for non-ASCII strings, where case-insensitive regex
+    matching differs from lowercasing, or to get details of a match.
+    """
+
+    __slots__ = ('literals', 'pattern', 'regex')
+
+    def __init__(self, pattern: str, literals: frozenset[str]) -> None:
+        self.regex = RegexLazyIgnore(BOUNDED_REGEX.format(pattern))
+        self.pattern = self.regex.pattern
+        self.literals = tuple(sorted(literals))
+
+    def search(self, string: str) -> 'LiteralMatch | regex.Match | None':
+        if not string.isascii():
+            return self.regex.search(string)
+
+        string_lower = string.lower()
+        for literal in self.literals:
+            start = string_lower.find(literal)
+            while start != -1:
+                if bounded_start(string_lower, start):
+                    return LiteralMatch(self, string)
+                start = string_lower.find(literal, start + 1)
+
+        return None
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self.regex, attribute)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.pattern!r})'
+
+
+class LiteralMatch:
+    """
+    Match of a RegexLiteral. Groups, spans etc are looked up by
+    searching the string with the compiled regex when first needed.
+    """
+
+    __slots__ = ('_match', 'regex_literal', 'string')
+
+    def __init__(self, regex_literal: RegexLiteral, string: str) -> None:
+        self.regex_literal = regex_literal
+        self.string = string
+        self._match: regex.Match | None = None
+
+    def __getattr__(self, attribute: str) -> Any:
+        if self._match is None:
+            self._match = self.regex_literal.regex.search(self.string)
+        return getattr(self._match, attribute)
+
+
+# Escapes that fold_pattern can't lowercase: the characters they stand
+# for, the names of groups they refer to, or their properties may have
+# case. Other escapes are kept as they are, since \d, \W etc match the
+# same characters in a lowercased string.
+UNFOLDABLE_ESCAPES = frozenset('xuUNpPgk0')
+
+# Letters of the ranges in character classes
+ASCII_LETTERS = frozenset(ascii_lowercase + ascii_uppercase)
+
+# Group references of templates that RegexFolded.sub expands itself
+TEMPLATE_GROUP = re.compile(r'\\g<(\d+)>')
+
+
+def fold_pattern(pattern: str) -> str | None:
+    """
+    Lowercase a pattern, so that matching the lowercased form of an ASCII
+    string case-sensitively finds the same matches as matching the string
+    case-insensitively. None if the pattern can't be safely lowercased,
+    such as with inline flags, named groups or ranges like [A-z].
+
+    >>> fold_pattern('[^A-Z0-9_-]Nexus [0-9]+[A-Z]?')
+    '[^a-z0-9_-]nexus [0-9]+[a-z]?'
+    """
+    if not pattern.isascii() or '[:' in pattern:
+        return None
+
+    folded = []
+    in_class = False
+    position = 0
+    end = len(pattern)
+
+    while position < end:
+        character = pattern[position]
+
+        if character == '\\':
+            escape = pattern[position : position + 2]
+            if len(escape) < 2 or escape[1] in UNFOLDABLE_ESCAPES:
+                return None
+            # An escape can't be folded as the low end of a range
+            if (
+                in_class
+                and pattern.startswith('-', position + 2)
+                and not pattern.startswith(']', position + 3)
+            ):
+                return None
+            folded.append(escape)
+            position += 2
+
+        elif in_class:
+            if character == ']':
+                in_class = False
+                folded.append(character)
+                position += 1
+            elif (
+                pattern.startswith('-', position + 1)
+                and position + 2 < end
+                and pattern[position + 2] != ']'
+            ):
+                low, high = character, pattern[position + 2]
+                if high == '\\':
+                    return None
+                letters = ASCII_LETTERS.intersection(map(chr, range(ord(low), ord(high) + 1)))
+                if letters and not (
+                    {low, high} <= ASCII_LETTERS and low.isupper() == high.isupper()
+                ):
+                    return None
+                folded.append(f'{low.lower()}-{high.lower()}')
+                position += 3
+            else:
+                folded.append(character.lower())
+                position += 1
+
+        elif character == '[':
+            # A ] right after [ or [^ is a literal
+            class_start = position + 2 if pattern.startswith('^', position + 1) else position + 1
+            if pattern.startswith(']', class_start):
+                class_start += 1
+            folded.append(pattern[position:class_start])
+            in_class = True
+            position = class_start
+
+        elif pattern.startswith('(?', position):
+            # Inline flags, named groups and references to them
+            extension = pattern[position + 2 : position + 4]
+            if (
+                extension[:1] in ('a', 'i', 'L', 'm', 's', 'u', 'x', '-', "'")
+                or extension in ('P<', 'P=', 'P>')
+                or (extension[:1] == '<' and extension[1:] not in ('=', '!'))
+            ):
+                return None
+            folded.append('(?')
+            position += 2
+
+        else:
+            folded.append(character.lower())
+            position += 1
+
+    return ''.join(folded)
+
+
+class RegexFolded:
+    """
+    Bounded regex of a pattern that can be lowercased with fold_pattern.
+
+    Search for the lowercased pattern in the lowercased string, without
+    IGNORECASE, which keeps the literal fast paths of the engines. ASCII
+    strings keep their length when lowercased, so the spans of the match
+    are those of the string and the groups are sliced from the string
+    with their original case. Other strings are searched with the regex.
+
+    The left boundary of BOUNDED_REGEX is matched at every position of
+    the string before the pattern, so stdlib re can't skip to the first
+    literal of the pattern. If the pattern starts with a literal, search
+    the lowercased pattern without the boundary instead, and check the
+    boundary of each match. Patterns such as .*Chrome are still searched
+    with the boundary, which keeps them from being tried everywhere.
+    """
+
+    __slots__ = ('_folded', '_scan', 'folded_pattern', 'pattern', 'regex', 'scan_pattern')
+
+    def __init__(
+        self, regex_ignore: RegexLazyIgnore, folded_pattern: str, scan_pattern: str | None = None
+    ) -> None:
+        self.regex = regex_ignore
+        self.pattern = regex_ignore.pattern
+        self.folded_pattern = folded_pattern
+        self.scan_pattern = scan_pattern
+        self._folded: re.Pattern[str] | regex.Pattern | None = None
+        self._scan: re.Pattern[str] | regex.Pattern | Literal[False] | None = None
+
+    @property
+    def folded(self) -> 're.Pattern[str] | regex.Pattern':
+        """
+        Compile the lowercased pattern with the engine that compile_regex
+        chooses for the pattern. The compiled pattern only matches ASCII
+        strings, so the engines find the same matches.
+        """
+        if self._folded is None:
+            if prefer_stdlib(self.pattern, IGNORECASE):
+                try:
+                    self._folded = re.compile(self.folded_pattern)
+                    return self._folded
+                except (re.error, OverflowError, RecursionError):
+                    pass
+            self._folded = regex.compile(self.folded_pattern)
+        return self._folded
+
+    @property
+    def scan(self) -> 're.Pattern[str] | regex.Pattern | Literal[False]':
+        """
+        Compile the lowercased pattern without the boundary, if it starts
+        with a literal, with the engine that folded uses. False if it doesn't.
+        """
+        if self._scan is None:
+            self._scan = False
+            if self.scan_pattern is not None and starts_with_literal(self.scan_pattern):
+                if prefer_stdlib(self.pattern, IGNORECASE):
+                    try:
+                        self._scan = re.compile(self.scan_pattern)
+                        return self._scan
+                    except (re.error, OverflowError, RecursionError):
+                        pass
+                self._scan = regex.compile(self.scan_pattern)
+        return self._scan
+
+    def search(self, string: str) -> 'FoldedMatch | regex.Match | None':
+        if not string.isascii():
+            return self.regex.search(string)
+
+        string_lower = string.lower()
+        if not (scan := self.scan):
+            if match := self.folded.search(string_lower):
+                return FoldedMatch(self, string, match)
+            return None
+
+        # The leftmost match with a boundary is the match of the regex
+        position = 0
+        while match := scan.search(string_lower, position):
+            start = match.start()
+            if bounded_start(string_lower, start):
+                return FoldedMatch(self, string, match, boundary_start(string_lower, start))
+            position = start + 1
+        return None
+
+    def sub(self, template: Any, string: str, count: int = 0) -> str:
+        """
+        Substitute the template for the matches in the string. Templates
+        with escapes other than numbered group references are left to
+        the regex.
+        """
+        if (
+            not isinstance(template, str)
+            or not string.isascii()
+            or '\\' in TEMPLATE_GROUP.sub('', template)
+        ):
+            return self.regex.sub(template, string, count)
+
+        substituted: list[str] = []
+        end = 0
+        for number, match in enumerate(self.folded.finditer(string.lower())):
+            if count and number == count:
+                break
+            substituted.extend((
+                string[end : match.start()],
+                FoldedMatch(self, string, match).expand(template),
+            ))
+            end = match.end()
+        substituted.append(string[end:])
+
+        return ''.join(substituted)
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self.regex, attribute)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.pattern!r})'
+
+
+class FoldedMatch:
+    """
+    Match of a RegexFolded in the lowercased string. Groups are sliced
+    from the string, other details are those of the match.
+
+    A match of the pattern without the boundary has the start of the
+    boundary text, so that the whole match is the same as the regex's.
+    """
+
+    __slots__ = ('boundary', 'match', 're', 'string')
+
+    def __init__(
+        self, regex_folded: RegexFolded, string: str, match: Any, boundary: int | None = None
+    ) -> None:
+        self.re = regex_folded
+        self.string = string
+        self.match = match
+        self.boundary = boundary
+
+    def span(self, group: int | str = 0) -> tuple[int, int]:
+        if group == 0 and self.boundary is not None:
+            return self.boundary, self.match.end()
+        return self.match.span(group)
+
+    def start(self, group: int | str = 0) -> int:
+        return self.span(group)[0]
+
+    def end(self, group: int | str = 0) -> int:
+        return self.match.end(group)
+
+    def _group(self, group: int | str, default: Any = None) -> Any:
+        start, end = self.span(group)
+        if start == -1:
+            return default
+        return self.string[start:end]
+
+    def group(self, *groups: int | str) -> Any:
+        if len(groups) < 2:
+            return self._group(groups[0] if groups else 0)
+        return tuple(self._group(group) for group in groups)
+
+    def groups(self, default: Any = None) -> tuple[Any, ...]:
+        return tuple(self._group(group, default) for group in range(1, self.match.re.groups + 1))
+
+    def expand(self, template: str) -> str:
+        """
+        Expand the numbered group references of the template, which
+        fails on groups the pattern doesn't have like with the engines.
+        """
+
+        def expand_group(reference: re.Match[str]) -> str:
+            group = int(reference.group(1))
+            if group > self.match.re.groups:
+                raise re.error(f'invalid group reference {group}')
+            return self._group(group, '')
+
+        return TEMPLATE_GROUP.sub(expand_group, template)
+
+    def __getitem__(self, group: int | str) -> Any:
+        return self._group(group)
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self.match, attribute)
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} {self.span()} {self.group()!r}>'
+
+
+def bounded_regex(
+    pattern: str, folded: bool = False
+) -> RegexLazyIgnore | RegexLiteral | RegexFolded:
+    """
+    Lazy case-insensitive BOUNDED_REGEX of a fixture pattern, or
+    a RegexLiteral if the pattern is an alternation of literals.
+    If folded, a RegexFolded if the pattern can be lowercased.
+    """
+    if literals := literal_alternatives(unquote(pattern)):
+        return RegexLiteral(pattern, literals)
+
+    bounded = RegexLazyIgnore(BOUNDED_REGEX.format(pattern))
+    if folded and (folded_pattern := fold_pattern(bounded.pattern)) is not None:
+        return RegexFolded(bounded, folded_pattern, fold_pattern(unquote(pattern)))
+    return bounded
+
+
 __all__ = (
+    'FoldedMatch',
+    'LiteralMatch',
+    'RegexFolded',
     'RegexLazy',
     'RegexLazyIgnore',
+    'RegexLiteral',
+    'StdlibRegex',
+    'boundary_start',
+    'bounded_regex',
+    'bounded_start',
+    'compile_regex',
+    'fold_pattern',
+    'prefer_stdlib',
 )
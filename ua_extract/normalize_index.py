@@ -0,0 +1,93 @@
+r"""
+Index of the normalizing regexes of normalize.yml, to find the first
+regex that changes a UA without substituting every regex.
+
+Most normalizing regexes are anchored with ^ and a character like @, %
+or * or a product name, so they are grouped by the first characters
+they can match, and a UA only selects the regexes of its own first
+character. The other regexes are selected by the literals they require,
+and by the characters all of their matches contain, such as the _ of
+([A-Z]+_[\d+\.]+)_ or the dashes of UUIDs.
+
+Only the selected regexes found in the UA are substituted, so most UAs
+don't run any substitution.
+"""
+
+from collections.abc import Iterable
+from typing import Any
+
+from .regex_literals import LiteralIndex, anchored_first_characters, required_characters
+
+# Owner of the normalizing regex literals in the shared prefilter
+NORMALIZE_OWNER = 'Normalize'
+
+
+class NormalizeIndex(LiteralIndex):
+    """
+    Literal index of the normalizing regexes, that also selects regexes
+    by the first character of the UA and the characters they require.
+    """
+
+    __slots__ = ('by_first_character', 'characters', 'regexes', 'replacements', 'unanchored')
+
+    def __init__(self, regex_list: list[dict[str, Any]]) -> None:
+        patterns = [nr['regex'].pattern for nr in regex_list]
+        super().__init__(patterns)
+        self.regexes = tuple(nr['regex'] for nr in regex_list)
+        self.replacements = tuple(str(nr['groups']) for nr in regex_list)
+
+        unanchored = set()
+        anchored: dict[str, set[int]] = {}
+        for position, pattern in enumerate(patterns):
+            if (first := anchored_first_characters(pattern)) is None:
+                unanchored.add(position)
+                continue
+            for char in first:
+                anchored.setdefault(char, set()).add(position)
+
+        self.unanchored = frozenset(unanchored)
+        self.by_first_character = {
+            char: self.unanchored | positions for char, positions in anchored.items()
+        }
+        self.characters = tuple(required_characters(pattern) for pattern in patterns)
+
+    def candidates(
+        self,
+        user_agent_lower: str,
+        found_literals: Iterable[str] | None = None,
+    ) -> Iterable[int]:
+        """
+        Positions of the normalizing regexes that could match the lowercased UA.
+        """
+        positions = super().candidates(user_agent_lower, found_literals)
+        if not user_agent_lower.isascii():
+            return positions
+
+        allowed = self.by_first_character.get(user_agent_lower[:1], self.unanchored)
+        characters = self.characters
+        ua_characters = set(user_agent_lower)
+        return [
+            position
+            for position in positions
+            if position in allowed and characters[position] <= ua_characters
+        ]
+
+    def normalize(self, user_agent: str, found_literals: Iterable[str] | None = None) -> str:
+        """
+        UA as changed by the first normalizing regex that changes it,
+        or an empty string if none of them does.
+        """
+        for position in self.candidates(user_agent.lower(), found_literals):
+            regex = self.regexes[position]
+            if regex.search(user_agent) is None:
+                continue
+            normalized = regex.sub(self.replacements[position], user_agent)
+            if normalized != user_agent:
+                return normalized
+        return ''
+
+
+__all__ = (
+    'NORMALIZE_OWNER',
+    'NormalizeIndex',
+)
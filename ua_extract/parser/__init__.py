@@ -3,6 +3,7 @@ from .client_hints import ClientHints
 from .extractors import *
 from .device import *
 from .key_value_pairs import *
+from .parse_context import *
 from .parser import *
 from .operating_system import *
 from .os_fragment import *
@@ -1,6 +1,7 @@
 from . import BaseClientParser
 from ua_extract.enums import AppType
 from ...lazy_regex import RegexLazyIgnore
+from ..parse_context import ParseContext
 
 ADOBE_CC = RegexLazyIgnore(r'\b(?P<name>[\w ]+)/(?P<version>[\.\d]+) com\.adobe\.[\w+\.-]+/')
 
@@ -14,6 +15,10 @@ class AdobeCC(BaseClientParser):
     __slots__ = ()
     APP_TYPE = AppType.DesktopApp
 
+    @classmethod
+    def can_match(cls, context: ParseContext) -> bool:
+        return not context.user_agent.isascii() or ' com.adobe.' in context.user_agent_lower
+
     def _parse(self) -> None:
         if adobe_app := ADOBE_CC.search(self.user_agent):
             name, version = adobe_app.groups()
@@ -64,6 +64,7 @@ class BaseClientParser(Parser):
 
 
 class GenericClientParser(BaseClientParser):
+    __slots__ = ()
     APP_TYPE = AppType.Generic
 
     # -------------------------------------------------------------------
@@ -1,8 +1,8 @@
-import regex
+from typing import Any
+
 from ua_extract.enums import AppType
-from ua_extract.lazy_regex import RegexLazy
+from ua_extract.lazy_regex import RegexLazy, RegexLazyIgnore
 from . import BaseClientParser
-from ...parser.key_value_pairs import key_value_pairs
 from ...settings import BOUNDED_REGEX
 from ..settings import (
     AVAILABLE_BROWSERS,
@@ -19,6 +19,26 @@ from .extractor_whole_name import WholeNameExtractor
 
 DATE_VERSION = RegexLazy(r'^202[0-5]')
 
+# Version after the name of an engine, like WebKit/537.36 or Trident/7
+ENGINE_VERSION_REGEX = r"{engine}\s*\/?\s*((?=\d+\.\d)\d+[.\d]*|\d{{1,7}}(?=(?:\D|$)))"
+
+
+def engine_version_regex(engine: str) -> RegexLazyIgnore:
+    return RegexLazyIgnore(BOUNDED_REGEX.format(ENGINE_VERSION_REGEX.format(engine=engine)))
+
+
+# Version regexes of the available engines, and of other engines once parsed
+ENGINE_VERSION_REGEXES = {engine: engine_version_regex(engine) for engine in AVAILABLE_ENGINES}
+
+
+class VersionedEngine(str):  # noqa: FURB189
+    """
+    Engine of the last engine version of a browser regex, resolved when
+    the regexes are loaded. Its engine version is the browser version.
+    """
+
+    __slots__ = ()
+
 
 class EngineVersion:
     def __init__(self, user_agent: str):
@@ -28,10 +48,12 @@ class EngineVersion:
         if not engine:
             return ''
 
-        engine_regex = BOUNDED_REGEX.format(
-            r"{engine}\s*\/?\s*((?=\d+\.\d)\d+[.\d]*|\d{{1,7}}(?=(?:\D|$)))".format(engine=engine)
-        )
-        match = regex.search(engine_regex, self.user_agent, regex.IGNORECASE)
+        try:
+            engine_regex = ENGINE_VERSION_REGEXES[engine]
+        except KeyError:
+            engine_regex = ENGINE_VERSION_REGEXES.setdefault(engine, engine_version_regex(engine))
+
+        match = engine_regex.search(self.user_agent)
         if match:
             engine_version = self.user_agent[match.start() : match.end()]
             try:
@@ -76,6 +98,19 @@ class Browser(BaseClientParser):
     FAMILY_FROM_ABBREV = FAMILY_FROM_ABBREV
     MOBILE_ONLY_BROWSERS = MOBILE_ONLY_BROWSERS
 
+    def yaml_to_list(self, yfile: str) -> list[dict[str, Any]]:
+        """
+        Resolve engines with engine versions to the engine of the last version:
+        {'default': 'WebKit', 'versions': {28: 'Blink'}} => VersionedEngine('Blink')
+        """
+        regexes = super().yaml_to_list(yfile)
+        for regex in regexes:
+            engine = regex.get('engine')
+            if isinstance(engine, dict) and (versions := engine.get('versions')):
+                regex['engine'] = VersionedEngine(next(reversed(versions.values())))
+
+        return regexes
+
     def check_all_regexes(self) -> bool | list[str]:
         if check_all := super().check_all_regexes():
             return check_all
@@ -90,7 +125,7 @@ class Browser(BaseClientParser):
         # if the name <= 2 characters, don't consider it interesting
         # if that name is actually interesting, add to relevant
         # appdetails/<file>.yml, so it'll be parsed before now.
-        for code, name, version in key_value_pairs(self.user_agent):
+        for code, name, version in self.context.key_value_pairs():
             if len(name) > 2 and not name.lower().endswith(('build', 'version')):
                 return True
         return False
@@ -213,10 +248,12 @@ class Browser(BaseClientParser):
         {
             'name': 'Chrome',
             'version': '123.0.6312.40',
-            'engine': {'default': 'WebKit', 'versions': {28: 'Blink'}},
+            'engine': VersionedEngine('Blink'),
         }
         """
-        if not self.ua_data.get('engine', ''):
+        # an empty last engine, like Konqueror 4's, still has an engine version
+        engine = self.ua_data.get('engine', '')
+        if not engine and not isinstance(engine, VersionedEngine):
             return
 
         browser = self.ua_data.get('name', '')
@@ -227,16 +264,22 @@ class Browser(BaseClientParser):
         }
 
         if 'engine' not in self.ua_data:
-            engine = Engine(self.user_agent, self.client_hints).parse().ua_data
-            self.ua_data['engine'] = engine
+            engine = Engine(
+                self.user_agent,
+                self.client_hints,
+                context=self.context,
+            )
+            self.ua_data['engine'] = engine.parse().ua_data
             return
 
-        client_version = self.ch_client_data.get('version', '') or self.ua_data.get('version', '')
-        engine = self.ua_data.get('engine') or {}
-        for _, name in engine.get('versions', {}).items():
+        # engine of the last version, resolved by yaml_to_list.
+        # The default is kept as it is.
+        if isinstance(engine := self.ua_data['engine'], VersionedEngine):
             self.ua_data |= {
-                'engine': name,
-                'engine_version': client_version,
+                'engine': str(engine),
+                'engine_version': (
+                    self.ch_client_data.get('version', '') or self.ua_data.get('version', '')
+                ),
             }
 
     def is_mobile_only(self) -> bool:
@@ -263,7 +306,11 @@ class Browser(BaseClientParser):
         """
         Update secondary_client dict with any data from specified extractor
         """
-        parsed = extractor(ua=self.user_agent, client_hints=self.client_hints).parse()
+        parsed = extractor(
+            ua=self.user_agent,
+            client_hints=self.client_hints,
+            context=self.context,
+        ).parse()
 
         if parsed.ua_data:
             self.secondary_client = parsed.ua_data
@@ -276,4 +323,5 @@ __all__ = (
     'Browser',
     'Engine',
     'EngineVersion',
+    'VersionedEngine',
 )
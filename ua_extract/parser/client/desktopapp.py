@@ -4,6 +4,7 @@ from ua_extract.enums import AppType
 
 class DesktopApp(BaseClientParser):
     __slots__ = ()
+    REQUIRES_AC_MATCH = True
     APP_TYPE = AppType.DesktopApp
 
     fixture_files = [
@@ -13,6 +14,7 @@ class DesktopApp(BaseClientParser):
 
 class OsUtility(BaseClientParser):
     __slots__ = ()
+    REQUIRES_AC_MATCH = True
     APP_TYPE = AppType.OsUtility
 
     fixture_files = [
@@ -22,6 +24,7 @@ class OsUtility(BaseClientParser):
 
 class Antivirus(BaseClientParser):
     __slots__ = ()
+    REQUIRES_AC_MATCH = True
     APP_TYPE = AppType.Antivirus
 
     fixture_files = [
@@ -7,6 +7,7 @@ except ImportError:
     import json
 
 from . import BaseClientParser
+from ..parse_context import ParseContext
 from ...utils import calculate_dtype
 
 
@@ -21,6 +22,12 @@ class DictUA(BaseClientParser):
 
     __slots__ = ()
 
+    @classmethod
+    def can_match(cls, context: ParseContext) -> bool:
+        # Dicts are JSON objects or lists of pairs, or key=value pairs
+        user_agent = context.user_agent
+        return '=' in user_agent or '{' in user_agent or '[' in user_agent
+
     def load_via_json(self) -> dict[str, str]:
         try:
             # sanity check - really shouldn't need to cast to dict.
@@ -1,6 +1,5 @@
 from . import GenericClientParser
 from ...lazy_regex import RegexLazyIgnore
-from ...parser.key_value_pairs import key_value_pairs
 from ..settings import METADATA_NAMES
 
 
@@ -27,7 +26,7 @@ class NameVersionExtractor(GenericClientParser):
         app_type = ''
         app_name = ''
 
-        for code, name, version in key_value_pairs(self.user_agent):
+        for code, name, version in self.context.key_value_pairs():
             if app_detail := app_details.get(code):
                 app_name = app_detail['name']
                 self.app_version = version
@@ -4,6 +4,7 @@ from ua_extract.enums import AppType
 
 class Library(BaseClientParser):
     __slots__ = ()
+    REQUIRES_AC_MATCH = True
     APP_TYPE = AppType.Library
 
     fixture_files = [
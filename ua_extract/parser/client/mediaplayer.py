@@ -4,6 +4,7 @@ from ua_extract.enums import AppType
 
 class MediaPlayer(BaseClientParser):
     __slots__ = ()
+    REQUIRES_AC_MATCH = True
     APP_TYPE = AppType.MediaPlayer
 
     fixture_files = [
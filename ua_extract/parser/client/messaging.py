@@ -1,11 +1,16 @@
 from . import BaseClientParser
 from ua_extract.enums import AppType
+from ..parse_context import ParseContext
 
 
 class Messaging(BaseClientParser):
     __slots__ = ()
     APP_TYPE = AppType.Messaging
 
+    @classmethod
+    def can_match(cls, context: ParseContext) -> bool:
+        return cls.has_regex_candidates(context)
+
 
 __all__ = [
     'Messaging',
@@ -1,5 +1,4 @@
 from . import BaseClientParser
-from ..parser import ENDSWITH_DARWIN
 from ua_extract.enums import AppType
 
 
@@ -19,9 +18,7 @@ class MobileApp(BaseClientParser):
             return True
         if check_all := super().check_all_regexes():
             return check_all
-        if ENDSWITH_DARWIN.search(self.user_agent_lower):
-            return True
-        return False
+        return self.context.ends_with_darwin()
 
 
 __all__ = [
@@ -2140,7 +2140,12 @@ class BaseDeviceParser(Parser):
         Brand has list of model regexes to parse
         """
         user_agent = self.user_agent
-        for model in self.ua_data.pop('models', []):
+        models = self.ua_data.pop('models', [])
+        if models and self.matched_position is not None:
+            # only the models with literals in the UA can match
+            models = self.model_index.entry_candidates(self.matched_position, self.user_agent_lower)
+
+        for model in models:
             if model_matched := model['regex'].search(user_agent):
                 self.ua_data |= {k: v.strip() for k, v in model.items() if k != 'regex'}
                 self.ua_data['model'] = perform_model_substitutions(
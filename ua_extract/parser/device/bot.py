@@ -1,20 +1,7 @@
 from .base import BaseDeviceParser
 from ua_extract.enums import DeviceType
-
-# Extracted from ^(?:chrome|firefox|Abcd|Dark|KvshClient|Node.js|Report Runner|url|Zeus|ZmEu)$
-GENERIC_BOT_UAS = {
-    'chrome',
-    'firefox',
-    'abcd',
-    'dark',
-    'kvshclient',
-    'node.js',
-    'report runner',
-    'url',
-    'zeus',
-    'zmeu',
-    'google',
-}
+from ...bot_index import BotIndex
+from ...settings import DDCache
 
 
 class Bot(BaseDeviceParser):
@@ -25,10 +12,34 @@ class Bot(BaseDeviceParser):
         'upstream/bots.yml',
     ]
 
-    def check_all_regexes(self) -> bool | list[str]:
-        if check_all := super().check_all_regexes():
-            return check_all
-        return self.user_agent_lower in GENERIC_BOT_UAS
+    @property
+    def literal_index(self) -> BotIndex:
+        """
+        Index of the literals each alternative of the regexes in
+        regex_list requires, and of the exact bot UAs.
+        """
+        try:
+            return DDCache['literal_index'][self.cache_name]
+        except KeyError:
+            pass
+
+        index = BotIndex([ua_data.get('regex') for ua_data in self.regex_list])
+        DDCache['literal_index'][self.cache_name] = index
+
+        return index
+
+    def _parse(self) -> None:
+        # UAs like "Zeus" or "Google" are bots without any further checks
+        if found := self.literal_index.exact_match(self.user_agent):
+            self.matched_position, self.matched_regex = found
+            ua_data = self.regex_list[self.matched_position]
+            self.ua_data |= {k: v for k, v in ua_data.items() if k != 'regex'}
+            self.known = True
+            return
+
+        # Other UAs are only searched with the regexes that have
+        # an alternative with literals in the UA, if there are any
+        super()._parse()
 
     def is_bot(self) -> bool:
         return self.matched_regex is not None
@@ -4,6 +4,7 @@ from ua_extract.enums import DeviceType
 
 class Camera(BaseDeviceParser):
     __slots__ = ()
+    REQUIRES_AC_MATCH = True
     DEVICE_TYPE = DeviceType.Camera
 
     fixture_files = [
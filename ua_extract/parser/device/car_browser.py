@@ -4,6 +4,7 @@ from ua_extract.enums import DeviceType
 
 class CarBrowser(BaseDeviceParser):
     __slots__ = ()
+    REQUIRES_AC_MATCH = True
     DEVICE_TYPE = DeviceType.CarBrowser
 
     fixture_files = [
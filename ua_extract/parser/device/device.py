@@ -1,6 +1,7 @@
 from .base import BaseDeviceParser
 from ua_extract.enums import DeviceType
 from ..parser import ENDSWITH_DARWIN, IPHONE_ONLY_UA
+from ...fragment_scanner import FragmentScanner
 from ...lazy_regex import RegexLazy, RegexLazyIgnore
 from .vendor_fragment import VendorFragment
 from ...settings import BOUNDED_REGEX
@@ -48,6 +49,35 @@ UA_CLIENT_HINTS_FRAGMENT = RegexLazyIgnore(
 )
 TELEGRAM_ANDROID = RegexLazy('Telegram-Android/')
 
+# Fragments searched by Device, all found with one scan of the UA.
+# Their literals are in the shared prefilter under DEVICE_FRAGMENTS_OWNER.
+DEVICE_FRAGMENTS_OWNER = 'DeviceFragments'
+DEVICE_FRAGMENTS = FragmentScanner((
+    CHROME_FRAGMENT,
+    CHROME_MOBILE_FRAGMENT,
+    DESKTOP_FRAGMENT,
+    EXCLUDED_DESKTOP_FRAGMENT,
+    ANDROID_MOBILE_FRAGMENT,
+    ANDROID_VRF_FRAGMENT,
+    ANDROID_TABLET_FRAGMENT,
+    ANDROID_TV_FRAGMENT,
+    TOUCH_FRAGMENT,
+    GENERAL_TABLET_FRAGMENT,
+    TV_FRAGMENT,
+    TV_MINI_FRAGMENT,
+    TIZEN_TV_FRAGMENT,
+    PAD_TABLET_FRAGMENT,
+    PUFFIN_DESKTOP_FRAGMENT,
+    PUFFIN_PHONE_FRAGMENT,
+    PUFFIN_TABLET_FRAGMENT,
+    OPERA_TABLET_FRAGMENT,
+    OPERA_TV_FRAGMENT,
+    ENDSWITH_FIREFOX,
+    ENDSWITH_DARWIN,
+    UA_CLIENT_HINTS_FRAGMENT,
+    TELEGRAM_ANDROID,
+))
+
 
 class Device(BaseDeviceParser):
     """
@@ -56,7 +86,7 @@ class Device(BaseDeviceParser):
     It should not be subclassed!
     """
 
-    __slots__ = ()
+    __slots__ = ('_fragment_bits',)
 
     DEVICE_TYPE = DeviceType.Smartphone
 
@@ -64,6 +94,25 @@ class Device(BaseDeviceParser):
         'upstream/device/mobiles.yml',
     ]
 
+    def __init__(self, *args, **kwargs):  # type: ignore[no-untyped-def]
+        super().__init__(*args, **kwargs)
+
+        self._fragment_bits: int | None = None
+
+    def has_fragment(self, fragment: RegexLazy) -> bool:
+        """
+        Check if the fragment regex of DEVICE_FRAGMENTS is in the UA.
+        The UA is scanned for all the fragments on the first check.
+        """
+        if self._fragment_bits is None:
+            found_literals = None
+            if self.context.prefilter_hits is not None:
+                found_literals = self.context.prefilter_hits.literals(DEVICE_FRAGMENTS_OWNER)
+            self._fragment_bits = DEVICE_FRAGMENTS.scan(
+                self.user_agent, self.user_agent_lower, found_literals
+            )
+        return self._fragment_bits & DEVICE_FRAGMENTS.bit(fragment) != 0
+
     def check_all_regexes(self) -> bool | list[str]:
         # Match relatively generic UAs like:
         # UCWEB/2.0 (MIDP-2.0; U; zh-CN; IQ4406) U2/1.0.0 UCBrowser/3.4.3.532 U2/1.0.0 Mobile
@@ -83,17 +132,17 @@ class Device(BaseDeviceParser):
         if self.user_agent_lower.startswith('iphone'):
             return IPHONE_ONLY_UA.match(self.user_agent) is not None
 
-        if ENDSWITH_FIREFOX.search(self.user_agent) is not None:
+        if self.has_fragment(ENDSWITH_FIREFOX):
             return True
 
-        if ENDSWITH_DARWIN.search(self.user_agent) is not None:
+        if self.has_fragment(ENDSWITH_DARWIN):
             return True
 
         return self.user_agent_lower == 'msdw'
 
     def has_user_agent_client_hints_fragment(self) -> bool:
-        if UA_CLIENT_HINTS_FRAGMENT.search(self.user_agent):
-            if not TELEGRAM_ANDROID.search(self.user_agent):
+        if self.has_fragment(UA_CLIENT_HINTS_FRAGMENT):
+            if not self.has_fragment(TELEGRAM_ANDROID):
                 return True
         return False
 
@@ -108,42 +157,15 @@ class Device(BaseDeviceParser):
         ch = self.client_hints
         ch_model = ch.model if ch else None
 
-        # ------------------------------------------------
-        # Complete copy of the superclass _parse method
-        for ua_data in self.regex_list:
-            if self.known:
-                break
-            if matched := ua_data['regex'].search(self.user_agent):
-                self.matched_regex = matched
+        # Client hint models are checked against every brand, so
+        # only look up the first matching UA regex when there's no model.
+        if not ch_model:
+            if found := self.match_regex_list():
+                self.matched_position, ua_data, self.matched_regex = found
                 self.ua_data |= {k: v for k, v in ua_data.items() if k != 'regex'}
                 self.known = True
-            elif ch_model:
-                main_fixture_dtype = ua_data.get('device')
-                if ua_models := ua_data.get('models', []):
-                    for model_data in ua_models:
-                        if self.known:
-                            break
-                        model_fixture_dtype = model_data.get('device', main_fixture_dtype)
-                        if not compatible_device_type(model_fixture_dtype, self.DEVICE_TYPE):
-                            continue
-                        matched = model_data['regex'].search(ch_model)
-                        if matched:
-                            self.matched_regex = matched
-                            self.known = True
-                            ua_data = {
-                                k: v for k, v in ua_data.items() if k != 'regex' and k != 'models'
-                            }
-                            ua_data['model'] = model_data['model']
-                            ua_data['device'] = model_fixture_dtype
-                            self.ua_data = ua_data
-
-                elif main_fixture_dtype == self.DEVICE_TYPE and (
-                    matched := ua_data['regex'].search(ch_model)
-                ):
-                    self.matched_regex = matched
-                    self.ua_data |= {k: v for k, v in ua_data.items() if k != 'regex'}
-                    self.known = True
-        # ------------------------------------------------
+        else:
+            self.match_client_hints_model(ch_model)
 
         if not self.ua_data and ch:
             self.ua_data |= {
@@ -154,7 +176,12 @@ class Device(BaseDeviceParser):
 
         if not self.ua_data.get('brand'):
             # If no brand info was found, check known fragments
-            vendor_fragment = VendorFragment(self.user_agent, self.client_hints).parse().ua_data
+            vendor_parser = VendorFragment(
+                self.user_agent,
+                self.client_hints,
+                context=self.context,
+            )
+            vendor_fragment = vendor_parser.parse().ua_data
             if vendor_fragment:
                 self.ua_data |= vendor_fragment
 
@@ -165,11 +192,63 @@ class Device(BaseDeviceParser):
         # if ac_matched and not isinstance(ac_matched, bool):
         #     print(f'{self.cache_name}: Unwanted AC Match is {ac_matched}')
 
+    def match_client_hints_model(self, ch_model: str) -> None:
+        """
+        Find the first entry whose regex matches the UA, or whose
+        models match the client hints model.
+
+        Only entries with literals of their regex or models in the UA or
+        the model are checked, in the order of the regex list, so the
+        first match is the same as when checking every entry.
+        """
+        user_agent = self.user_agent
+        regex_list = self.regex_list
+        ch_model_lower = ch_model.lower()
+        model_candidates = self.model_index.candidates(ch_model_lower)
+
+        positions = set(self.regex_candidates())
+        positions.update(self.literal_index.candidates(ch_model_lower))
+        positions.update(model_candidates)
+
+        for position in sorted(positions):
+            ua_data = regex_list[position]
+            if matched := ua_data['regex'].search(user_agent):
+                self.matched_position = position
+                self.matched_regex = matched
+                self.ua_data |= {k: v for k, v in ua_data.items() if k != 'regex'}
+                self.known = True
+                return
+
+            main_fixture_dtype = ua_data.get('device')
+            if ua_data.get('models'):
+                for model_data in model_candidates.get(position, ()):
+                    model_fixture_dtype = model_data.get('device', main_fixture_dtype)
+                    if not compatible_device_type(model_fixture_dtype, self.DEVICE_TYPE):
+                        continue
+                    if matched := model_data['regex'].search(ch_model):
+                        self.matched_regex = matched
+                        self.known = True
+                        ua_data = {
+                            k: v for k, v in ua_data.items() if k != 'regex' and k != 'models'
+                        }
+                        ua_data['model'] = model_data['model']
+                        ua_data['device'] = model_fixture_dtype
+                        self.ua_data = ua_data
+                        return
+
+            elif main_fixture_dtype == self.DEVICE_TYPE and (
+                matched := ua_data['regex'].search(ch_model)
+            ):
+                self.matched_regex = matched
+                self.ua_data |= {k: v for k, v in ua_data.items() if k != 'regex'}
+                self.known = True
+                return
+
     def is_tablet(self) -> bool:
         """
         Check for various tablet fragments.
         """
-        return PAD_TABLET_FRAGMENT.search(self.user_agent) is not None
+        return self.has_fragment(PAD_TABLET_FRAGMENT)
 
     def check_android_device(
         self,
@@ -191,18 +270,17 @@ class Device(BaseDeviceParser):
 
         if not self.matched_regex:
             # All devices containing VR fragment are assumed to be a wearable
-            if ANDROID_VRF_FRAGMENT.search(self.user_agent) is not None:
+            if self.has_fragment(ANDROID_VRF_FRAGMENT):
                 return DeviceType.Wearable
 
             # Some UA contain the fragment 'Android; Tablet;' or 'Opera Tablet',
             # so we assume those devices as tablets
-            if (
-                ANDROID_TABLET_FRAGMENT.search(self.user_agent) is not None
-                or OPERA_TABLET_FRAGMENT.search(self.user_agent) is not None
+            if self.has_fragment(ANDROID_TABLET_FRAGMENT) or self.has_fragment(
+                OPERA_TABLET_FRAGMENT
             ):
                 return DeviceType.Tablet
 
-            if ANDROID_MOBILE_FRAGMENT.search(self.user_agent) is not None:
+            if self.has_fragment(ANDROID_MOBILE_FRAGMENT):
                 return DeviceType.Smartphone
 
             # Chrome on Android passes the device type based on the keyword 'Mobile'
@@ -211,8 +289,8 @@ class Device(BaseDeviceParser):
             # Note: We do not check for browser (family) here, as there might be mobile apps using
             #       Chrome, that won't have a detected browser, but can still be detected.
             #       So we check the useragent for Chrome instead.
-            if CHROME_FRAGMENT.search(self.user_agent) is not None:
-                if CHROME_MOBILE_FRAGMENT.search(self.user_agent) is not None:
+            if self.has_fragment(CHROME_FRAGMENT):
+                if self.has_fragment(CHROME_MOBILE_FRAGMENT):
                     return DeviceType.Smartphone
                 return DeviceType.Tablet
 
@@ -242,17 +320,17 @@ class Device(BaseDeviceParser):
 
         # All devices running Puffin Secure Browser that contain
         # letter 'D' are assumed to be desktops
-        if PUFFIN_DESKTOP_FRAGMENT.search(self.user_agent) is not None:
+        if self.has_fragment(PUFFIN_DESKTOP_FRAGMENT):
             return DeviceType.Desktop
 
         # All devices running Puffin Web Browser that contain
         # letter 'P' are assumed to be smartphones
-        if PUFFIN_PHONE_FRAGMENT.search(self.user_agent) is not None:
+        if self.has_fragment(PUFFIN_PHONE_FRAGMENT):
             return DeviceType.Smartphone
 
         # All devices running Puffin Web Browser that contain
         # letter 'T' are assumed to be tablets
-        if PUFFIN_TABLET_FRAGMENT.search(self.user_agent) is not None:
+        if self.has_fragment(PUFFIN_TABLET_FRAGMENT):
             return DeviceType.Tablet
 
         return None
@@ -266,21 +344,21 @@ class Device(BaseDeviceParser):
             return True
 
         # All devices running Opera TV Store are assumed to be a tv
-        if OPERA_TV_FRAGMENT.search(self.user_agent) is not None:
+        if self.has_fragment(OPERA_TV_FRAGMENT):
             return True
 
-        if ANDROID_TV_FRAGMENT.search(self.user_agent) is not None:
+        if self.has_fragment(ANDROID_TV_FRAGMENT):
             return True
 
         # All devices running Tizen TV or SmartTV are assumed to be a tv
-        if TIZEN_TV_FRAGMENT.search(self.user_agent) is not None:
+        if self.has_fragment(TIZEN_TV_FRAGMENT):
             return True
 
         # All devices containing TV fragment are assumed to be a tv
-        if TV_MINI_FRAGMENT.search(self.user_agent) is not None:
+        if self.has_fragment(TV_MINI_FRAGMENT):
             return True
 
-        if TV_FRAGMENT.search(self.user_agent) is not None:
+        if self.has_fragment(TV_FRAGMENT):
             return True
 
         return False
@@ -289,13 +367,12 @@ class Device(BaseDeviceParser):
         if os_name in ALWAYS_DESKTOP_OS:
             return True
 
-        if os_name not in DESKTOP_OS or GENERAL_TABLET_FRAGMENT.search(self.user_agent) is not None:
+        if os_name not in DESKTOP_OS or self.has_fragment(GENERAL_TABLET_FRAGMENT):
             return False
 
         # Returns if the parsed UA contains the 'Windows NT;' or 'X11; Linux x86_64' fragments
-        fragment = (
-            DESKTOP_FRAGMENT.search(self.user_agent) is not None
-            and EXCLUDED_DESKTOP_FRAGMENT.search(self.user_agent) is None
+        fragment = self.has_fragment(DESKTOP_FRAGMENT) and not self.has_fragment(
+            EXCLUDED_DESKTOP_FRAGMENT
         )
         return fragment or os_name == 'Mac' or ' Desktop' in self.user_agent
 
@@ -320,7 +397,7 @@ class Device(BaseDeviceParser):
         if self.matched_regex:
             return False
         if os_name == 'Windows RT' or (os_name == 'Windows' and os_version.startswith('8')):
-            return TOUCH_FRAGMENT.search(self.user_agent) is not None
+            return self.has_fragment(TOUCH_FRAGMENT)
         return False
 
     def dtype(self) -> DeviceType | str:
@@ -373,7 +450,7 @@ class Device(BaseDeviceParser):
         return f'{self.model()} {self.dtype()}'
 
 
-def compatible_device_type(actual: str, target: str) -> bool:
+def compatible_device_type(actual: str | None, target: str) -> bool:
     """
     When iterating over model regexes, we need to skip regexes
     where the device type isn't compatible with the class being checked.
@@ -8,6 +8,7 @@ FACEBOOK_NOTEBOOK_FRAGMENT = RegexLazy(BOUNDED_REGEX.format('FBMD/'))
 
 class Notebook(BaseDeviceParser):
     __slots__ = ()
+    REQUIRES_AC_MATCH = True
     DEVICE_TYPE = DeviceType.Desktop
 
     fixture_files = [
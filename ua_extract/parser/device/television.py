@@ -1,8 +1,9 @@
 from .base import BaseDeviceParser
 from ua_extract.enums import DeviceType
 from typing import Any
-from ...lazy_regex import RegexLazyIgnore
-from ...settings import BOUNDED_REGEX, DDCache
+from ...lazy_regex import RegexLazyIgnore, bounded_regex
+from ..parse_context import ParseContext
+from ...settings import DDCache
 
 HBBTV_FRAGMENT = RegexLazyIgnore(r'(?:HbbTV|SmartTvA)/([1-9]{1}(?:\.[0-9]{1}){1,2})')
 SHELL_TV_FRAGMENT = RegexLazyIgnore(r'[ _]Shell[ _]\w{6}|tclwebkit(\d+[.\d]*)')
@@ -66,12 +67,12 @@ class HbbTv(BaseTvParser):
         for brand, stats in regexes.items():
             brand_data = {
                 'brand': brand,
-                'regex': RegexLazyIgnore(BOUNDED_REGEX.format(stats['regex'])),
+                'regex': bounded_regex(stats['regex'], self.CASE_FOLDED_REGEXES),
                 'device': stats['device'],
             }
             if 'models' in stats:
                 for model in stats['models']:
-                    model['regex'] = RegexLazyIgnore(BOUNDED_REGEX.format(model['regex']))
+                    model['regex'] = bounded_regex(model['regex'], self.CASE_FOLDED_REGEXES)
                 brand_data['models'] = stats['models']
             if 'model' in stats:
                 brand_data['model'] = stats['model']
@@ -81,6 +82,10 @@ class HbbTv(BaseTvParser):
 
         return reg_list
 
+    @classmethod
+    def can_match(cls, context: ParseContext) -> bool:
+        return HBBTV_FRAGMENT.search(context.user_agent) is not None
+
     def _parse(self) -> None:
         if self.is_hbbtv():
             super()._parse()
@@ -93,6 +98,10 @@ class ShellTv(BaseTvParser):
         'upstream/device/shell_tv.yml',
     ]
 
+    @classmethod
+    def can_match(cls, context: ParseContext) -> bool:
+        return SHELL_TV_FRAGMENT.search(context.user_agent) is not None
+
     def _parse(self) -> None:
         if self.is_shell_tv():
             super()._parse()
@@ -30,15 +30,18 @@ class VendorFragment(BaseDeviceParser):
         return reg_list
 
     def _parse(self) -> None:
-        user_agent = self.user_agent
-        for ua_data in self.regex_list:
-            for vendor in ua_data['regexes']:
-                if matched := vendor.search(user_agent):
-                    self.matched_regex = matched
-                    self.ua_data = {k: v for k, v in ua_data.items() if k != 'regexes'}
-                    self.known = True
-
-                    return
+        found_literals = None
+        if self.context.prefilter_hits is not None:
+            found_literals = self.context.prefilter_hits.literals(self.cache_name)
+
+        # First brand in the order of the fixture with a regex found in the UA
+        if found := self.fragment_table.first_match(
+            self.user_agent, self.user_agent_lower, found_literals
+        ):
+            position, self.matched_regex = found
+            ua_data = self.regex_list[position]
+            self.ua_data = {k: v for k, v in ua_data.items() if k != 'regexes'}
+            self.known = True
 
 
 __all__ = [
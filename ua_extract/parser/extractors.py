@@ -33,6 +33,8 @@ class ApplicationIDExtractor(RegexLoader):
 
     key = 'app_id'
 
+    __slots__ = ('_app_id_pretty_names', 'details', 'user_agent')
+
     def __init__(self, user_agent: str) -> None:
         self.user_agent = user_agent
         self.details: dict[str, str] = {}
@@ -2,6 +2,7 @@ import regex
 from typing import NamedTuple
 
 from ..lazy_regex import RegexLazyIgnore
+from ..regex_literals import anchored_first_characters, required_characters
 from .settings import SKIP_PREFIXES
 
 CONTAINS_URL = RegexLazyIgnore(
@@ -89,6 +90,41 @@ SKIP_NAME_REGEXES = [
 # fmt: on
 
 
+def from_name_runs(pattern: str) -> str:
+    """
+    Pattern starting with a greedy (?P<name>[...]+) run, only tried where a
+    run of its name characters starts, or where the previous match ended.
+
+    A match starting inside a run would also match from the start of that
+    run, which is tried first, so the matches are the same, without trying
+    to match the rest of the pattern after every suffix of every run.
+    """
+    if not pattern.startswith('(?P<name>[') or ']+)' not in pattern:
+        return pattern
+    name_class = pattern[len('(?P<name>') : pattern.index(']+)') + 1]
+    return rf'(?:\G|(?<!{name_class})){pattern}'
+
+
+# Lowercase characters that a UA must contain for each regex to match, and
+# the first characters of the UAs that anchored regexes match, if known
+VERSION_NAME_CHARACTERS = tuple(required_characters(rgx.pattern) for rgx in VERSION_NAME_REGEXES)
+VERSION_NAME_FIRST_CHARACTERS = tuple(
+    anchored_first_characters(rgx.pattern) for rgx in VERSION_NAME_REGEXES
+)
+NAME_VERSION_CHARACTERS = tuple(required_characters(rgx.pattern) for rgx in NAME_VERSION_REGEXES)
+NAME_VERSION_SEARCHES = tuple(
+    RegexLazyIgnore(from_name_runs(rgx.pattern)) for rgx in NAME_VERSION_REGEXES
+)
+
+
+def substring_characters(substring: str) -> set[str] | None:
+    """
+    Lowercase characters of the substring, or None if it isn't ASCII,
+    as the required characters only hold for ASCII strings.
+    """
+    return set(substring.lower()) if substring.isascii() else None
+
+
 class NameVersion(NamedTuple):
     name: str
     version: str
@@ -159,14 +195,20 @@ def extract_name_version_pairs(rgx: regex.Pattern, ua: str) -> tuple[list[CodeNa
     where key==name and value==version
     and return pairs along with unmatched portion of ua string.
     """
-    substring = ua
-
-    if matches := rgx.findall(ua):
-        substring = rgx.sub(' ', ua)
+    matches = []
+    unmatched = []
+    end = 0
+    # The same matches as findall, and the same substring as sub(' ', ua)
+    for matched in rgx.finditer(ua):
+        matches.append(NameVersion(matched.group('name'), matched.group('version')))
+        unmatched.append(ua[end : matched.start()])
+        end = matched.end()
 
-    pairs = scrub_name_version_pairs([NameVersion(*pair) for pair in matches])
+    if not matches:
+        return [], ua
 
-    return pairs, substring
+    unmatched.append(ua[end:])
+    return scrub_name_version_pairs(matches), ' '.join(unmatched)
 
 
 def key_value_pairs(ua: str) -> list[CodeNameVersion]:
@@ -174,13 +216,21 @@ def key_value_pairs(ua: str) -> list[CodeNameVersion]:
     Extract key/value pairs from User Agent String
     """
 
-    substring = CONTAINS_URL.sub(' ', ua)
+    substring = CONTAINS_URL.sub(' ', ua) if '://' in ua else ua
+    characters = substring_characters(substring)
+    first_character = substring[:1].lower()
 
     all_pairs = []
 
-    for rgx in VERSION_NAME_REGEXES:
-        pairs = extract_version_name_pairs(rgx, substring)
-        if pairs:
+    # Regexes are only searched if the substring has the characters they require
+    for rgx, required, first in zip(
+        VERSION_NAME_REGEXES, VERSION_NAME_CHARACTERS, VERSION_NAME_FIRST_CHARACTERS
+    ):
+        if characters is not None and not (
+            required <= characters and (first is None or first_character in first)
+        ):
+            continue
+        if pairs := extract_version_name_pairs(rgx, substring):
             all_pairs.extend(pairs)
 
     # <version>/<name> regexes will be much less common
@@ -188,9 +238,13 @@ def key_value_pairs(ua: str) -> list[CodeNameVersion]:
     if all_pairs:
         return all_pairs
 
-    for rgx in NAME_VERSION_REGEXES:
-        pairs, substring = extract_name_version_pairs(rgx, substring)
-        all_pairs.extend(pairs)
+    for rgx, required in zip(NAME_VERSION_SEARCHES, NAME_VERSION_CHARACTERS):
+        if characters is None or required <= characters:
+            pairs, remainder = extract_name_version_pairs(rgx, substring)
+            if remainder is not substring:
+                substring = remainder
+                characters = substring_characters(substring)
+            all_pairs.extend(pairs)
 
     return all_pairs
 
@@ -1,5 +1,6 @@
 from .parser import Parser
 from .os_fragment import OSFragment
+from ..fragment_scanner import FragmentScanner
 from ..lazy_regex import RegexLazyIgnore
 from .settings import (
     normalized_name,
@@ -29,8 +30,21 @@ WINDOWS_REGEX = RegexLazyIgnore(
 )
 x86_REGEX = RegexLazyIgnore(BOUNDED_REGEX.format('.*32bit|.*win32|(?:i[0-9]|x)86|i86pc'))
 
+# Platform regexes in order of priority, and the platform of each
+PLATFORM_FRAGMENTS = FragmentScanner((
+    ARM_REGEX,
+    LOONGARCH_REGEX,
+    MIPS_REGEX,
+    SUPERH_REGEX,
+    SPARK_REGEX,
+    WINDOWS_REGEX,
+    x86_REGEX,
+))
+PLATFORM_CODES = ('ARM', 'LoongArch64', 'MIPS', 'SuperH', 'SPARC64', 'x64', 'x86')
+
 
 class OS(Parser):
+    __slots__ = ()
     fixture_files = [
         'local/oss.yml',
         'upstream/oss.yml',
@@ -82,25 +96,19 @@ class OS(Parser):
                 return 'x86'
             return ch_architecture
 
-        user_agent = self.user_agent
-        for platform_regex, code in (
-            (ARM_REGEX, 'ARM'),
-            (LOONGARCH_REGEX, 'LoongArch64'),
-            (MIPS_REGEX, 'MIPS'),
-            (SUPERH_REGEX, 'SuperH'),
-            (SPARK_REGEX, 'SPARC64'),
-            (WINDOWS_REGEX, 'x64'),
-            (x86_REGEX, 'x86'),
-        ):
-            if platform_regex.search(user_agent):
-                return code
+        if found := PLATFORM_FRAGMENTS.first_match(self.user_agent, self.user_agent_lower):
+            return PLATFORM_CODES[found[0]]
 
         return ''
 
     def _parse(self) -> None:
         super()._parse()
         if not self.ua_data:
-            OSFragment(self.user_agent, self.client_hints).parse()
+            OSFragment(
+                self.user_agent,
+                self.client_hints,
+                context=self.context,
+            ).parse()
 
     def set_details(self) -> None:
         super().set_details()
@@ -4,6 +4,7 @@ from ..lazy_regex import RegexLazyIgnore
 
 
 class OSFragment(BaseDeviceParser):
+    __slots__ = ()
     fixture_files = [
         'local/osfragments.yml',
     ]
@@ -27,16 +28,16 @@ class OSFragment(BaseDeviceParser):
         return reg_list
 
     def _parse(self) -> None:
-        for ua_data in self.regex_list:
-            for regex in ua_data['regexes']:
-                matched = regex.search(self.user_agent)
-
-                if matched:
-                    self.matched_regex = matched
-                    self.ua_data['name'] = ua_data['name']
-                    self.known = True
-
-                    return
+        found_literals = None
+        if self.context.prefilter_hits is not None:
+            found_literals = self.context.prefilter_hits.literals(self.cache_name)
+
+        if found := self.fragment_table.first_match(
+            self.user_agent, self.user_agent_lower, found_literals
+        ):
+            position, self.matched_regex = found
+            self.ua_data['name'] = self.regex_list[position]['name']
+            self.known = True
 
 
 __all__ = [
@@ -0,0 +1,87 @@
+from typing import Any
+
+from ..lazy_regex import RegexLazyIgnore
+from ..prefilter import PrefilterHits
+from ..yaml_loader import app_pretty_names_types_data
+from .client_hints import ClientHints
+from .key_value_pairs import CodeNameVersion, key_value_pairs
+
+# Match regexes that ONLY values like:
+# iPhone12mini
+# iPhone8
+# iPhone6s
+IPHONE_ONLY_UA = RegexLazyIgnore(r'iPhone(\d{1,2})?(s?$|mini|SE|XR|XS)')
+
+ENDSWITH_DARWIN = RegexLazyIgnore(r'Darwin/(?:\d+[.\d]+)(?: \(x86_64\))?$')
+
+
+class ParseContext:
+    """
+    Details of one UA and its client hints that every parser needs.
+
+    DeviceDetector creates one context per UA and passes it to all of its
+    parsers, so the details are derived once instead of in each parser,
+    and the fragment checks and key/value pairs are computed on first use.
+    """
+
+    __slots__ = (
+        '_ends_with_darwin',
+        '_is_ios_fragment',
+        '_key_value_pairs',
+        'appdetails_data',
+        'batch_matches',
+        'ch_client_data',
+        'client_hints',
+        'prefilter_hits',
+        'user_agent',
+        'user_agent_lower',
+    )
+
+    def __init__(
+        self,
+        user_agent: str,
+        client_hints: ClientHints | None,
+        prefilter_hits: PrefilterHits | None = None,
+    ) -> None:
+        self.user_agent = user_agent
+        self.user_agent_lower = user_agent.lower()
+        self.client_hints = client_hints
+        self.ch_client_data: dict[str, Any] = client_hints.client_data() if client_hints else {}
+        self.appdetails_data = app_pretty_names_types_data()
+        self.prefilter_hits = prefilter_hits
+        # First matching regex positions of each parser, by cleaned UA,
+        # found by parse_batch for the batch of UAs this UA is part of
+        self.batch_matches: dict[str, dict[str, int | None]] | None = None
+        self._is_ios_fragment: bool | None = None
+        self._ends_with_darwin: bool | None = None
+        self._key_value_pairs: list[CodeNameVersion] | None = None
+
+    def is_ios_fragment(self) -> bool:
+        """
+        Check if UserAgent consists of iOS-related hardware.
+        """
+        if self._is_ios_fragment is None:
+            self._is_ios_fragment = IPHONE_ONLY_UA.match(self.user_agent_lower) is not None
+        return self._is_ios_fragment
+
+    def ends_with_darwin(self) -> bool:
+        """
+        Check if UserAgent ends with the Darwin version of Apple apps.
+        """
+        if self._ends_with_darwin is None:
+            self._ends_with_darwin = ENDSWITH_DARWIN.search(self.user_agent_lower) is not None
+        return self._ends_with_darwin
+
+    def key_value_pairs(self) -> list[CodeNameVersion]:
+        """
+        Key/value pairs of the UA, extracted once for all parsers.
+        """
+        if self._key_value_pairs is None:
+            self._key_value_pairs = key_value_pairs(self.user_agent)
+        return self._key_value_pairs
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.user_agent!r})'
+
+
+__all__ = ('ParseContext',)
@@ -1,4 +1,5 @@
 import regex
+from collections.abc import Iterable
 from typing import Any
 
 try:
@@ -6,18 +7,13 @@ try:
 except ImportError:
     from typing_extensions import Self
 
+from re import error as ReError
 from regex._regex_core import error as RegexError
-from ..lazy_regex import RegexLazyIgnore
+from ..settings import DDCache
+from ..substitution_template import substitution_template
 from .client_hints import ClientHints
-from ..yaml_loader import RegexLoader, app_pretty_names_types_data
-
-# Match regexes that ONLY values like:
-# iPhone12mini
-# iPhone8
-# iPhone6s
-IPHONE_ONLY_UA = RegexLazyIgnore(r'iPhone(\d{1,2})?(s?$|mini|SE|XR|XS)')
-
-ENDSWITH_DARWIN = RegexLazyIgnore(r'Darwin/(?:\d+[.\d]+)(?: \(x86_64\))?$')
+from .parse_context import ENDSWITH_DARWIN, IPHONE_ONLY_UA, ParseContext
+from ..yaml_loader import RegexLoader
 
 
 def build_version(version_str: str, truncation: int = 1) -> str:
@@ -51,6 +47,30 @@ class Parser(RegexLoader):
     UNKNOWN = 'UNK'
     UNKNOWN_NAME = 'Unknown'
 
+    # If this parser class can only match when one of its
+    # AhoCorasick words is in the UA, the DeviceDetector
+    # skips it when the shared prefilter found none of them.
+    # Leave disabled if check_all_regexes or _parse have
+    # any other conditions for parsing the UA.
+    REQUIRES_AC_MATCH = False
+
+    # Find the first matching regex by searching alternations of
+    # the whole regex list, instead of searching the candidate
+    # regexes one by one. See combined_regex.py for details.
+    COMBINED_REGEXES = False
+
+    # Find the first matching regex with one pass of a lazily built
+    # DFA of the regular regexes of regex_list, searching only the
+    # candidate regexes that aren't regular. See regex_dfa.py for details.
+    DFA_REGEXES = False
+
+    # Try the regexes that matched most often first, confirming that
+    # no candidate regex before a match also matches the UA. The regex
+    # profile is recorded with RECORD_REGEX_PROFILE, and can be saved
+    # and loaded. See regex_profile.py for details.
+    SPECULATIVE_REGEXES = False
+    RECORD_REGEX_PROFILE = False
+
     __slots__ = (
         'user_agent',
         'user_agent_lower',
@@ -59,6 +79,7 @@ class Parser(RegexLoader):
         'app_name',
         'app_name_no_punctuation',
         'matched_regex',
+        'matched_position',
         'app_version',
         'known',
         'secondary_client',
@@ -67,7 +88,7 @@ class Parser(RegexLoader):
         'os_details',
         'appdetails_data',
         'corasick',
-        '_is_ios_fragment',
+        'context',
     )
 
     def __init__(
@@ -75,47 +96,123 @@ class Parser(RegexLoader):
         ua: str,
         client_hints: ClientHints | None,
         os_details: dict[str, str] | None = None,
+        context: ParseContext | None = None,
     ) -> None:
         super().__init__()
 
+        # Details shared by the parsers of one UA and its client hints
+        if context is None:
+            context = ParseContext(ua, client_hints)
+
+        self.context = context
         self.user_agent = ua
-        self.user_agent_lower = ua.lower()
+        self.user_agent_lower = context.user_agent_lower
         self.ua_data: dict[str, Any] = {}
         self.app_name = ''
         self.app_name_no_punctuation = ''
         self.matched_regex = None
+        self.matched_position: int | None = None
         self.app_version = ''
         self.known = False
         self.secondary_client: dict[str, str] = {}
         self.client_hints = client_hints
-        self.ch_client_data = client_hints.client_data() if client_hints else {}
+        self.ch_client_data = context.ch_client_data
         self.os_details = os_details or {}
-        self.appdetails_data = app_pretty_names_types_data()
-        self._is_ios_fragment: bool | None = None
+        self.appdetails_data = context.appdetails_data
+
+    @classmethod
+    def can_match(cls, context: ParseContext) -> bool:
+        """
+        Override on subclasses that can tell from the parse context alone
+        that they won't parse any data from the UA, so that DeviceDetector
+        skips them without creating a parser.
+        """
+        return True
+
+    @classmethod
+    def has_regex_candidates(cls, context: ParseContext) -> bool:
+        """
+        Check if any regex of the literal index of the class could match
+        the UA. True until a parser of the class has loaded the index.
+        """
+        if (index := DDCache['literal_index'].get(cls.__name__)) is None:
+            return True
+
+        found_literals = None
+        if context.prefilter_hits is not None:
+            found_literals = context.prefilter_hits.literals(cls.__name__)
+
+        return bool(index.candidates(context.user_agent_lower, found_literals))
 
     def is_ios_fragment(self) -> bool:
         """
         Check if UserAgent consists of iOS-related hardware.
         """
-        if self._is_ios_fragment is None:
-            self._is_ios_fragment = IPHONE_ONLY_UA.match(self.user_agent_lower) is not None
-        return self._is_ios_fragment
+        return self.context.is_ios_fragment()
 
     def check_all_regexes(self) -> bool | list[str]:
+        hits = self.context.prefilter_hits
+        if hits is not None and (words := hits.words(self.cache_name)) is not None:
+            return words
+
         if not (corasick := self.load_ahocorasick_patterns()):
             return True
         return corasick.find_matches_as_strings(self.user_agent_lower)
 
+    def regex_candidates(self) -> Iterable[int]:
+        """
+        Positions in regex_list of the regexes that could match the UA.
+        """
+        found_literals = None
+        if self.context.prefilter_hits is not None:
+            found_literals = self.context.prefilter_hits.literals(self.cache_name)
+
+        return self.literal_index.candidates(self.user_agent_lower, found_literals)
+
+    def match_regex_list(self) -> tuple[int, dict[str, Any], regex.Match] | None:
+        """
+        Position and first entry of regex_list with a regex matching the UA, and its match.
+        """
+        user_agent = self.user_agent
+        regex_list = self.regex_list
+
+        batch_matches = None
+        if self.context.batch_matches is not None:
+            batch_matches = self.context.batch_matches.get(self.cache_name)
+        if batch_matches is not None and user_agent in batch_matches:
+            # First matching regex found by parse_batch for a batch of UAs
+            if (position := batch_matches[user_agent]) is None:
+                return None
+            found = position, regex_list[position]['regex'].search(user_agent)
+        elif self.COMBINED_REGEXES:
+            found = self.combined_regex.first_match(user_agent)
+        elif self.DFA_REGEXES:
+            found = self.regex_dfa.first_match(user_agent, self.regex_candidates())
+        elif self.SPECULATIVE_REGEXES:
+            found = self.regex_profile.first_match(user_agent, self.regex_candidates())
+        else:
+            found = None
+            for position in self.regex_candidates():
+                if matched := regex_list[position]['regex'].search(user_agent):
+                    found = position, matched
+                    break
+
+        if found is None:
+            return None
+
+        position, matched = found
+        if self.RECORD_REGEX_PROFILE:
+            self.regex_profile.record(position)
+        return position, regex_list[position], matched
+
     def _parse(self) -> None:
         """Override on subclasses if custom parsing is required"""
-        user_agent = self.user_agent
         if ac_matched := self.check_all_regexes():  # noqa
-            for ua_data in self.regex_list:
-                if matched := ua_data['regex'].search(user_agent):
-                    self.matched_regex = matched
-                    self.ua_data |= {k: v for k, v in ua_data.items() if k != 'regex'}
-                    self.known = True
-                    return
+            if found := self.match_regex_list():
+                self.matched_position, ua_data, self.matched_regex = found
+                self.ua_data |= {k: v for k, v in ua_data.items() if k != 'regex'}
+                self.known = True
+                return
 
             # Uncomment lines for debugging.
             # If too many ACs are matching when the full regex list failed,
@@ -212,14 +309,24 @@ def perform_substitutions(substring: str, regex_match: regex.Match, separator: s
     """
     Substitute the captured value from the regex for the regex placeholder.
     """
+    template = substitution_template(substring)
+    if template.expandable:
+        try:
+            value = template.expand(regex_match)
+        except IndexError:
+            return substring
+        return value.replace('_', separator).strip(' .')
+
+    # Match of the regex module or stdlib re, see compile_regex,
+    # or FoldedMatch that substitutes with the original case
     regex_pattern = regex_match.re
-    capture = regex_match.captures()[0]
+    capture = regex_match.group()
     try:
         value = regex_pattern.sub(substring, capture)
         if value.endswith(('\\g<1>', '\\g<2>')):
             value = value[: value.rfind('\\g<')]
         return value.replace('_', separator).strip(' .')
-    except RegexError:
+    except (RegexError, ReError):
         return substring
 
 
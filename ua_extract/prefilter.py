@@ -0,0 +1,117 @@
+from collections.abc import Iterable, Mapping
+
+import ahocorasick_rs
+
+
+class PrefilterHits:
+    """
+    Words and literals of each parser class found in one UA string.
+    """
+
+    __slots__ = ('found_literals', 'found_words', 'literal_owners', 'word_owners')
+
+    def __init__(
+        self,
+        found_words: dict[str, list[str]],
+        found_literals: dict[str, list[str]],
+        word_owners: frozenset[str],
+        literal_owners: frozenset[str],
+    ) -> None:
+        self.found_words = found_words
+        self.found_literals = found_literals
+        self.word_owners = word_owners
+        self.literal_owners = literal_owners
+
+    def words(self, owner: str) -> list[str] | None:
+        """
+        AhoCorasick words of the owner class found in the UA.
+
+        None if the owner has no words in the shared automaton,
+        in which case the owner must scan the UA by itself.
+        """
+        if owner not in self.word_owners:
+            return None
+        return self.found_words.get(owner, [])
+
+    def literals(self, owner: str) -> list[str] | None:
+        """
+        Literal index entries of the owner class found in the UA.
+        """
+        if owner not in self.literal_owners:
+            return None
+        return self.found_literals.get(owner, [])
+
+
+class SharedPrefilter:
+    """
+    One AhoCorasick automaton holding the words and required literals of
+    several parser classes, each pattern tagged with the classes owning
+    it. Scanning a UA once gives the hits of every class, instead of
+    every class scanning the same UA with its own automaton.
+    """
+
+    __slots__ = ('automaton', 'literal_owners', 'owners', 'patterns', 'word_owners')
+
+    def __init__(
+        self,
+        words: Mapping[str, Iterable[str]],
+        literals: Mapping[str, Iterable[str]],
+    ) -> None:
+        pattern_ids: dict[str, int] = {}
+        word_owners: list[list[str]] = []
+        literal_owners: list[list[str]] = []
+
+        for owners_by_id, patterns_by_owner in (
+            (word_owners, words),
+            (literal_owners, literals),
+        ):
+            for owner, patterns in patterns_by_owner.items():
+                for pattern in patterns:
+                    if (pattern_id := pattern_ids.get(pattern)) is None:
+                        pattern_id = pattern_ids[pattern] = len(pattern_ids)
+                        word_owners.append([])
+                        literal_owners.append([])
+                    owners_by_id[pattern_id].append(owner)
+
+        self.patterns = tuple(pattern_ids)
+        self.word_owners = tuple(tuple(owners) for owners in word_owners)
+        self.literal_owners = tuple(tuple(owners) for owners in literal_owners)
+        self.owners = (
+            frozenset(owner for owner, patterns in words.items() if patterns),
+            frozenset(owner for owner, patterns in literals.items() if patterns),
+        )
+        self.automaton = ahocorasick_rs.AhoCorasick(self.patterns) if self.patterns else None
+
+    def scan(self, user_agent_lower: str) -> PrefilterHits:
+        """
+        Find the words and literals of all classes in the lowercased UA.
+        """
+        found_words: dict[str, list[str]] = {}
+        found_literals: dict[str, list[str]] = {}
+
+        if self.automaton is not None:
+            patterns = self.patterns
+            word_owners = self.word_owners
+            literal_owners = self.literal_owners
+            for pattern_id in {
+                match[0]
+                for match in self.automaton.find_matches_as_indexes(
+                    user_agent_lower, overlapping=True
+                )
+            }:
+                pattern = patterns[pattern_id]
+                for owner in word_owners[pattern_id]:
+                    found_words.setdefault(owner, []).append(pattern)
+                for owner in literal_owners[pattern_id]:
+                    found_literals.setdefault(owner, []).append(pattern)
+
+        return PrefilterHits(found_words, found_literals, *self.owners)
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+
+__all__ = (
+    'PrefilterHits',
+    'SharedPrefilter',
+)
@@ -0,0 +1,224 @@
+r"""
+Parse large batches of UAs by searching each regex of a regex list once
+in all the UAs that no earlier regex matched, instead of searching the
+regexes one by one for each UA.
+
+The UAs are joined with newlines into one buffer, which each regex
+searches with finditer in MULTILINE mode, so that ^ and $ match at the
+start and end of every UA. Matches are mapped back to their UAs by the
+offsets of the UAs in the buffer. Every UA with a match in the buffer,
+or overlapped by a match that runs past the end of another UA, is then
+searched by itself to confirm the match, as the newlines let matches
+of classes such as [^/] or \s span UAs. Regexes with lookarounds or
+\A and \Z anchors, which can see past the newlines, are searched in
+each UA by itself. Only the candidate UAs of each regex by the literal
+index are joined, and the UAs drop out once a regex matches them.
+
+parse_batch finds the first matching regex of every regex list for all
+the UAs this way, and then parses each UA with DeviceDetector, taking
+the first matching regexes from the batch.
+"""
+
+import re
+from bisect import bisect_right
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Any
+
+import regex
+from regex import IGNORECASE, MULTILINE
+
+from .device_detector import DeviceDetector, ParserClass
+from .lazy_regex import RegexFolded, RegexLiteral, prefer_stdlib
+from .regex_literals import LiteralIndex, starts_with_literal
+from .settings import DDCache
+from .utils import clean_ua
+
+# Number of UAs parsed in one batch
+BATCH_SIZE = 10000
+
+# Regexes with fewer candidate UAs search each of them by itself
+MIN_BUFFERED_UAS = 16
+
+# Syntax that sees the text around a match, so can't be searched in the buffer
+UNBATCHED_SYNTAX = ('(?=', '(?!', '(?<=', '(?<!', '\\A', '\\Z', '\\z', '\\G')
+
+
+def batch_regex(regex_entry: Any) -> 're.Pattern[str] | regex.Pattern | None':
+    """
+    Compile the regex to search the lowercased buffer, or None if it
+    must search each UA by itself. Each match in a UA that the regex
+    matches is also a match of the compiled regex.
+
+    Lowercased regexes are searched without the left boundary if they
+    start with a literal, like RegexFolded does, and literals are found
+    faster in each UA.
+    """
+    if isinstance(regex_entry, RegexLiteral):
+        return None
+
+    cache = DDCache['batch_regexes']
+    pattern = regex_entry.pattern
+    if pattern in cache:
+        return cache[pattern]
+
+    compiled: re.Pattern[str] | regex.Pattern | None = None
+    if isinstance(regex_entry, RegexFolded):
+        batch_pattern = regex_entry.folded_pattern
+        if regex_entry.scan_pattern is not None and starts_with_literal(regex_entry.scan_pattern):
+            batch_pattern = regex_entry.scan_pattern
+        if not any(syntax in batch_pattern for syntax in UNBATCHED_SYNTAX):
+            if prefer_stdlib(pattern, IGNORECASE):
+                try:
+                    compiled = re.compile(batch_pattern, re.MULTILINE)
+                except (re.error, OverflowError, RecursionError):
+                    pass
+            if compiled is None:
+                compiled = regex.compile(batch_pattern, MULTILINE)
+    elif not any(syntax in pattern for syntax in UNBATCHED_SYNTAX):
+        compiled = regex.compile(pattern, regex_entry.flags | MULTILINE)
+
+    cache[pattern] = compiled
+    return compiled
+
+
+class UABuffer:
+    """
+    The lowercased UAs at some indexes joined with newlines, with the
+    offset of each UA in the buffer.
+    """
+
+    __slots__ = ('ends', 'indexes', 'starts', 'text')
+
+    def __init__(self, user_agents_lower: list[str], indexes: list[int]) -> None:
+        self.indexes = indexes
+        self.text = '\n'.join([user_agents_lower[index] for index in indexes])
+        self.starts = []
+        self.ends = []
+        offset = 0
+        for index in indexes:
+            self.starts.append(offset)
+            offset += len(user_agents_lower[index])
+            self.ends.append(offset)
+            offset += 1
+
+    def matching_indexes(self, compiled: 're.Pattern[str] | regex.Pattern') -> set[int]:
+        """
+        Indexes of the UAs that may match the regex: those where a match
+        in the buffer starts, or the newline before them, and the UAs
+        that a match runs into.
+        """
+        starts = self.starts
+        ends = self.ends
+        indexes = self.indexes
+        found = set()
+
+        for match in compiled.finditer(self.text):
+            # A match starting at the newline before a UA belongs to the UA
+            slot = bisect_right(starts, match.start() + 1) - 1
+            found.add(indexes[slot])
+            if match.end() > ends[slot]:
+                last = bisect_right(starts, match.end()) - 1
+                found.update(indexes[slot + 1 : last + 1])
+
+        return found
+
+
+def batch_first_matches(
+    regexes: list[Any], user_agents: list[str], index: LiteralIndex
+) -> list[int | None]:
+    """
+    Position of the first regex that matches each UA, or None. The UAs
+    are only searched with their candidate regexes of the literal index.
+    """
+    first: list[int | None] = [None] * len(user_agents)
+    user_agents_lower = [user_agent.lower() for user_agent in user_agents]
+    candidates = defaultdict(list)
+
+    for ua_index, user_agent in enumerate(user_agents):
+        positions = index.candidates(user_agents_lower[ua_index])
+        if user_agent.isascii() and '\n' not in user_agent:
+            for position in positions:
+                candidates[position].append(ua_index)
+            continue
+
+        # Lowercasing changes the length of other UAs, and
+        # newlines would split them in the buffer
+        for position in positions:
+            if (regex_entry := regexes[position]) is not None and regex_entry.search(user_agent):
+                first[ua_index] = position
+                break
+
+    resolved = set()
+    for position, regex_entry in enumerate(regexes):
+        if regex_entry is None or position not in candidates:
+            continue
+
+        pending = [ua_index for ua_index in candidates[position] if ua_index not in resolved]
+        if len(pending) >= MIN_BUFFERED_UAS and (compiled := batch_regex(regex_entry)):
+            matching = UABuffer(user_agents_lower, pending).matching_indexes(compiled)
+            pending = [ua_index for ua_index in pending if ua_index in matching]
+
+        for ua_index in pending:
+            if regex_entry.search(user_agents[ua_index]):
+                first[ua_index] = position
+                resolved.add(ua_index)
+
+    return first
+
+
+def batch_parsers(
+    skip_bot_detection: bool = False, skip_device_detection: bool = False
+) -> tuple[ParserClass, ...]:
+    """
+    Parser classes with regex lists that DeviceDetector may search.
+    """
+    detector = DeviceDetector('', skip_bot_detection, skip_device_detection)
+    return tuple(Parser for Parser in detector.prefilter_parsers() if Parser.fixture_files)
+
+
+def parse_batch(
+    user_agents: Iterable[str],
+    skip_bot_detection: bool = False,
+    skip_device_detection: bool = False,
+    batch_size: int = BATCH_SIZE,
+) -> list[DeviceDetector]:
+    """
+    Parse the UAs with DeviceDetector, finding the first matching regexes
+    of the parsers for batches of UAs at once.
+    """
+    user_agents = list(user_agents)
+    parsers = batch_parsers(skip_bot_detection, skip_device_detection)
+    detectors = []
+
+    for start in range(0, len(user_agents), batch_size):
+        batch = user_agents[start : start + batch_size]
+        # The parsers search the cleaned UA of DeviceDetector
+        cleaned = list(
+            dict.fromkeys(clean_ua(user_agent, user_agent.lower()) for user_agent in batch)
+        )
+        batch_matches = {}
+        for Parser in parsers:
+            parser = Parser('', None)
+            regexes = [ua_data.get('regex') for ua_data in parser.regex_list]
+            first = batch_first_matches(regexes, cleaned, parser.literal_index)
+            batch_matches[parser.cache_name] = dict(zip(cleaned, first))
+
+        for user_agent in batch:
+            detector = DeviceDetector(user_agent, skip_bot_detection, skip_device_detection)
+            # Only the parsers of this batch's detectors see its first matches
+            context = detector.parse_context()
+            context.batch_matches = batch_matches
+            detectors.append(detector.parse())
+            context.batch_matches = None
+
+    return detectors
+
+
+__all__ = (
+    'UABuffer',
+    'batch_first_matches',
+    'batch_parsers',
+    'batch_regex',
+    'parse_batch',
+)
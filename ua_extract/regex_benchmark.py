@@ -0,0 +1,139 @@
+"""
+Benchmark the regexes of every fixture file with the regex module only,
+and with the engine that compile_regex chooses for each pattern.
+"""
+
+import re
+from collections.abc import Callable, Iterable
+from time import perf_counter
+from typing import Any, NamedTuple
+
+import regex
+from regex import IGNORECASE
+
+from .ahocorasick_words import ahocorasick_parsers
+from .device_detector import ParserClass
+from .lazy_regex import RegexLazyIgnore, StdlibRegex, compile_regex
+from .regex_literals import LiteralIndex
+from .settings import BOUNDED_REGEX
+
+
+class FixtureBenchmark(NamedTuple):
+    """
+    Seconds to compile the regexes of a fixture file and search the UAs
+    with them, as the parsers do.
+
+    stdlib: regexes that compile_regex compiles with stdlib re
+    searches: number of regex searches in the UAs
+    """
+
+    parser: str
+    fixture: str
+    regexes: int
+    stdlib: int
+    searches: int
+    regex_seconds: float
+    chosen_seconds: float
+
+
+def fixture_patterns(Parser: ParserClass, fixture: str) -> list[str]:
+    """
+    Bounded patterns of the regexes of one fixture file of the parser.
+    """
+    return [
+        RegexLazyIgnore(BOUNDED_REGEX.format(ua_data['regex'])).pattern
+        for ua_data in Parser('', None).yaml_to_list(f'regexes/{fixture}')
+        if 'regex' in ua_data
+    ]
+
+
+def parser_searches(patterns: list[str], user_agents: Iterable[str]) -> list[tuple[int, str]]:
+    """
+    (position, UA) pairs that a parser searches: the candidates of the
+    literal index in order, until the first regex that matches the UA.
+    """
+    index = LiteralIndex(list(patterns))
+    compiled: dict[int, regex.Pattern] = {}
+    searches = []
+
+    for user_agent in user_agents:
+        for position in index.candidates(user_agent.lower()):
+            searches.append((position, user_agent))
+            if (compiled_regex := compiled.get(position)) is None:
+                compiled_regex = regex.compile(patterns[position], IGNORECASE)
+                compiled[position] = compiled_regex
+            if compiled_regex.search(user_agent):
+                break
+
+    return searches
+
+
+def time_searches(
+    compile_pattern: Callable[[str, int], Any],
+    patterns: list[str],
+    searches: list[tuple[int, str]],
+) -> float:
+    """
+    Seconds to search the (position, UA) pairs, compiling each
+    pattern on first use like RegexLazy does.
+    """
+    re.purge()
+    regex.purge()
+    compiled: dict[int, Any] = {}
+
+    start = perf_counter()
+    for position, user_agent in searches:
+        if (compiled_regex := compiled.get(position)) is None:
+            compiled_regex = compile_pattern(patterns[position], IGNORECASE)
+            compiled[position] = compiled_regex
+        compiled_regex.search(user_agent)
+    return perf_counter() - start
+
+
+def benchmark_fixture_files(
+    user_agents: Iterable[str],
+    parsers: Iterable[ParserClass] | None = None,
+    message_callback: Callable[[str], None] = print,
+) -> list[FixtureBenchmark]:
+    """
+    Time the regexes of the fixture files of the parsers, for each engine.
+    """
+    user_agents = list(user_agents)
+    parsers = ahocorasick_parsers() if parsers is None else tuple(parsers)
+    benchmarks = []
+
+    for Parser in parsers:
+        for fixture in Parser.fixture_files:
+            patterns = fixture_patterns(Parser, fixture)
+            searches = parser_searches(patterns, user_agents)
+            searched = {position for position, _ in searches}
+            benchmark = FixtureBenchmark(
+                Parser.__name__,
+                fixture,
+                len(patterns),
+                sum(
+                    isinstance(compile_regex(patterns[position], IGNORECASE), StdlibRegex)
+                    for position in searched
+                ),
+                len(searches),
+                time_searches(regex.compile, patterns, searches),
+                time_searches(compile_regex, patterns, searches),
+            )
+            benchmarks.append(benchmark)
+
+            message_callback(
+                f'{fixture}: {benchmark.regexes} regexes, {len(searched)} searched '
+                f'({benchmark.stdlib} with stdlib re), {benchmark.searches} searches, '
+                f'regex {benchmark.regex_seconds:.3f}s, chosen {benchmark.chosen_seconds:.3f}s'
+            )
+
+    return benchmarks
+
+
+__all__ = (
+    'FixtureBenchmark',
+    'benchmark_fixture_files',
+    'fixture_patterns',
+    'parser_searches',
+    'time_searches',
+)
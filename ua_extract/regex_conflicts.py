@@ -0,0 +1,268 @@
+"""
+Reorder the regexes of a regex list by how often they match UAs,
+without changing the first matching regex of any UA.
+
+Only the order of two regexes that can match the same UA matters. A
+UA can contain the matches of any two regexes one after another, so
+two regexes can only be told apart by their ^ and $ anchors: regexes
+that must start (or end) the UA with different strings never match the
+same UA. Such pairs are confirmed by sampling UAs from the regexes with
+exrex, and every other pair of regexes keeps its order.
+"""
+
+import json
+from collections.abc import Iterable, Mapping
+from hashlib import sha1
+from heapq import heapify, heappop, heappush
+from typing import Any, NamedTuple
+
+import exrex
+
+from .regex_literals import anchored_affixes
+from .settings import DDCache
+
+# Number of UAs sampled from each regex to confirm that it can't match
+# the same UA as another regex
+SAMPLES = 20
+
+# Caches of regex lists that depend on the order of the regexes
+ORDERED_CACHES = (
+    'regexes',
+    'literal_index',
+    'model_index',
+    'fragment_tables',
+    'combined_regexes',
+    'regex_dfas',
+    'regex_hits',
+    'regex_profiles',
+)
+
+
+class RegexAnchors(NamedTuple):
+    """
+    Lowercase strings of which one starts (prefixes) or ends (suffixes)
+    every UA that the regex matches, or None if unknown.
+    """
+
+    prefixes: frozenset[str] | None
+    suffixes: frozenset[str] | None
+
+
+def regex_anchors(pattern: str) -> RegexAnchors:
+    """
+    Anchored affixes of the pattern that can tell apart the UAs it
+    matches. Affixes with other than ASCII characters or newlines are
+    left out, as case-insensitive matching and $ make them ambiguous.
+    """
+    prefixes = anchored_affixes(pattern)
+    suffixes = anchored_affixes(pattern, suffix=True)
+    return RegexAnchors(
+        prefixes if prefixes and all(affix.isascii() for affix in prefixes) else None,
+        suffixes
+        if suffixes and all(affix.isascii() and '\n' not in affix for affix in suffixes)
+        else None,
+    )
+
+
+def diverging_affixes(
+    first: frozenset[str] | None, second: frozenset[str] | None, suffix: bool = False
+) -> bool:
+    """
+    No string starts (or ends, with suffix) with one affix of each set.
+    """
+    if first is None or second is None:
+        return False
+    if suffix:
+        return not any(a.endswith(b) or b.endswith(a) for a in first for b in second)
+    return not any(a.startswith(b) or b.startswith(a) for a in first for b in second)
+
+
+def disjoint_anchors(first: RegexAnchors, second: RegexAnchors) -> bool:
+    """
+    The regexes of the anchors can't match the same UA.
+    """
+    return diverging_affixes(first.prefixes, second.prefixes) or diverging_affixes(
+        first.suffixes, second.suffixes, suffix=True
+    )
+
+
+def sample_user_agents(regex: Any, samples: int = SAMPLES) -> list[str]:
+    """
+    Random strings that the regex matches.
+    """
+    user_agents = (exrex.getone(regex.pattern, limit=8) for _ in range(samples))
+    return [user_agent for user_agent in user_agents if regex.search(user_agent)]
+
+
+class ConflictGraph:
+    """
+    Pairs of regexes of a regex list that can match the same UA. Only
+    the pairs that can't are stored, as they're far fewer: for each
+    position, the earlier positions that don't conflict with it.
+    """
+
+    __slots__ = ('disjoint', 'refuted', 'size')
+
+    def __init__(self, regexes: list[Any], samples: int = SAMPLES) -> None:
+        self.size = len(regexes)
+        self.disjoint: dict[int, set[int]] = {}
+        # Pairs with disjoint anchors that sampled UAs match both of
+        self.refuted: list[tuple[int, int]] = []
+
+        anchors = {
+            position: regex_anchors(regex.pattern)
+            for position, regex in enumerate(regexes)
+            if regex is not None
+        }
+        anchored = [
+            position
+            for position, entry_anchors in anchors.items()
+            if entry_anchors.prefixes or entry_anchors.suffixes
+        ]
+        sampled: dict[int, list[str]] = {}
+
+        for index, later in enumerate(anchored):
+            for earlier in anchored[:index]:
+                if not disjoint_anchors(anchors[earlier], anchors[later]):
+                    continue
+
+                for position in (earlier, later):
+                    if position not in sampled:
+                        sampled[position] = sample_user_agents(regexes[position], samples)
+                if any(regexes[later].search(ua) for ua in sampled[earlier]) or any(
+                    regexes[earlier].search(ua) for ua in sampled[later]
+                ):
+                    self.refuted.append((earlier, later))
+                    continue
+
+                self.disjoint.setdefault(later, set()).add(earlier)
+
+    def conflicts(self, first: int, second: int) -> bool:
+        """
+        The regexes at the positions may match the same UA.
+        """
+        earlier, later = sorted((first, second))
+        return earlier not in self.disjoint.get(later, ())
+
+    def reorder(self, hits: Mapping[int, int]) -> list[int]:
+        """
+        Positions of the regexes, with the regexes that matched most often
+        as early as the conflicts with the regexes before them allow.
+        Regexes that matched equally often keep their order.
+        """
+        # Number of earlier regexes that conflict and are still unplaced
+        blocking = [
+            position - len(self.disjoint.get(position, ())) for position in range(self.size)
+        ]
+        available = [
+            (-hits.get(position, 0), position)
+            for position in range(self.size)
+            if not blocking[position]
+        ]
+        heapify(available)
+        order = []
+
+        while available:
+            _, position = heappop(available)
+            order.append(position)
+            for later in range(position + 1, self.size):
+                if position in self.disjoint.get(later, ()):
+                    continue
+                blocking[later] -= 1
+                if not blocking[later]:
+                    heappush(available, (-hits.get(later, 0), later))
+
+        return order
+
+
+def regex_list_checksum(regex_list: list[dict[str, Any]]) -> str:
+    """
+    Checksum of the patterns of a regex list, to only reorder the
+    regex list that an order was built for.
+    """
+    patterns = '\n'.join(
+        ua_data['regex'].pattern if 'regex' in ua_data else '' for ua_data in regex_list
+    )
+    return sha1(patterns.encode(), usedforsecurity=False).hexdigest()
+
+
+def build_regex_orders(
+    parsers: Iterable[Any],
+    profiles: Mapping[str, Mapping[int, int]],
+    message_callback: Any = print,
+) -> dict[str, dict[str, Any]]:
+    """
+    Orders of the regex lists of the parsers by the recorded matches of
+    the regex profiles. Regex lists with entries that can match without
+    their regex, such as by the models of client hints, are left out.
+
+    The profiles must be recorded, and the orders built, without loaded
+    orders, as they refer to the positions of the regexes in the files.
+    """
+    orders = {}
+    for Parser in parsers:
+        parser = Parser('', None)
+        if (hits := profiles.get(parser.cache_name)) is None:
+            continue
+        if parser.cache_name in DDCache['regex_orders']:
+            message_callback(f'{parser.cache_name}: regexes already reordered, skipped')
+            continue
+
+        regex_list = parser.regex_list
+        if any('regex' not in ua_data or 'models' in ua_data for ua_data in regex_list):
+            message_callback(f'{parser.cache_name}: regexes without first match order, skipped')
+            continue
+
+        graph = ConflictGraph([ua_data['regex'] for ua_data in regex_list])
+        for earlier, later in graph.refuted:
+            message_callback(
+                f'{parser.cache_name}: sampled UAs match {earlier} and {later} '
+                'with disjoint anchors'
+            )
+
+        order = graph.reorder(hits)
+        moved = sum(position != original for position, original in enumerate(order))
+        message_callback(f'{parser.cache_name}: {moved} of {len(order)} regexes moved')
+        if moved:
+            orders[parser.cache_name] = {
+                'checksum': regex_list_checksum(regex_list),
+                'order': order,
+            }
+
+    return orders
+
+
+def save_regex_orders(orders: Mapping[str, Any], path: str) -> None:
+    """
+    Save the orders of build_regex_orders to a JSON file.
+    """
+    with open(path, 'w') as orders_file:
+        json.dump(orders, orders_file, indent=1, sort_keys=True)
+
+
+def load_regex_orders(path: str) -> None:
+    """
+    Load orders saved with save_regex_orders, which the regex lists of
+    the parsers use from then on, if their regexes are unchanged.
+    """
+    with open(path) as orders_file:
+        orders = json.load(orders_file)
+
+    DDCache['regex_orders'].update(orders)
+    for cache in ORDERED_CACHES:
+        for cache_name in orders:
+            DDCache[cache].pop(cache_name, None)
+
+
+__all__ = (
+    'ConflictGraph',
+    'RegexAnchors',
+    'build_regex_orders',
+    'disjoint_anchors',
+    'diverging_affixes',
+    'load_regex_orders',
+    'regex_anchors',
+    'regex_list_checksum',
+    'sample_user_agents',
+    'save_regex_orders',
+)
@@ -0,0 +1,473 @@
+"""
+Find the first regex of a fixture file that matches a UA with a DFA
+built from all the regexes that only use regular syntax: literals,
+classes, groups, alternations, repeats and the ^ and $ anchors.
+
+The DFA is the subset construction of a Thompson NFA of the regexes,
+built lazily while UAs are matched, as the DFA of a whole fixture file
+would have far too many states to build in advance. Each DFA state
+records the lowest position of a regex that has matched when the state
+is reached, so one pass over the UA finds the first matching regex.
+Only the regex at that position is searched, to get its groups.
+"""
+
+from collections.abc import Iterable
+from typing import Any
+
+import regex
+from regex import IGNORECASE
+
+try:
+    from re import _constants as sre_constants  # type: ignore[attr-defined]
+except ImportError:
+    import sre_constants  # type: ignore[no-redef]
+
+from .regex_literals import parse_pattern
+
+# Regexes with larger NFAs, after expanding counted repeats such as
+# [a-z]{1,20}, are matched one by one instead
+MAX_NFA_STATES = 2000
+
+# The DFA states are rebuilt from scratch once there are more than this
+MAX_DFA_STATES = 20000
+
+_LITERAL = sre_constants.LITERAL
+_NOT_LITERAL = sre_constants.NOT_LITERAL
+_IN = sre_constants.IN
+_ANY = sre_constants.ANY
+_BRANCH = sre_constants.BRANCH
+_SUBPATTERN = sre_constants.SUBPATTERN
+_AT = sre_constants.AT
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+_MAXREPEAT = sre_constants.MAXREPEAT
+_AT_START = {sre_constants.AT_BEGINNING, sre_constants.AT_BEGINNING_STRING}
+_AT_END = {sre_constants.AT_END, sre_constants.AT_END_STRING}
+_FLAGS = sre_constants.SRE_FLAG_IGNORECASE | sre_constants.SRE_FLAG_UNICODE
+
+_NEGATE = sre_constants.NEGATE
+_RANGE = sre_constants.RANGE
+_CATEGORY = sre_constants.CATEGORY
+_CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: r'\d',
+    sre_constants.CATEGORY_NOT_DIGIT: r'\D',
+    sre_constants.CATEGORY_SPACE: r'\s',
+    sre_constants.CATEGORY_NOT_SPACE: r'\S',
+    sre_constants.CATEGORY_WORD: r'\w',
+    sre_constants.CATEGORY_NOT_WORD: r'\W',
+}
+
+# UAs are lowercased before matching, and only ASCII UAs without
+# newlines are matched with the DFA, where lowercasing the UA gives
+# the same matches as case-insensitive matching and $ only matches
+# at the end.
+ALPHABET = tuple(chr(code) for code in range(128) if not chr(code).isupper() and chr(code) != '\n')
+
+# Kinds of NFA states
+CHARACTER = 0
+SPLIT = 1
+START = 2
+END = 3
+ACCEPT = 4
+
+
+class IrregularPattern(Exception):
+    """
+    The pattern uses syntax that the NFA can't represent.
+    """
+
+
+def class_item(op: Any, av: Any) -> str:
+    """
+    Item of a parsed character class, in regex module syntax.
+    """
+    if op is _NEGATE:
+        return '^'
+    if op is _LITERAL:
+        return f'\\U{av:08x}'
+    if op is _RANGE:
+        return f'\\U{av[0]:08x}-\\U{av[1]:08x}'
+    if op is _CATEGORY and av in _CATEGORIES:
+        return _CATEGORIES[av]
+    raise IrregularPattern
+
+
+class RegexNFA:
+    """
+    Thompson NFA of the regexes. States are built backwards from the
+    state that follows them, so every state is known when it's created.
+    """
+
+    __slots__ = ('character_sets', 'characters', 'kinds', 'outs', 'positions')
+
+    def __init__(self) -> None:
+        self.kinds: list[int] = []
+        # CHARACTER, START and END: next state, SPLIT: next states, ACCEPT: position
+        self.outs: list[Any] = []
+        self.characters: list[frozenset[str]] = []
+        # Position of the regex of each state
+        self.positions: list[int] = []
+        self.character_sets: dict[str, frozenset[str]] = {}
+
+    def add_state(self, kind: int, out: Any, characters: frozenset[str] = frozenset()) -> int:
+        self.kinds.append(kind)
+        self.outs.append(out)
+        self.characters.append(characters)
+        return len(self.kinds) - 1
+
+    def add_pattern(self, pattern: str, position: int) -> int:
+        """
+        Add the states of the pattern, and return its first state.
+        The states are removed again if the pattern isn't regular.
+        """
+        if (parsed := parse_pattern(pattern)) is None:
+            raise IrregularPattern(pattern)
+        if parsed.state.flags & ~_FLAGS:
+            raise IrregularPattern(pattern)
+
+        size = len(self.kinds)
+        try:
+            accept = self.add_state(ACCEPT, position)
+            first = self.add_sequence(parsed, accept, size + MAX_NFA_STATES)
+        except (IrregularPattern, RecursionError):
+            for states in (self.kinds, self.outs, self.characters):
+                del states[size:]
+            raise IrregularPattern(pattern) from None
+
+        self.positions.extend([position] * (len(self.kinds) - size))
+        return first
+
+    def add_sequence(self, items: Any, out: int, limit: int) -> int:
+        for op, av in reversed(list(items)):
+            out = self.add_item(op, av, out, limit)
+        if len(self.kinds) > limit:
+            raise IrregularPattern
+        return out
+
+    def add_item(self, op: Any, av: Any, out: int, limit: int) -> int:
+        if op is _LITERAL:
+            return self.add_state(CHARACTER, out, self.character_set(f'\\U{av:08x}'))
+        if op is _NOT_LITERAL:
+            return self.add_state(CHARACTER, out, self.character_set(f'[^\\U{av:08x}]'))
+        if op is _ANY:
+            return self.add_state(CHARACTER, out, self.character_set('.'))
+        if op is _IN:
+            items = ''.join(class_item(item_op, item_av) for item_op, item_av in av)
+            return self.add_state(CHARACTER, out, self.character_set(f'[{items}]'))
+
+        if op is _SUBPATTERN:
+            _, add_flags, del_flags, subpattern = av
+            if add_flags or del_flags:
+                raise IrregularPattern
+            return self.add_sequence(subpattern, out, limit)
+
+        if op is _BRANCH:
+            branches = tuple(self.add_sequence(branch, out, limit) for branch in av[1])
+            return self.add_state(SPLIT, branches)
+
+        if op in _REPEATS:
+            min_repeat, max_repeat, subpattern = av
+            first = out
+            if max_repeat == _MAXREPEAT:
+                loop = self.add_state(SPLIT, None)
+                self.outs[loop] = (self.add_sequence(subpattern, loop, limit), out)
+                first = loop
+            else:
+                for _ in range(max_repeat - min_repeat):
+                    first = self.add_state(
+                        SPLIT, (self.add_sequence(subpattern, first, limit), out)
+                    )
+            for _ in range(min_repeat):
+                first = self.add_sequence(subpattern, first, limit)
+            return first
+
+        if op is _AT and av in _AT_START:
+            return self.add_state(START, out)
+        if op is _AT and av in _AT_END:
+            return self.add_state(END, out)
+
+        # lookarounds, group references, word boundaries, atomic groups etc
+        raise IrregularPattern
+
+    def character_set(self, character_class: str) -> frozenset[str]:
+        """
+        Lowercase characters that the class matches case-insensitively,
+        according to the regex module.
+        """
+        if (characters := self.character_sets.get(character_class)) is None:
+            compiled = regex.compile(character_class, IGNORECASE)
+            characters = frozenset(char for char in ALPHABET if compiled.fullmatch(char))
+            self.character_sets[character_class] = characters
+        return characters
+
+    def closure(
+        self, states: Any, at_start: bool, at_end: bool, known: frozenset[int] = frozenset()
+    ) -> tuple[tuple[int, ...], int | None]:
+        """
+        States reachable from the states without consuming a character:
+        the CHARACTER states, and END states that wait for the end of the
+        string unless at_end. Also the lowest position of the regexes
+        that have matched. The known states and the states they reach
+        are left out.
+        """
+        kinds = self.kinds
+        outs = self.outs
+        found = set()
+        seen = set()
+        matched = None
+        stack = list(states)
+
+        while stack:
+            state = stack.pop()
+            if state in seen or state in known:
+                continue
+            seen.add(state)
+
+            kind = kinds[state]
+            if kind == CHARACTER:
+                found.add(state)
+            elif kind == SPLIT:
+                stack.extend(outs[state])
+            elif kind == START:
+                if at_start:
+                    stack.append(outs[state])
+            elif kind == END:
+                if at_end:
+                    stack.append(outs[state])
+                else:
+                    found.add(state)
+            elif matched is None or outs[state] < matched:
+                matched = outs[state]
+
+        return tuple(sorted(found)), matched
+
+
+def lowest(first: int | None, second: int | None) -> int | None:
+    """
+    Lowest of two positions that may be None.
+    """
+    if first is None:
+        return second
+    if second is None:
+        return first
+    return min(first, second)
+
+
+class RegexDFA:
+    """
+    Find the first matching regex of a fixture file with one pass of a
+    DFA over the lowercased UA, for the regexes that are regular. Other
+    regexes are searched one by one, only if they're before the first
+    regular regex that matches.
+
+    Every position of the UA can start a match, so every DFA state has
+    the NFA states that start the regexes. They're kept apart from the
+    other NFA states of a DFA state, which are only the few states of
+    the regexes that have started to match.
+    """
+
+    __slots__ = (
+        'end_matched',
+        'irregular',
+        'matched',
+        'nfa',
+        'nfa_states',
+        'regexes',
+        'restart_end_matched',
+        'restart_following',
+        'restart_matched',
+        'restart_states',
+        'starts',
+        'state_ids',
+        'transitions',
+    )
+
+    def __init__(self, regexes: list[Any]) -> None:
+        self.regexes = regexes
+        self.nfa: RegexNFA | None = None
+        self.starts: tuple[int, ...] = ()
+        self.irregular: tuple[int, ...] = ()
+        self.restart_states: frozenset[int] = frozenset()
+        self.restart_matched: int | None = None
+        self.restart_end_matched: int | None = None
+        self.restart_following: dict[str, tuple[int, ...]] = {}
+        self.state_ids: dict[tuple[tuple[int, ...], int | None], int] = {}
+        self.nfa_states: list[tuple[int, ...]] = []
+        self.transitions: list[dict[str, int]] = []
+        self.matched: list[int | None] = []
+        self.end_matched: list[int | None] = []
+
+    def build_nfa(self) -> RegexNFA:
+        """
+        Add the regular regexes to the NFA, when first matching a UA.
+        """
+        nfa = self.nfa = RegexNFA()
+        starts = []
+        irregular = []
+
+        for position, regex_entry in enumerate(self.regexes):
+            if regex_entry is None:
+                continue
+            if not regex_entry.flags & IGNORECASE:
+                irregular.append(position)
+                continue
+            try:
+                starts.append(nfa.add_pattern(regex_entry.pattern, position))
+            except IrregularPattern:
+                irregular.append(position)
+
+        self.starts = tuple(starts)
+        self.irregular = tuple(irregular)
+
+        restart_states, self.restart_matched = nfa.closure(starts, False, False)
+        self.restart_states = frozenset(restart_states)
+        self.restart_end_matched = nfa.closure(
+            [state for state in self.restart_states if nfa.kinds[state] == END], False, True
+        )[1]
+        self.restart_following = {
+            character: tuple(
+                nfa.outs[state]
+                for state in self.restart_states
+                if character in nfa.characters[state]
+            )
+            for character in ALPHABET
+        }
+
+        self.reset()
+        return nfa
+
+    def reset(self) -> None:
+        """
+        Drop all DFA states, except the state at the start of the UA.
+        """
+        self.state_ids = {}
+        self.nfa_states = []
+        self.transitions = []
+        self.matched = []
+        self.end_matched = []
+        self.add_state(self.starts, at_start=True)
+
+    def add_state(self, states: Any, at_start: bool = False) -> int:
+        """
+        DFA state of the closure of the NFA states, and the restart states.
+        """
+        nfa = self.nfa
+        assert nfa is not None
+        # The closure of the restart states is part of every state, except
+        # at the start of the UA, where ^ matches and it may reach more
+        if at_start:
+            found, matched = nfa.closure(states, at_start, at_end=False)
+            found = tuple(state for state in found if state not in self.restart_states)
+        else:
+            found, matched = nfa.closure(states, at_start, at_end=False, known=self.restart_states)
+        matched = lowest(matched, self.restart_matched)
+        if matched is not None:
+            # regexes after a matching regex can't be the first match
+            positions = nfa.positions
+            found = tuple(state for state in found if positions[state] < matched)
+
+        # The first state is the only one where ^ matches,
+        # so it's never the same as a later state
+        key = (found, matched)
+        if not at_start and (state_id := self.state_ids.get(key)) is not None:
+            return state_id
+
+        state_id = len(self.transitions)
+        if not at_start:
+            self.state_ids[key] = state_id
+        self.nfa_states.append(found)
+        self.transitions.append({})
+        self.matched.append(matched)
+        end_states = [state for state in found if nfa.kinds[state] == END]
+        end_matched = nfa.closure(end_states, at_start, at_end=True)[1]
+        self.end_matched.append(lowest(end_matched, self.restart_end_matched))
+        return state_id
+
+    def transition(self, state_id: int, character: str) -> int:
+        """
+        Build the DFA state that follows the state on the character.
+        """
+        nfa = self.nfa
+        assert nfa is not None
+        outs = nfa.outs
+        characters = nfa.characters
+        following = [
+            outs[state] for state in self.nfa_states[state_id] if character in characters[state]
+        ]
+        following.extend(self.restart_following[character])
+
+        if len(self.transitions) >= MAX_DFA_STATES:
+            self.reset()
+            return self.add_state(following)
+
+        next_id = self.add_state(following)
+        self.transitions[state_id][character] = next_id
+        return next_id
+
+    def first_regular(self, user_agent_lower: str) -> int | None:
+        """
+        Position of the first regular regex that matches the lowercased UA.
+        """
+        state_id = 0
+        first = self.matched[0]
+        for character in user_agent_lower:
+            transitions = self.transitions[state_id]
+            if (next_id := transitions.get(character)) is None:
+                next_id = self.transition(state_id, character)
+            state_id = next_id
+            if (matched := self.matched[state_id]) is not None and (
+                first is None or matched < first
+            ):
+                first = matched
+
+        return lowest(first, self.end_matched[state_id])
+
+    def first_match(
+        self, user_agent: str, candidates: Iterable[int] | None = None
+    ) -> tuple[int, Any] | None:
+        """
+        Position and match of the first regex that matches the UA.
+
+        candidates are positions of the regexes that could match the UA,
+        such as from a LiteralIndex. Only those irregular regexes are
+        searched, and every regex if the UA isn't matched with the DFA.
+        """
+        if self.nfa is None:
+            self.build_nfa()
+
+        regexes = self.regexes
+        if not user_agent.isascii() or '\n' in user_agent:
+            # Case-insensitive matching differs from lowercasing,
+            # so the regexes are searched one by one
+            if candidates is None:
+                candidates = range(len(regexes))
+            for position in candidates:
+                if (regex_entry := regexes[position]) is not None and (
+                    matched := regex_entry.search(user_agent)
+                ):
+                    return position, matched
+            return None
+
+        irregular: Iterable[int] = self.irregular
+        if candidates is not None and irregular:
+            candidates = set(candidates)
+            irregular = [position for position in irregular if position in candidates]
+
+        first = self.first_regular(user_agent.lower())
+        for position in irregular:
+            if first is not None and position > first:
+                break
+            if matched := regexes[position].search(user_agent):
+                return position, matched
+
+        if first is None:
+            return None
+        return first, regexes[first].search(user_agent)
+
+
+__all__ = (
+    'IrregularPattern',
+    'RegexDFA',
+    'RegexNFA',
+    'class_item',
+    'lowest',
+)
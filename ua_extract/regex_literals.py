@@ -0,0 +1,838 @@
+from collections.abc import Iterable, Iterator
+from typing import Any, NamedTuple
+
+import ahocorasick_rs
+
+try:
+    from re import _constants as sre_constants  # type: ignore[attr-defined]
+    from re import _parser as sre_parse  # type: ignore[attr-defined]
+except ImportError:
+    import sre_constants  # type: ignore[no-redef]
+    import sre_parse  # type: ignore[no-redef]
+
+import re
+import string
+from re import error as ReError
+
+from .settings import DDCache
+
+# Largest set of exact strings tracked while expanding a (sub)pattern
+MAX_EXACT_STRINGS = 64
+
+# Largest set of alternative literals that still makes a useful requirement
+MAX_REQUIRED_LITERALS = 256
+
+# Character classes larger than this are treated as "any character"
+MAX_CLASS_CHARACTERS = 4
+
+# Literals shorter than this would match nearly every UA, so are not indexed
+MIN_LITERAL_LENGTH = 2
+
+# Shortest prefix that literals are truncated to, and shortest AhoCorasick
+# word. Prefixes such as "mo" or "ll" are contained in nearly every UA.
+MIN_WORD_LENGTH = 3
+
+# Entries with fewer models than this are searched without an index
+MIN_INDEXED_MODELS = 8
+
+_LITERAL = sre_constants.LITERAL
+_IN = sre_constants.IN
+_RANGE = sre_constants.RANGE
+_BRANCH = sre_constants.BRANCH
+_SUBPATTERN = sre_constants.SUBPATTERN
+_REPEATS = {
+    sre_constants.MAX_REPEAT,
+    sre_constants.MIN_REPEAT,
+    getattr(sre_constants, 'POSSESSIVE_REPEAT', sre_constants.MAX_REPEAT),
+}
+_ZERO_WIDTH = {
+    sre_constants.AT,
+    sre_constants.ASSERT,
+    sre_constants.ASSERT_NOT,
+}
+_ATOMIC_GROUP = getattr(sre_constants, 'ATOMIC_GROUP', None)
+_CATEGORY = sre_constants.CATEGORY
+# ASCII characters of the class escapes, including those that \s
+# only matches with stdlib re
+_CATEGORY_CHARACTERS = {
+    sre_constants.CATEGORY_DIGIT: string.digits,
+    sre_constants.CATEGORY_SPACE: string.whitespace + '\x1c\x1d\x1e\x1f',
+    sre_constants.CATEGORY_WORD: string.ascii_letters + string.digits + '_',
+}
+_AT = sre_constants.AT
+_AT_BEGINNING = sre_constants.AT_BEGINNING
+_AT_START = {sre_constants.AT_BEGINNING, sre_constants.AT_BEGINNING_STRING}
+_AT_END = {sre_constants.AT_END, sre_constants.AT_END_STRING}
+_MULTILINE = sre_constants.SRE_FLAG_MULTILINE
+_UNICODE = sre_constants.SRE_FLAG_UNICODE
+_LITERAL_FLAGS = sre_constants.SRE_FLAG_IGNORECASE | _UNICODE
+_BACKTRACKING_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+
+EMPTY = frozenset({''})
+
+# Back references to groups by number or name
+GROUP_REFERENCE = re.compile(r'\\[1-9]|\\g<|\(\?P=')
+
+
+class LiteralInfo(NamedTuple):
+    """
+    exact: every string the pattern can match, if that set is small and known
+    required: strings of which at least one is contained in every match
+    """
+
+    exact: frozenset[str] | None
+    required: frozenset[str] | None
+
+
+NO_INFO = LiteralInfo(None, None)
+
+
+def parse_pattern(pattern: str) -> Any:
+    r"""
+    Parse pattern with the stdlib parser. Fixture regexes are compiled
+    with the regex module, so patterns using syntax only the regex module
+    supports (\p{...}, etc) return None and must be treated as unknown.
+    """
+    try:
+        return sre_parse.parse(pattern)
+    except (ReError, OverflowError, RecursionError):
+        return None
+
+
+def shrink_literals(literals: frozenset[str]) -> frozenset[str] | None:
+    """
+    Truncate the literals to shorter prefixes until the set is small
+    enough to be a requirement. A string containing a literal also
+    contains all of its prefixes, so the shorter set is still required.
+
+    Returns None if the set is only small enough with prefixes shorter
+    than MIN_WORD_LENGTH.
+    """
+    if len(literals) <= MAX_REQUIRED_LITERALS:
+        return literals
+
+    for length in range(max(len(lit) for lit in literals) - 1, MIN_WORD_LENGTH - 1, -1):
+        shrunk = frozenset(lit[:length] for lit in literals)
+        if len(shrunk) <= MAX_REQUIRED_LITERALS:
+            return shrunk
+    return None
+
+
+def best_literals(*options: frozenset[str] | None) -> frozenset[str] | None:
+    """
+    Pick the most selective set of literals, preferring the set
+    with the longest shortest literal, and then the fewest literals.
+    """
+    best = None
+    best_score = (0, 0)
+    for literals in options:
+        if not literals or not (literals := shrink_literals(literals)):
+            continue
+        score = (min(len(lit) for lit in literals), -len(literals))
+        if score[0] and score > best_score:
+            best, best_score = literals, score
+    return best
+
+
+def _class_characters(items: list[tuple[Any, Any]]) -> frozenset[str] | None:
+    """
+    Lowercased characters matched by a [...] class, if the class is small.
+    """
+    chars: set[str] = set()
+    for op, av in items:
+        if op is _LITERAL:
+            chars.add(chr(av))
+        elif op is _RANGE and av[1] - av[0] < MAX_CLASS_CHARACTERS * 2:
+            chars.update(chr(code) for code in range(av[0], av[1] + 1))
+        else:
+            return None
+
+    lowered = frozenset(char.lower() for char in chars)
+    if len(lowered) > MAX_CLASS_CHARACTERS or not all(char.isascii() for char in lowered):
+        return None
+    return lowered
+
+
+def _is_uncased(char: str) -> bool:
+    """
+    Characters such as CJK, Hangul or Arabic letters have no case
+    variants, so they only ever match themselves case-insensitively.
+    """
+    return char == char.upper() == char.casefold()
+
+
+def _sequence_info(items: Iterable[tuple[Any, Any]]) -> LiteralInfo:
+    """
+    Concatenate the literal info of consecutive items. Runs of exact
+    strings are multiplied out, and all runs and required sets of the
+    items are candidates for the requirement of the whole sequence.
+    """
+    candidates: list[frozenset[str] | None] = []
+    current = EMPTY
+    all_exact = True
+
+    for op, av in items:
+        info = _item_info(op, av)
+        candidates.append(info.required)
+
+        if info.exact is None:
+            candidates.append(current)
+            current = EMPTY
+            all_exact = False
+            continue
+
+        product = frozenset(start + end for start in current for end in info.exact)
+        if len(product) > MAX_EXACT_STRINGS:
+            candidates.append(current)
+            current = info.exact
+            all_exact = False
+        else:
+            current = product
+
+    candidates.append(current)
+    return LiteralInfo(
+        exact=current if all_exact else None,
+        required=best_literals(*candidates),
+    )
+
+
+def _item_info(op: Any, av: Any) -> LiteralInfo:
+    if op is _LITERAL:
+        char = chr(av).lower()
+        if char.isascii() or _is_uncased(char):
+            return LiteralInfo(frozenset({char}), None)
+        return NO_INFO
+
+    if op is _IN:
+        return LiteralInfo(_class_characters(av), None)
+
+    if op is _SUBPATTERN:
+        return _sequence_info(av[-1])
+
+    if op is _ATOMIC_GROUP:
+        return _sequence_info(av)
+
+    if op in _ZERO_WIDTH:
+        return LiteralInfo(EMPTY, None)
+
+    if op is _BRANCH:
+        infos = [_sequence_info(branch) for branch in av[1]]
+        if all(info.exact is not None for info in infos):
+            exact = frozenset().union(*(info.exact or EMPTY for info in infos))
+            if len(exact) <= MAX_EXACT_STRINGS:
+                return LiteralInfo(exact, None)
+
+        required: set[str] = set()
+        for info in infos:
+            if not (branch_required := best_literals(info.required, info.exact)):
+                return NO_INFO
+            required.update(branch_required)
+        return LiteralInfo(None, frozenset(required))
+
+    if op in _REPEATS:
+        min_repeat, max_repeat, subpattern = av
+        info = _sequence_info(subpattern)
+        if min_repeat == 0:
+            if max_repeat == 1 and info.exact is not None:
+                return LiteralInfo(info.exact | EMPTY, None)
+            return NO_INFO
+        if min_repeat == max_repeat == 1:
+            return info
+        return LiteralInfo(None, best_literals(info.required, info.exact))
+
+    return NO_INFO
+
+
+def required_literals(pattern: str) -> frozenset[str] | None:
+    r"""
+    Lowercase strings of which at least one is a substring of every
+    (case-insensitive) match of the pattern in an ASCII string.
+
+    Returns None if no usable set of literals could be derived.
+
+    Results are cached, as the literal indexes and the choice of regex
+    engine both need them.
+
+    >>> sorted(required_literals(r'(?:Chrome|CriOS)/(\d+[\.\d]+)'))
+    ['chrome/', 'crios/']
+    """
+    cache = DDCache['required_literals']
+    if pattern not in cache:
+        cache[pattern] = _required_literals(pattern)
+    return cache[pattern]
+
+
+def word_literals(pattern: str) -> frozenset[str] | None:
+    """
+    Required literals of the pattern that can be AhoCorasick words.
+
+    Returns None if the pattern requires no literals, or a literal
+    shorter than MIN_WORD_LENGTH, as such a word would be contained
+    in nearly every UA.
+    """
+    literals = required_literals(pattern)
+    if not literals or min(len(literal) for literal in literals) < MIN_WORD_LENGTH:
+        return None
+    return literals
+
+
+def _required_literals(pattern: str) -> frozenset[str] | None:
+    if (parsed := parse_pattern(pattern)) is None:
+        return None
+
+    info = _sequence_info(parsed)
+    literals = best_literals(info.required, info.exact)
+    if not literals or min(len(lit) for lit in literals) < MIN_LITERAL_LENGTH:
+        return None
+
+    # Any UA containing "mz-mobile" also contains "mz-"
+    return frozenset(
+        literal
+        for literal in literals
+        if not any(other != literal and other in literal for other in literals)
+    )
+
+
+def _exact_run(items: list[tuple[Any, Any]], reverse: bool) -> frozenset[str]:
+    """
+    Strings the leading items match, multiplied out up to the first item
+    without a small set of exact strings. With reverse, the items are in
+    reverse order and the strings are the trailing strings instead.
+    """
+    current = EMPTY
+    for op, av in items:
+        if (exact := _item_info(op, av).exact) is None:
+            break
+        if reverse:
+            product = frozenset(start + end for start in exact for end in current)
+        else:
+            product = frozenset(start + end for start in current for end in exact)
+        if len(product) > MAX_EXACT_STRINGS:
+            break
+        current = product
+    return current
+
+
+def _anchored_affixes(items: Iterable[tuple[Any, Any]], reverse: bool) -> frozenset[str] | None:
+    """
+    Affixes of the string that every match of the items requires, if the
+    items contain a ^ anchor (or $ anchor with reverse) outside of repeats
+    and lookarounds, or a branch of which every alternative is anchored.
+    """
+    anchors = _AT_END if reverse else _AT_START
+    items = list(items)
+    if reverse:
+        items.reverse()
+
+    for index, (op, av) in enumerate(items):
+        if op is _AT and av in anchors:
+            return _exact_run(items[index + 1 :], reverse)
+
+        if op is _SUBPATTERN:
+            if av[1] & _MULTILINE:
+                return None
+            if (affixes := _anchored_affixes(av[-1], reverse)) is not None:
+                return affixes
+
+        elif op is _BRANCH:
+            branch_affixes = [_anchored_affixes(branch, reverse) for branch in av[1]]
+            if all(affixes is not None for affixes in branch_affixes):
+                return frozenset().union(*(affixes or EMPTY for affixes in branch_affixes))
+
+    return None
+
+
+def anchored_affixes(pattern: str, suffix: bool = False) -> frozenset[str] | None:
+    """
+    Lowercase strings of which one starts (or ends, with suffix) every
+    string in which the ^ (or $) anchored pattern matches.
+
+    Returns None if the pattern isn't anchored, or the affixes are unknown.
+
+    >>> sorted(anchored_affixes(r'^(?:Apple-)?iPhone'))
+    ['apple-iphone', 'iphone']
+    >>> sorted(anchored_affixes(r'Google$', suffix=True))
+    ['google']
+    """
+    if (parsed := parse_pattern(pattern)) is None or parsed.state.flags & _MULTILINE:
+        return None
+
+    affixes = _anchored_affixes(parsed, suffix)
+    if not affixes or '' in affixes:
+        return None
+    return affixes
+
+
+def anchored_exact(pattern: str) -> frozenset[str] | None:
+    """
+    Lowercase strings that are the only strings the pattern matches,
+    if the pattern is anchored with both ^ and $, apart from a newline
+    that $ matches at the end of a string.
+
+    Returns None if the pattern isn't anchored, or the strings are unknown.
+
+    >>> sorted(anchored_exact(r'^(?:Zeus|ZmEu)$'))
+    ['zeus', 'zmeu']
+    """
+    if (parsed := parse_pattern(pattern)) is None or parsed.state.flags & _MULTILINE:
+        return None
+
+    items = list(parsed)
+    if len(items) < 2 or items[0] != (_AT, _AT_BEGINNING) or items[-1][0] is not _AT:
+        return None
+    if items[-1][1] not in _AT_END:
+        return None
+
+    exact = _sequence_info(items[1:-1]).exact
+    if not exact or '' in exact:
+        return None
+    return exact
+
+
+def top_level_alternatives(pattern: str) -> list[str]:
+    """
+    Alternatives of the top level alternation of the pattern, which
+    match the same strings as the pattern together, or the pattern
+    itself if it isn't an alternation or can't be split.
+
+    >>> top_level_alternatives(r'(?:a|b)c|[|]d|e')
+    ['(?:a|b)c', '[|]d', 'e']
+    """
+    # Global flags would only apply to the first alternative
+    if (parsed := parse_pattern(pattern)) is None or parsed.state.flags & ~_UNICODE:
+        return [pattern]
+
+    alternatives = []
+    depth = 0
+    start = 0
+    index = 0
+    in_class = False
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '\\':
+            index += 1
+        elif in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+            # ] right after [ or [^ is a literal
+            index += pattern.startswith('^', index + 1)
+            index += pattern.startswith(']', index + 1)
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            alternatives.append(pattern[start:index])
+            start = index + 1
+        index += 1
+    alternatives.append(pattern[start:])
+
+    # Group numbers of back references change in the alternatives
+    if len(alternatives) == 1 or GROUP_REFERENCE.search(pattern):
+        return [pattern]
+    if any(parse_pattern(alternative) is None for alternative in alternatives):
+        return [pattern]
+    return alternatives
+
+
+def _only_literals(items: Iterable[tuple[Any, Any]]) -> bool:
+    """
+    Items are literals, character classes, non-capturing groups,
+    alternations and optional parts, without anchors or lookarounds.
+    """
+    for op, av in items:
+        if op is _LITERAL or op is _IN:
+            continue
+        if op is _SUBPATTERN:
+            group, add_flags, del_flags, subpattern = av
+            if group is not None or add_flags or del_flags or not _only_literals(subpattern):
+                return False
+        elif op is _BRANCH:
+            if not all(_only_literals(branch) for branch in av[1]):
+                return False
+        elif op in _BACKTRACKING_REPEATS:
+            _, max_repeat, subpattern = av
+            if max_repeat > 1 or not _only_literals(subpattern):
+                return False
+        else:
+            return False
+    return True
+
+
+def literal_alternatives(pattern: str) -> frozenset[str] | None:
+    """
+    Lowercase strings that are the only possible matches of the pattern,
+    if it's a (small) alternation of literals without groups or anchors.
+
+    >>> sorted(literal_alternatives(r'Fire(?:fox)?|Iceweasel'))
+    ['fire', 'firefox', 'iceweasel']
+    """
+    if (parsed := parse_pattern(pattern)) is None:
+        return None
+    if parsed.state.groups > 1 or parsed.state.flags & ~_LITERAL_FLAGS:
+        return None
+    if not _only_literals(parsed):
+        return None
+
+    exact = _sequence_info(parsed).exact
+    if not exact or '' in exact:
+        return None
+    return exact
+
+
+def _starts_with_literal(items: Any) -> bool:
+    if not items:
+        return False
+
+    op, av = items[0]
+    if op is _SUBPATTERN:
+        _, add_flags, del_flags, subpattern = av
+        return not add_flags and not del_flags and _starts_with_literal(subpattern)
+    if op is _BRANCH:
+        return all(branch and branch[0][0] is _LITERAL for branch in av[1])
+    return op is _LITERAL or op is _IN
+
+
+def starts_with_literal(pattern: str) -> bool:
+    r"""
+    Check if every match of the case-sensitive pattern starts with a
+    literal character or a character class, which stdlib re looks for
+    before trying to match the pattern at a position of the string.
+
+    >>> starts_with_literal(r'(?:Chrome|CriOS)/(\d+)')
+    True
+    >>> starts_with_literal(r'.*Chrome')
+    False
+    """
+    if (parsed := parse_pattern(pattern)) is None:
+        return False
+    return _starts_with_literal(parsed)
+
+
+def _required_characters(items: Iterable[tuple[Any, Any]]) -> frozenset[str]:
+    chars: set[str] = set()
+    for op, av in items:
+        if op is _LITERAL:
+            if (char := chr(av).lower()).isascii():
+                chars.add(char)
+        elif op is _IN:
+            if (class_chars := _class_characters(av)) is not None and len(class_chars) == 1:
+                chars.update(class_chars)
+        elif op is _SUBPATTERN:
+            chars.update(_required_characters(av[-1]))
+        elif op is _ATOMIC_GROUP:
+            chars.update(_required_characters(av))
+        elif op is _BRANCH:
+            chars.update(frozenset.intersection(*map(_required_characters, av[1])))
+        elif op in _REPEATS and av[0] >= 1:
+            chars.update(_required_characters(av[2]))
+    return frozenset(chars)
+
+
+def required_characters(pattern: str) -> frozenset[str]:
+    r"""
+    Lowercase characters that every (case-insensitive) match of the
+    pattern in an ASCII string contains, all of them.
+
+    >>> sorted(required_characters(r'([A-Z]+_[\d+\.]+)_(?:.*)'))
+    ['_']
+    """
+    if (parsed := parse_pattern(pattern)) is None:
+        return frozenset()
+    return _required_characters(parsed)
+
+
+def _ascii_class_characters(items: list[tuple[Any, Any]]) -> frozenset[str] | None:
+    """
+    Lowercased ASCII characters matched by a [...] class of any size,
+    or None for negated classes and classes with non-ASCII characters,
+    which may match ASCII characters case-insensitively.
+    """
+    chars: set[str] = set()
+    for op, av in items:
+        if op is _LITERAL and av < 128:
+            chars.add(chr(av))
+        elif op is _RANGE and av[1] < 128:
+            chars.update(chr(code) for code in range(av[0], av[1] + 1))
+        elif op is _CATEGORY and av in _CATEGORY_CHARACTERS:
+            chars.update(_CATEGORY_CHARACTERS[av])
+        else:
+            return None
+    return frozenset(char.lower() for char in chars)
+
+
+def _first_characters(items: Iterable[tuple[Any, Any]]) -> tuple[bool, frozenset[str] | None]:
+    """
+    Whether the items are anchored with ^ before their first character,
+    and the characters of which one is the first character of every match.
+    """
+    anchored = False
+    for op, av in items:
+        if op is _AT:
+            anchored = anchored or av in _AT_START
+            continue
+        if op in _ZERO_WIDTH:
+            continue
+
+        if op is _LITERAL:
+            char = chr(av).lower()
+            return anchored, frozenset({char}) if av < 128 else None
+        if op is _IN:
+            return anchored, _ascii_class_characters(av)
+        if op is _SUBPATTERN:
+            if av[1] & _MULTILINE:
+                return anchored, None
+            sub_anchored, first = _first_characters(av[-1])
+            return anchored or sub_anchored, first
+        if op is _BRANCH:
+            branches = [_first_characters(branch) for branch in av[1]]
+            if any(first is None for _, first in branches):
+                return anchored, None
+            return (
+                anchored or all(sub_anchored for sub_anchored, _ in branches),
+                frozenset().union(*(first or () for _, first in branches)),
+            )
+        if op in _REPEATS and av[0] >= 1:
+            sub_anchored, first = _first_characters(av[2])
+            return anchored or sub_anchored, first
+        return anchored, None
+
+    return anchored, None
+
+
+def anchored_first_characters(pattern: str) -> frozenset[str] | None:
+    r"""
+    Lowercase characters of which one is the first character of every
+    string in which the ^ anchored pattern matches, in ASCII strings.
+
+    Returns None if the pattern isn't anchored, or the characters are unknown.
+
+    >>> sorted(anchored_first_characters(r'(^\d+)[a-zA-Z0-9]{20,}'))
+    ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9']
+    """
+    if (parsed := parse_pattern(pattern)) is None or parsed.state.flags & _MULTILINE:
+        return None
+
+    anchored, first = _first_characters(parsed)
+    return first if anchored and first else None
+
+
+class AffixTable:
+    """
+    Positions of the regexes that only match strings starting (or ending)
+    with one of their affixes, looked up by the affixes of a string of
+    every length in the table.
+    """
+
+    __slots__ = ('lengths', 'positions_by_affix', 'suffix')
+
+    def __init__(self, positions_by_affix: dict[str, list[int]], suffix: bool = False) -> None:
+        self.positions_by_affix = {
+            affix: tuple(positions) for affix, positions in positions_by_affix.items()
+        }
+        self.lengths = tuple(sorted({len(affix) for affix in positions_by_affix}))
+        self.suffix = suffix
+
+    def positions(self, text: str) -> Iterator[tuple[int, ...]]:
+        """
+        Positions of the regexes with an affix of the text.
+        """
+        positions_by_affix = self.positions_by_affix
+        text_length = len(text)
+        for length in self.lengths:
+            if length > text_length:
+                break
+            affix = text[text_length - length :] if self.suffix else text[:length]
+            if (positions := positions_by_affix.get(affix)) is not None:
+                yield positions
+
+    def __bool__(self) -> bool:
+        return bool(self.lengths)
+
+
+class LiteralIndex:
+    """
+    Map literals that regexes require to the positions of those regexes
+    in the regex list, so that only regexes with a chance of matching
+    the UA are evaluated. Positions are returned in ascending order, so
+    the first matching regex is the same as with a full scan.
+
+    Regexes anchored with ^ or $ are only evaluated for UAs that start
+    or end with their anchored literals, wherever else those appear.
+    """
+
+    __slots__ = (
+        '_automaton',
+        'always',
+        'literals',
+        'positions_by_literal',
+        'prefixes',
+        'size',
+        'suffixes',
+    )
+
+    def __init__(self, patterns: list[str | None]) -> None:
+        positions_by_literal: dict[str, list[int]] = {}
+        positions_by_prefix: dict[str, list[int]] = {}
+        positions_by_suffix: dict[str, list[int]] = {}
+        always = []
+
+        for position, pattern in enumerate(patterns):
+            if not pattern:
+                always.append(position)
+            elif prefixes := anchored_affixes(pattern):
+                for prefix in prefixes:
+                    positions_by_prefix.setdefault(prefix, []).append(position)
+            elif suffixes := anchored_affixes(pattern, suffix=True):
+                for suffix in suffixes:
+                    positions_by_suffix.setdefault(suffix, []).append(position)
+            elif literals := required_literals(pattern):
+                for literal in literals:
+                    positions_by_literal.setdefault(literal, []).append(position)
+            else:
+                always.append(position)
+
+        self.size = len(patterns)
+        self.always = frozenset(always)
+        self.positions_by_literal = {
+            literal: tuple(positions) for literal, positions in positions_by_literal.items()
+        }
+        self.literals = tuple(self.positions_by_literal)
+        self.prefixes = AffixTable(positions_by_prefix)
+        self.suffixes = AffixTable(positions_by_suffix, suffix=True)
+        self._automaton: ahocorasick_rs.AhoCorasick | None = None
+
+    @property
+    def automaton(self) -> ahocorasick_rs.AhoCorasick:
+        if self._automaton is None:
+            self._automaton = ahocorasick_rs.AhoCorasick(self.literals)
+        return self._automaton
+
+    def candidates(
+        self,
+        user_agent_lower: str,
+        found_literals: Iterable[str] | None = None,
+    ) -> Iterable[int]:
+        """
+        Positions of the regexes that could match the lowercased UA.
+
+        found_literals are the indexed literals contained in the UA, if
+        the UA was already scanned for them.
+
+        Literal analysis only holds for ASCII, so others get every position.
+        """
+        if not user_agent_lower.isascii():
+            return range(self.size)
+
+        if found_literals is None and self.literals:
+            literals = self.literals
+            found_literals = {
+                literals[match[0]]
+                for match in self.automaton.find_matches_as_indexes(
+                    user_agent_lower, overlapping=True
+                )
+            }
+
+        positions_by_literal = self.positions_by_literal
+        found = set(self.always)
+        for literal in found_literals or ():
+            found.update(positions_by_literal[literal])
+
+        for positions in self.prefixes.positions(user_agent_lower):
+            found.update(positions)
+
+        if self.suffixes:
+            for positions in self.suffixes.positions(user_agent_lower):
+                found.update(positions)
+            # $ also matches before a trailing newline
+            if user_agent_lower.endswith('\n'):
+                for positions in self.suffixes.positions(user_agent_lower[:-1]):
+                    found.update(positions)
+
+        return sorted(found)
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class ModelIndex:
+    """
+    Literal indexes over the model regexes of the entries of a regex list.
+
+    Client hint models are looked up in one index over the models of all
+    entries. Models of the entry that matched a UA are looked up in an
+    index over that entry's models only. Both are built on first use, and
+    candidates keep the order of the entries and of their models.
+    """
+
+    __slots__ = ('_entry_indexes', '_index', 'entries', 'models', 'starts')
+
+    def __init__(self, regex_list: list[dict[str, Any]]) -> None:
+        models: list[dict[str, Any]] = []
+        entries: list[int] = []
+        starts = []
+
+        for position, ua_data in enumerate(regex_list):
+            starts.append(len(models))
+            for model in ua_data.get('models', ()):
+                models.append(model)
+                entries.append(position)
+        starts.append(len(models))
+
+        self.models = tuple(models)
+        self.entries = tuple(entries)
+        self.starts = tuple(starts)
+        self._index: LiteralIndex | None = None
+        self._entry_indexes: dict[int, LiteralIndex] = {}
+
+    @property
+    def index(self) -> LiteralIndex:
+        if self._index is None:
+            self._index = LiteralIndex([model['regex'].pattern for model in self.models])
+        return self._index
+
+    def candidates(self, text_lower: str) -> dict[int, list[dict[str, Any]]]:
+        """
+        Models of all entries that could match the lowercased text,
+        by entry position.
+        """
+        models = self.models
+        entries = self.entries
+        candidates: dict[int, list[dict[str, Any]]] = {}
+        for flat in self.index.candidates(text_lower):
+            candidates.setdefault(entries[flat], []).append(models[flat])
+        return candidates
+
+    def entry_candidates(self, position: int, text_lower: str) -> list[dict[str, Any]]:
+        """
+        Models of the entry at position that could match the lowercased text.
+        """
+        models = self.models[self.starts[position] : self.starts[position + 1]]
+        if len(models) < MIN_INDEXED_MODELS:
+            return list(models)
+
+        if (index := self._entry_indexes.get(position)) is None:
+            index = LiteralIndex([model['regex'].pattern for model in models])
+            self._entry_indexes[position] = index
+
+        return [models[candidate] for candidate in index.candidates(text_lower)]
+
+
+__all__ = (
+    'AffixTable',
+    'LiteralIndex',
+    'ModelIndex',
+    'anchored_affixes',
+    'anchored_exact',
+    'anchored_first_characters',
+    'best_literals',
+    'literal_alternatives',
+    'parse_pattern',
+    'required_characters',
+    'required_literals',
+    'shrink_literals',
+    'starts_with_literal',
+    'top_level_alternatives',
+    'word_literals',
+)
@@ -0,0 +1,130 @@
+"""
+Try the regexes of a regex list that most often match UAs first, by
+a profile of the positions of the regexes that matched, recorded while
+parsing UAs with Parser.RECORD_REGEX_PROFILE.
+
+The first regex of the list that matches must still win, so a match
+of a frequent regex is only returned once none of the candidate regexes
+before it match. A profile recorded with other fixture files than the
+current ones gives the same results, only more slowly.
+"""
+
+import json
+from collections import Counter
+from collections.abc import Iterable
+from typing import Any
+
+from .settings import DDCache
+
+# Number of the most frequently matching regexes that are tried first
+HOT_REGEXES = 8
+
+# Number of recorded matches before the hot regexes are chosen again
+PROFILE_REFRESH = 1000
+
+
+class RegexProfile:
+    """
+    Find the first matching regex of a regex list, trying the hot regexes
+    that matched most often first. Once a hot regex matches, only the
+    candidate regexes before it are searched, to confirm that none of
+    them match the UA too.
+    """
+
+    __slots__ = ('hits', 'hot', 'pending', 'regexes')
+
+    def __init__(self, regexes: list[Any], hits: Counter[int] | None = None) -> None:
+        self.regexes = regexes
+        self.hits: Counter[int] = Counter() if hits is None else hits
+        self.hot: tuple[int, ...] | None = None
+        self.pending = 0
+
+    def record(self, position: int) -> None:
+        """
+        Count a UA matched by the regex at position.
+        """
+        self.hits[position] += 1
+        self.pending += 1
+        if self.pending >= PROFILE_REFRESH:
+            self.hot = None
+
+    def hot_positions(self) -> tuple[int, ...]:
+        """
+        Positions of the regexes that matched most often, most frequent first.
+        """
+        if self.hot is None:
+            self.hot = tuple(position for position, _ in self.hits.most_common(HOT_REGEXES))
+            self.pending = 0
+        return self.hot
+
+    def first_match(
+        self, user_agent: str, candidates: Iterable[int] | None = None
+    ) -> tuple[int, Any] | None:
+        """
+        Position and match of the first regex that matches the UA.
+
+        candidates are positions of the regexes that could match the UA,
+        in order, such as from a LiteralIndex.
+        """
+        regexes = self.regexes
+        if candidates is None:
+            candidates = [position for position, regex in enumerate(regexes) if regex is not None]
+        else:
+            candidates = list(candidates)
+        candidate_set = set(candidates)
+        missed = set()
+
+        for hot in self.hot_positions():
+            if hot not in candidate_set:
+                continue
+            if not (matched := regexes[hot].search(user_agent)):
+                missed.add(hot)
+                continue
+
+            for position in candidates:
+                if position >= hot:
+                    break
+                if position not in missed and (earlier := regexes[position].search(user_agent)):
+                    return position, earlier
+            return hot, matched
+
+        for position in candidates:
+            if position not in missed and (matched := regexes[position].search(user_agent)):
+                return position, matched
+
+        return None
+
+
+def save_regex_profiles(path: str) -> None:
+    """
+    Save the recorded matches of every regex list to a JSON file.
+    """
+    profiles = {
+        cache_name: {str(position): count for position, count in sorted(hits.items())}
+        for cache_name, hits in DDCache['regex_hits'].items()
+        if hits
+    }
+    with open(path, 'w') as profile_file:
+        json.dump(profiles, profile_file, indent=1, sort_keys=True)
+
+
+def load_regex_profiles(path: str) -> None:
+    """
+    Load the recorded matches of regex lists from a JSON file saved with
+    save_regex_profiles, in place of the matches recorded so far.
+    """
+    with open(path) as profile_file:
+        profiles = json.load(profile_file)
+
+    for cache_name, hits in profiles.items():
+        DDCache['regex_hits'][cache_name] = Counter({
+            int(position): count for position, count in hits.items()
+        })
+        DDCache['regex_profiles'].pop(cache_name, None)
+
+
+__all__ = (
+    'RegexProfile',
+    'load_regex_profiles',
+    'save_regex_profiles',
+)
@@ -55,6 +55,18 @@ class Cache(dict):  # type: ignore[type-arg]
         'app_details': {},
         'regexes': {},
         'corasick': {},
+        'literal_index': {},
+        'required_literals': {},
+        'model_index': {},
+        'fragment_tables': {},
+        'combined_regexes': {},
+        'regex_dfas': {},
+        'regex_hits': {},
+        'regex_profiles': {},
+        'regex_orders': {},
+        'substitution_templates': {},
+        'batch_regexes': {},
+        'prefilter': {},
         'normalize_regexes': [],
         'appids_ignored': set(),
         'appids_secondary': set(),
@@ -0,0 +1,81 @@
+"""
+Templates of the name, version and model fields of the fixtures, parsed
+once into their literal text and the numbered groups between it, so that
+a template is expanded from the groups of the match of its regex.
+
+Substituting a template with the regex instead searches the whole match
+of the regex again, a second regex pass on every parse.
+"""
+
+from typing import Any
+
+from .lazy_regex import TEMPLATE_GROUP
+from .settings import DDCache
+
+# Fields of the fixture entries that may be substitution templates
+TEMPLATE_FIELDS = ('name', 'version', 'model')
+
+
+class SubstitutionTemplate:
+    r"""
+    Template split into literal text and numbered group references.
+    Templates with other escapes can't be expanded from the groups.
+
+    >>> SubstitutionTemplate('Tbook \\g<1>').pieces
+    ('Tbook ', '')
+    """
+
+    __slots__ = ('expandable', 'groups', 'pieces', 'template')
+
+    def __init__(self, template: str) -> None:
+        parts = TEMPLATE_GROUP.split(template)
+        self.template = template
+        self.pieces = tuple(parts[0::2])
+        self.groups = tuple(int(group) for group in parts[1::2])
+        self.expandable = not any('\\' in piece for piece in self.pieces)
+
+    def expand(self, match: Any) -> str:
+        """
+        Template with the groups of the match, which raises IndexError
+        for groups the regex doesn't have. Groups that didn't
+        participate in the match are empty.
+        """
+        if not self.groups:
+            return self.template
+
+        pieces = self.pieces
+        expanded = [pieces[0]]
+        for group, piece in zip(self.groups, pieces[1:]):
+            expanded.extend((match.group(group) or '', piece))
+
+        return ''.join(expanded)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.template!r})'
+
+
+def substitution_template(template: str) -> SubstitutionTemplate:
+    """
+    Parsed template, from the cache of templates parsed when loading the regexes.
+    """
+    templates = DDCache['substitution_templates']
+    try:
+        return templates[template]
+    except KeyError:
+        return templates.setdefault(template, SubstitutionTemplate(template))
+
+
+def parse_templates(entry: dict[str, Any]) -> None:
+    """
+    Parse the templates of the fields of a fixture entry.
+    """
+    for field in TEMPLATE_FIELDS:
+        if isinstance(template := entry.get(field), str):
+            substitution_template(template)
+
+
+__all__ = (
+    'SubstitutionTemplate',
+    'parse_templates',
+    'substitution_template',
+)
@@ -0,0 +1,56 @@
+from unittest import TestCase
+
+from ...ahocorasick_words import (
+    ahocorasick_parsers,
+    check_ahocorasick_words,
+    derive_fixture_words,
+    fixture_user_agents,
+    minimal_words,
+)
+from ...parser import Camera, CarBrowser, FeedReader, MediaPlayer
+
+
+# -----------------------------------------------------------------------
+class TestAhoCorasickWords(TestCase):
+
+    def test_minimal_words(self):
+        self.assertEqual(
+            minimal_words(['fbmd/', 'fbmd/x55', 'fbmd/hp ', 'itunes/']),
+            frozenset({'fbmd/', 'itunes/'}),
+        )
+
+    def test_scrub_words(self):
+        fixture_words = derive_fixture_words(MediaPlayer, 'upstream/client/mediaplayers.yml')
+        self.assertNotIn('itunes', fixture_words.words)
+        self.assertTrue(any('iTunes' in regex for regex in fixture_words.scrubbed))
+
+    def test_words_are_current(self):
+        """
+        Shipped word files must match the words derived from the regexes
+        """
+        for Parser in ahocorasick_parsers():
+            parser = Parser('', None)
+            for fixture in Parser.fixture_files:
+                words = set(parser.load_from_yaml(f'regexes/ahocorasick/{fixture}') or ())
+                fixture_words = derive_fixture_words(Parser, fixture)
+                self.assertEqual(words, fixture_words.words, msg=fixture)
+
+
+class TestAhoCorasickWordsFixtures(TestCase):
+    """
+    Words must not filter out UAs that a regex of the parser matches.
+    """
+
+    def test_fixtures(self):
+        user_agents = fixture_user_agents('tests/fixtures/upstream/*.yml')
+        misses = check_ahocorasick_words(
+            user_agents,
+            parsers=(Camera, CarBrowser, FeedReader, MediaPlayer),
+        )
+        self.assertEqual([miss for miss in misses if not miss.scrubbed], [])
+
+
+__all__ = [
+    'TestAhoCorasickWords',
+    'TestAhoCorasickWordsFixtures',
+]
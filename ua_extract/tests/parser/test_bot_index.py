@@ -0,0 +1,91 @@
+from unittest import TestCase
+from urllib.parse import unquote
+
+from ...bot_index import BotIndex, unbounded_pattern
+from ...device_detector import DeviceDetector
+from ...lazy_regex import RegexLazy, bounded_regex
+from ...parser import Bot
+from ...settings import BOUNDED_REGEX
+from ..base import ParserBaseTest
+
+
+# -----------------------------------------------------------------------
+class TestBotIndex(TestCase):
+
+    def index(self, *patterns):
+        return BotIndex([bounded_regex(pattern) for pattern in patterns])
+
+    def test_unbounded_pattern(self):
+        self.assertEqual(unbounded_pattern(BOUNDED_REGEX.format('a|b')), 'a|b')
+        self.assertIsNone(unbounded_pattern('a|b'))
+
+    def test_anchored_alternatives(self):
+        index = self.index(r'Googlebot', r'nuhk|^xenu|^(?:chrome|Zeus)$', r'crawl(?:er)?')
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.exact_strings, {'chrome', 'zeus'})
+
+        # chrome and xenu elsewhere in the UA don't select the generic regex
+        self.assertEqual(list(index.candidates('mozilla/5.0 chrome/100 xenu')), [])
+        self.assertEqual(list(index.candidates('xenu link sleuth')), [1])
+        self.assertEqual(list(index.candidates('googlebot nuhk crawler')), [0, 1, 2])
+        self.assertEqual(list(index.candidates('mozilla/5.0 İ')), [0, 1, 2])
+
+    def test_exact_match(self):
+        index = self.index(r'^Zeus', r'Googlebot', r'nuhk|^(?:chrome|Zeus)$')
+
+        # the first matching regex wins over the anchored alternative
+        position, matched = index.exact_match('ZEUS')
+        self.assertEqual((position, matched.group()), (0, 'ZEUS'))
+        position, matched = index.exact_match('Chrome')
+        self.assertEqual((position, matched.group()), (2, 'Chrome'))
+        self.assertEqual(index.exact_positions, {'zeus': 0, 'chrome': 2})
+
+        self.assertIsNone(index.exact_match('Chrome/100'))
+        self.assertIsNone(index.exact_match('Zeuß'))
+
+    def test_exact_match_of_case_sensitive_regex(self):
+        index = BotIndex([RegexLazy(BOUNDED_REGEX.format(r'^(?:chrome|Zeus)$'))])
+
+        # the lowercased UA matches, but the UA is left to the usual search
+        self.assertIsNone(index.exact_match('Chrome'))
+        position, matched = index.exact_match('chrome')
+        self.assertEqual((position, matched.group()), (0, 'chrome'))
+
+
+class TestBotIndexFixtures(ParserBaseTest):
+    """
+    Bots and other UAs must find the same first bot regex as searching
+    every regex one after another.
+    """
+
+    fixture_files = [
+        'tests/fixtures/upstream/bots.yml',
+        'tests/fixtures/upstream/desktop.yml',
+        'tests/fixtures/upstream/smartphone.yml',
+    ]
+
+    def test_parsing(self):
+        regex_list = Bot('', None).regex_list
+        user_agents = [unquote(fixture['user_agent']) for fixture in self.load_fixtures()]
+        user_agents += ['Zeus', 'google', 'Report Runner', 'chrome']
+
+        for user_agent in user_agents:
+            dd = DeviceDetector(user_agent)
+            expected = next(
+                (
+                    position
+                    for position, ua_data in enumerate(regex_list)
+                    if ua_data['regex'].search(dd.user_agent)
+                ),
+                None,
+            )
+            # the AhoCorasick words may keep a UA from the regexes, the index may not
+            bot = Bot(dd.user_agent, None, context=dd.parse_context())
+            found = bot.literal_index.exact_match(bot.user_agent) or bot.match_regex_list()
+            self.assertEqual(found and found[0], expected, msg=user_agent)
+
+
+__all__ = [
+    'TestBotIndex',
+    'TestBotIndexFixtures',
+]
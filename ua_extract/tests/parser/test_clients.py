@@ -1,4 +1,5 @@
 from urllib.parse import unquote
+import regex
 from ua_extract.parser import ClientHints
 from ..base import GenericParserTest, ParserBaseTest
 from ...parser import (
@@ -13,6 +14,8 @@ from ...parser import (
     NameVersionExtractor,
     WholeNameExtractor,
 )
+from ...parser.client.browser import AVAILABLE_ENGINES, EngineVersion, VersionedEngine
+from ...settings import BOUNDED_REGEX
 
 
 class ParserClientBase(ParserBaseTest):
@@ -61,6 +64,27 @@ class TestBrowser(ParserClientBase):
     fields = ('name', 'type')
     Parser = Browser
 
+    def test_versioned_engines(self):
+        engines = [ua_data['engine'] for ua_data in Browser('', None).regex_list if 'engine' in ua_data]
+        self.assertTrue(any(isinstance(engine, VersionedEngine) for engine in engines))
+        self.assertFalse(any(isinstance(engine, dict) and 'versions' in engine for engine in engines))
+
+        browser = Browser(
+            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+            '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            None,
+        ).parse()
+        self.assertIs(type(browser.ua_data['engine']), str)
+        self.assertEqual(browser.ua_data['engine'], 'Blink')
+        self.assertEqual(browser.ua_data['engine_version'], '120.0.0.0')
+
+        browser = Browser(
+            'Mozilla/5.0 (compatible; Konqueror/4.1; DragonFly) KHTML/4.1.4 (like Gecko)', None
+        ).parse()
+        self.assertEqual(browser.ua_data['engine'], '')
+        self.assertEqual(browser.ua_data['engine_version'], '4.1')
+        self.assertEqual(browser.short_name(), 'KO')
+
 
 class TestAdobeCC(ParserClientBase):
 
@@ -162,6 +186,32 @@ class TestWholeNameExtractor(GenericParserTest):
             self.assertEqual(wn.name(), '')
 
 
+class TestEngineVersion(ParserBaseTest):
+    """
+    Engine versions must be those of searching the engine version
+    pattern with the regex module.
+    """
+
+    fixture_files = [
+        'tests/parser/fixtures/upstream/client/browser.yml',
+    ]
+
+    def test_engine_versions(self):
+        engines = (*sorted(AVAILABLE_ENGINES), 'ArkWeb', '')
+        for fixture in self.load_fixtures():
+            user_agent = unquote(fixture['user_agent'])
+            for engine in engines:
+                expected = ''
+                pattern = r"{}\s*\/?\s*((?=\d+\.\d)\d+[.\d]*|\d{{1,7}}(?=(?:\D|$)))".format(engine)
+                if engine and (match := regex.search(
+                    BOUNDED_REGEX.format(pattern), user_agent, regex.IGNORECASE
+                )):
+                    expected = (match.group().split('/') + [''])[1]
+                self.assertEqual(
+                    EngineVersion(user_agent).parse(engine), expected, msg=f'{engine}: {user_agent}'
+                )
+
+
 # class TestNoNameExtracted(ParserBaseTest):
 #
 #     fixture_files = [
@@ -184,6 +234,7 @@ class TestWholeNameExtractor(GenericParserTest):
 
 __all__ = (
     'TestBrowser',
+    'TestEngineVersion',
     'TestFeedReader',
     'TestLibrary',
     'TestMediaPlayer',
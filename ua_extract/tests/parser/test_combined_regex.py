@@ -0,0 +1,86 @@
+from unittest import TestCase
+from urllib.parse import unquote
+
+from ..base import ParserBaseTest
+from ...combined_regex import CombinedRegex
+from ...lazy_regex import RegexLazyIgnore
+from ...parser import Bot, Browser, Library, MobileApp, OS
+from ...settings import BOUNDED_REGEX
+
+
+# -----------------------------------------------------------------------
+class TestCombinedRegex(TestCase):
+
+    def test_lowest_index_wins(self):
+        regexes = [
+            RegexLazyIgnore(BOUNDED_REGEX.format(pattern))
+            for pattern in (r'Safari/(\d+)', r'(Chrome)/(\d+)', r'Mozilla/(\d+)')
+        ]
+        combined = CombinedRegex(regexes, chunk_size=2)
+
+        position, matched = combined.first_match('Mozilla/5.0 Chrome/100 Safari/537')
+        self.assertEqual(position, 0)
+        self.assertEqual(matched.group(1), '537')
+
+        # captures keep the group numbering of the winning regex
+        position, matched = combined.first_match('Mozilla/5.0 Chrome/100')
+        self.assertEqual(position, 1)
+        self.assertEqual(matched.groups(), ('Chrome', '100'))
+
+        position, matched = combined.first_match('Mozilla/5.0')
+        self.assertEqual(position, 2)
+
+        self.assertIsNone(combined.first_match('Opera/9.80'))
+
+    def test_chunk_that_fails_to_compile(self):
+        # duplicate group names can't be joined into one alternation
+        regexes = [
+            RegexLazyIgnore(pattern) for pattern in (r'(?P<v>Chrome)', r'(?P<v>Safari)', 'Opera')
+        ]
+        combined = CombinedRegex(regexes)
+        self.assertEqual(combined.first_match('Safari Opera')[0], 1)
+        self.assertEqual(combined.first_match('Opera')[0], 2)
+
+
+class TestCombinedRegexFixtures(ParserBaseTest):
+    """
+    Combined regexes must find the same first matching regex as
+    searching every regex of the fixture files one by one.
+    """
+
+    parser_fixtures = (
+        (Bot, 'tests/fixtures/upstream/bots.yml'),
+        (OS, 'tests/parser/fixtures/upstream/oss.yml'),
+        (Browser, 'tests/parser/fixtures/upstream/client/browser.yml'),
+        (Library, 'tests/parser/fixtures/upstream/client/library.yml'),
+        (MobileApp, 'tests/parser/fixtures/upstream/client/mobile_app.yml'),
+    )
+
+    def test_parsing(self):
+        for Parser, fixture_file in self.parser_fixtures:
+            self.fixture_files = [fixture_file]
+            parser = Parser('', None)
+            regexes = [ua_data['regex'] for ua_data in parser.regex_list]
+            combined = parser.combined_regex
+
+            for fixture in self.load_fixtures():
+                user_agent = unquote(fixture['user_agent'])
+                expected = next(
+                    (
+                        (position, matched.span(), matched.groups())
+                        for position, regex in enumerate(regexes)
+                        if (matched := regex.search(user_agent))
+                    ),
+                    None,
+                )
+                if found := combined.first_match(user_agent):
+                    position, matched = found
+                    found = (position, matched.span(), matched.groups())
+
+                self.assertEqual(found, expected, msg=f'{Parser.__name__}: {user_agent}')
+
+
+__all__ = [
+    'TestCombinedRegex',
+    'TestCombinedRegexFixtures',
+]
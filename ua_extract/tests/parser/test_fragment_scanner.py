@@ -0,0 +1,146 @@
+from unittest import TestCase
+from urllib.parse import unquote
+
+from ..base import ParserBaseTest
+from ...device_detector import DeviceDetector
+from ...fragment_scanner import FragmentScanner, FragmentTable
+from ...lazy_regex import RegexLazy, RegexLazyIgnore
+from ...parser import OSFragment, VendorFragment
+from ...parser.device.device import DEVICE_FRAGMENTS, DEVICE_FRAGMENTS_OWNER
+from ...parser.operating_system import PLATFORM_FRAGMENTS
+from ...settings import BOUNDED_REGEX
+
+
+# -----------------------------------------------------------------------
+class TestFragmentScanner(TestCase):
+
+    def test_scan(self):
+        touch = RegexLazy(BOUNDED_REGEX.format('Touch'))
+        mobile = RegexLazy(BOUNDED_REGEX.format(r'Android( [.0-9]+)?; Mobile;|.*\-mobile$'))
+        tv = RegexLazyIgnore(r'Andr0id|BRAVIA| TV$')
+        scanner = FragmentScanner((touch, mobile, tv))
+        self.assertEqual([scanner.bit(fragment) for fragment in (touch, mobile, tv)], [1, 2, 4])
+
+        def scan(user_agent):
+            return scanner.scan(user_agent, user_agent.lower())
+
+        self.assertEqual(scan('Mozilla/5.0 (Windows NT 6.2; Touch)'), 1)
+        self.assertEqual(scan('Mozilla/5.0 (Android 4.4; Mobile; rv:41.0) bravia'), 6)
+        self.assertEqual(scan('Opera/9.80 generic-mobile'), 2)
+        # case-sensitive fragments only match in their case
+        self.assertEqual(scan('Mozilla/5.0 (Windows NT 6.2; touch) Smart TV'), 4)
+        self.assertEqual(scan('Mozilla/5.0'), 0)
+
+    def test_found_literals(self):
+        scanner = FragmentScanner((RegexLazy('Touch'), RegexLazy('Tablet')))
+        self.assertEqual(scanner.scan('Touch Tablet', 'touch tablet', found_literals=['tablet']), 2)
+
+    def test_first_match(self):
+        scanner = FragmentScanner((RegexLazyIgnore('arm64'), RegexLazyIgnore('x86|.*arm$')))
+        position, matched = scanner.first_match('Linux ARM64 x86', 'linux arm64 x86')
+        self.assertEqual((position, matched.group()), (0, 'ARM64'))
+        self.assertEqual(scanner.first_match('Linux arm', 'linux arm')[0], 1)
+        self.assertIsNone(scanner.first_match('Linux', 'linux'))
+
+
+class TestFragmentTable(TestCase):
+
+    def test_entry_order(self):
+        table = FragmentTable([
+            {'brand': 'Dell', 'regexes': [RegexLazyIgnore('MDDR(JS)?'), RegexLazyIgnore('MDDC')]},
+            {'brand': 'Acer', 'regexes': [RegexLazyIgnore('MAAR')]},
+            {'brand': 'Empty'},
+            {'brand': 'Asus', 'regexes': [RegexLazyIgnore('NP0[26789]')]},
+        ])
+        self.assertEqual(table.entries, (0, 0, 1, 3))
+
+        # the first entry wins, wherever its regex is in the UA
+        position, matched = table.first_match('MAAR; MDDC', 'maar; mddc')
+        self.assertEqual((position, matched.group()), (0, 'MDDC'))
+        self.assertEqual(table.first_match('np06; MAAR', 'np06; maar')[0], 1)
+        self.assertEqual(table.first_match('NP06', 'np06')[0], 3)
+        self.assertIsNone(table.first_match('NP05', 'np05'))
+
+
+class TestDeviceFragmentsFixtures(ParserBaseTest):
+    """
+    The bits of the device fragments must be set exactly
+    for the fragments that each fixture UA contains.
+    """
+
+    fixture_files = [
+        'tests/fixtures/upstream/desktop.yml',
+        'tests/fixtures/upstream/tablet.yml',
+        'tests/fixtures/upstream/tv.yml',
+        'tests/fixtures/upstream/wearable.yml',
+    ]
+
+    def test_scan(self):
+        for fixture in self.load_fixtures():
+            dd = DeviceDetector(unquote(fixture['user_agent']))
+            user_agent = dd.user_agent
+            fragments = DEVICE_FRAGMENTS.fragments
+            expected = [fragment.search(user_agent) is not None for fragment in fragments]
+
+            for found_literals in (None, dd.prefilter_hits().literals(DEVICE_FRAGMENTS_OWNER)):
+                bits = DEVICE_FRAGMENTS.scan(user_agent, user_agent.lower(), found_literals)
+                found = [bits & DEVICE_FRAGMENTS.bit(fragment) != 0 for fragment in fragments]
+                self.assertEqual(found, expected, msg=user_agent)
+
+
+class TestFragmentTablesFixtures(ParserBaseTest):
+    """
+    The fragment tables and platform fragments must find the same first
+    entry as searching every regex one after another.
+    """
+
+    fixture_files = [
+        'tests/fixtures/upstream/desktop.yml',
+        'tests/fixtures/upstream/smartphone.yml',
+        'tests/fixtures/upstream/tv.yml',
+        'tests/fixtures/upstream/bots.yml',
+    ]
+
+    def test_first_match(self):
+        tables = [(Parser, Parser('', None)) for Parser in (OSFragment, VendorFragment)]
+
+        for fixture in self.load_fixtures():
+            dd = DeviceDetector(unquote(fixture['user_agent']))
+            user_agent = dd.user_agent
+            user_agent_lower = user_agent.lower()
+
+            for Parser, parser in tables:
+                expected = next(
+                    (
+                        position
+                        for position, ua_data in enumerate(parser.regex_list)
+                        if any(regex.search(user_agent) for regex in ua_data['regexes'])
+                    ),
+                    None,
+                )
+                found_literals = dd.prefilter_hits().literals(parser.cache_name)
+                self.assertIsNotNone(found_literals)
+                found = parser.fragment_table.first_match(
+                    user_agent, user_agent_lower, found_literals
+                )
+                msg = f'{Parser.__name__}: {user_agent}'
+                self.assertEqual(found and found[0], expected, msg=msg)
+
+            expected = next(
+                (
+                    position
+                    for position, regex in enumerate(PLATFORM_FRAGMENTS.fragments)
+                    if regex.search(user_agent)
+                ),
+                None,
+            )
+            found = PLATFORM_FRAGMENTS.first_match(user_agent, user_agent_lower)
+            self.assertEqual(found and found[0], expected, msg=user_agent)
+
+
+__all__ = [
+    'TestDeviceFragmentsFixtures',
+    'TestFragmentScanner',
+    'TestFragmentTable',
+    'TestFragmentTablesFixtures',
+]
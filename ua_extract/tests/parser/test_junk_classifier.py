@@ -0,0 +1,78 @@
+from unittest import TestCase
+from urllib.parse import unquote
+
+from ..base import ParserBaseTest
+from ...device_detector import DeviceDetector
+from ...junk_classifier import junk_type, junk_types
+from ...utils import (
+    COMMON_BIGRAM_TABLE,
+    COMMON_BIGRAMS,
+    COMMON_TRIGRAM_TABLE,
+    COMMON_TRIGRAMS,
+    LEGAL_BIGRAM_TABLE,
+    LEGAL_BIGRAMS,
+    count_ngrams,
+)
+
+
+# -----------------------------------------------------------------------
+class TestCountNgrams(TestCase):
+
+    def test_findall_counts(self):
+        tables = (
+            (LEGAL_BIGRAMS, LEGAL_BIGRAM_TABLE, 2),
+            (COMMON_BIGRAMS, COMMON_BIGRAM_TABLE, 2),
+            (COMMON_TRIGRAMS, COMMON_TRIGRAM_TABLE, 3),
+        )
+        for user_agent in ('', 'a', 'thethe', 'zipscarwash', 'jqsmartband', '3dqg2p_hkum', 'ththt'):
+            for regex, table, size in tables:
+                self.assertEqual(
+                    count_ngrams(user_agent, table, size),
+                    len(regex.findall(user_agent)),
+                    msg=f'{regex.pattern[:20]}: {user_agent}',
+                )
+
+
+class TestJunkTypes(TestCase):
+
+    def test_junk_types(self):
+        user_agents = [
+            '21/4.35.1.2',
+            '{1378F00B-BCEA-418F-B1AF-C343EA4F9417}',
+            '001471FmBjtgZvahkMJdcGJhhjXuuD99',
+            'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/115.0',
+            'ZipsCarWash',
+        ]
+        expected = ['Numeric', 'UUID', 'Gibberish', None, None]
+        self.assertEqual(junk_types(user_agents * 2), expected * 2)
+        self.assertEqual(junk_type('15B93', '15b93'), 'Numeric')
+
+
+class TestJunkTypesFixtures(ParserBaseTest):
+    """
+    The junk types of fixture UAs must be those of the numeric, UUID
+    and gibberish checks of DeviceDetector, in their order.
+    """
+
+    fixture_files = [
+        'tests/fixtures/local/normalize.yml',
+        'tests/fixtures/local/app_names.yml',
+        'tests/fixtures/upstream/bots.yml',
+    ]
+
+    def test_junk_types(self):
+        user_agents = [unquote(fixture['user_agent']) for fixture in self.load_fixtures()]
+        for user_agent, found in zip(user_agents, junk_types(user_agents)):
+            dd = DeviceDetector(user_agent)
+            checks = (('Numeric', dd.is_digit), ('UUID', dd.is_uuid), ('Gibberish', dd.is_gibberish))
+            expected = next((junk for junk, check in checks if check()), None)
+            self.assertEqual(found, expected, msg=user_agent)
+            if found:
+                self.assertEqual(dd.normalize(), found, msg=user_agent)
+
+
+__all__ = [
+    'TestCountNgrams',
+    'TestJunkTypes',
+    'TestJunkTypesFixtures',
+]
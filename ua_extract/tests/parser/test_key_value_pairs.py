@@ -1,6 +1,37 @@
 import unittest
-
-from ...parser.key_value_pairs import key_value_pairs
+from urllib.parse import unquote
+
+from ..base import ParserBaseTest
+from ...parser.key_value_pairs import (
+    CONTAINS_URL,
+    NAME_VERSION_REGEXES,
+    VERSION_NAME_REGEXES,
+    NameVersion,
+    extract_version_name_pairs,
+    from_name_runs,
+    key_value_pairs,
+    scrub_name_version_pairs,
+)
+from ...utils import clean_ua
+
+
+def search_all_regexes(ua):
+    """
+    Pairs of searching every regex of the cascade, with findall and sub.
+    """
+    substring = CONTAINS_URL.sub(' ', ua)
+    all_pairs = []
+    for rgx in VERSION_NAME_REGEXES:
+        all_pairs.extend(extract_version_name_pairs(rgx, substring))
+    if all_pairs:
+        return all_pairs
+
+    for rgx in NAME_VERSION_REGEXES:
+        matches = rgx.findall(substring)
+        if matches:
+            substring = rgx.sub(' ', substring)
+        all_pairs.extend(scrub_name_version_pairs([NameVersion(*pair) for pair in matches]))
+    return all_pairs
 
 
 class TestKeyValuePairs(unittest.TestCase):
@@ -148,3 +179,34 @@ class TestKeyValuePairs(unittest.TestCase):
             [('version', 'Version', '12.520')],
         )
 
+
+class TestFromNameRuns(unittest.TestCase):
+
+    def test_from_name_runs(self):
+        self.assertEqual(
+            from_name_runs(r'(?P<name>[\w ]+)/(?P<version>[\d\.]+)'),
+            r'(?:\G|(?<![\w ]))(?P<name>[\w ]+)/(?P<version>[\d\.]+)',
+        )
+        self.assertEqual(from_name_runs(r'^(?P<name>[\w ]+)/'), r'^(?P<name>[\w ]+)/')
+
+
+class TestKeyValuePairsFixtures(ParserBaseTest):
+    """
+    The pairs of fixture UAs must be the same as searching
+    every regex of the cascade with findall and sub.
+    """
+
+    fixture_files = [
+        'tests/fixtures/local/app_names.yml',
+        'tests/parser/fixtures/local/client/extractor_name_version.yml',
+        'tests/parser/fixtures/local/client/extractor_whole_name.yml',
+        'tests/parser/fixtures/upstream/client/mobile_app.yml',
+        'tests/fixtures/upstream/desktop.yml',
+    ]
+
+    def test_key_value_pairs(self):
+        for fixture in self.load_fixtures():
+            user_agent = unquote(fixture['user_agent'])
+            user_agent = clean_ua(user_agent, user_agent.lower())
+            expected = search_all_regexes(user_agent)
+            self.assertEqual(key_value_pairs(user_agent), expected, msg=user_agent)
@@ -0,0 +1,329 @@
+from unittest import TestCase
+from urllib.parse import unquote
+import re
+import regex
+
+from ...lazy_regex import (
+    FoldedMatch,
+    LiteralMatch,
+    RegexFolded,
+    RegexLazy,
+    RegexLazyIgnore,
+    RegexLiteral,
+    StdlibRegex,
+    bounded_regex,
+    bounded_start,
+    boundary_start,
+    compile_regex,
+    fold_pattern,
+    prefer_stdlib,
+)
+from ..base import ParserBaseTest
+from ...parser import Bot, Console
+from ...parser.parser import perform_substitutions
+from ...settings import BOUNDED_REGEX
+
+# Text before a literal, around the left boundary of BOUNDED_REGEX
+BOUNDARY_CONTEXTS = (
+    '',
+    ' ',
+    '.',
+    'a',
+    'A',
+    '1',
+    '_',
+    '-',
+    '__',
+    'a_',
+    ' _',
+    '-_',
+    'sprd-',
+    'SPRD-',
+    'xsprd-',
+    'MZ-',
+    'xmz-',
+    'mz_',
+    'a-',
+)
+
+
+# -----------------------------------------------------------------------
+class TestRegexLazy(TestCase):
+    def test_compiled_on_first_use(self):
+        lazy = RegexLazyIgnore(r'Darwin/(\d+)')
+        self.assertNotIn('compiled', vars(lazy))
+        self.assertEqual(lazy.search('CFNetwork darwin/22').group(1), '22')
+        self.assertIn('compiled', vars(lazy))
+        # later calls don't go through RegexLazy
+        self.assertEqual(vars(lazy)['search'], lazy.compiled.search)
+        self.assertEqual(lazy.groups, 1)
+        self.assertNotIn('groups', vars(lazy))
+
+    def test_equality(self):
+        lazy = RegexLazyIgnore('Darwin/')
+        self.assertEqual(lazy, RegexLazyIgnore('Darwin/'))
+        self.assertEqual(hash(lazy), hash(RegexLazyIgnore('Darwin/')))
+        self.assertNotEqual(lazy, RegexLazy('Darwin/'))
+        self.assertNotEqual(lazy, None)
+        self.assertNotIn('compiled', vars(lazy))
+
+    def test_missing_attribute(self):
+        with self.assertRaises(AttributeError):
+            RegexLazy('Darwin/').not_a_regex_attribute
+
+
+class TestRegexLiteral(TestCase):
+    def test_bounded_regex(self):
+        self.assertIsInstance(bounded_regex('WireReaderBot'), RegexLiteral)
+        self.assertIsInstance(bounded_regex('Fire(?:fox)?|Iceweasel'), RegexLiteral)
+        self.assertIsInstance(bounded_regex(r'Googlebot(?:/(\d+))?'), RegexLazyIgnore)
+        self.assertIsInstance(bounded_regex('^WireReaderBot'), RegexLazyIgnore)
+        self.assertIsInstance(bounded_regex('(WireReader)Bot'), RegexLazyIgnore)
+
+    def test_bounded_start(self):
+        compiled = regex.compile(BOUNDED_REGEX.format('bot'), regex.IGNORECASE)
+        for context in BOUNDARY_CONTEXTS:
+            string = f'{context}bot'
+            self.assertEqual(
+                bounded_start(string.lower(), len(context)),
+                compiled.search(string) is not None,
+                msg=string,
+            )
+
+    def test_search(self):
+        regex_literal = bounded_regex('Fire(?:fox)?|Iceweasel')
+        for context in BOUNDARY_CONTEXTS:
+            for string in (f'{context}FIREFOX/100', f'x{context}iceWeasel', f'{context}fir'):
+                self.assertEqual(
+                    regex_literal.search(string) is not None,
+                    regex_literal.regex.search(string) is not None,
+                    msg=string,
+                )
+
+    def test_non_ascii(self):
+        # Kelvin sign matches "k" case-insensitively, but isn't lowercased to it
+        regex_literal = bounded_regex('Kik')
+        self.assertIsNotNone(regex_literal.search('Kik'))
+        self.assertIsNone(regex_literal.search('Ki'))
+
+    def test_match_details(self):
+        matched = bounded_regex('WireReaderBot').search('Mozilla (WireReaderBot)')
+        self.assertIsInstance(matched, LiteralMatch)
+        self.assertEqual(matched.group(), '(WireReaderBot')
+        self.assertEqual(matched.span(), (8, 22))
+
+    def test_substitutions(self):
+        user_agent = 'Mozilla (WireReaderBot)'
+        for template in ('Wire_Reader', r'\g<0>', r'Bot \g<1>'):
+            literal_match = bounded_regex('WireReaderBot').search(user_agent)
+            regex_match = RegexLazyIgnore(BOUNDED_REGEX.format('WireReaderBot')).search(user_agent)
+            self.assertEqual(
+                perform_substitutions(template, literal_match, ' '),
+                perform_substitutions(template, regex_match, ' '),
+                msg=template,
+            )
+
+
+class TestRegexEngines(TestCase):
+    def test_prefer_stdlib(self):
+        self.assertTrue(prefer_stdlib(BOUNDED_REGEX.format('Nexus|Galaxy'), regex.IGNORECASE))
+        # regex module skips to the literals every match contains
+        self.assertFalse(prefer_stdlib(BOUNDED_REGEX.format('Googlebot'), regex.IGNORECASE))
+        self.assertFalse(prefer_stdlib(BOUNDED_REGEX.format('Chr[o0]me/'), regex.IGNORECASE))
+        # matched differently in ASCII strings
+        self.assertFalse(prefer_stdlib(r'Nexus\s5|Galaxy', regex.IGNORECASE))
+        self.assertFalse(prefer_stdlib('Nexus|Galaxy|Ｇalaxy', regex.IGNORECASE))
+        self.assertFalse(prefer_stdlib('Nexus|Galaxy', regex.IGNORECASE | regex.V1))
+
+    def test_compile_regex(self):
+        self.assertIsInstance(compile_regex('Nexus|Galaxy', regex.IGNORECASE), StdlibRegex)
+        self.assertIsInstance(compile_regex('Googlebot', regex.IGNORECASE), regex.Pattern)
+        # variable-width lookbehind
+        compiled = compile_regex('(?<!GOG|GOG )Galaxy|Nexus', regex.IGNORECASE)
+        self.assertIsInstance(compiled, regex.Pattern)
+
+    def test_stdlib_regex(self):
+        pattern = BOUNDED_REGEX.format(r'(?:Nexus|Galaxy) (\w+)')
+        compiled = compile_regex(pattern, regex.IGNORECASE)
+        self.assertIsInstance(compiled, StdlibRegex)
+        self.assertIsInstance(compiled.search('Android; Nexus 5X'), re.Match)
+
+        expected = regex.compile(pattern, regex.IGNORECASE)
+        # \w differs for superscripts and combining marks
+        for string in ('Android; Nexus 5X', 'GALAXY Tab', 'Galaxy ²', 'Galaxy e\u0301', 'Nexus'):
+            regex_match = expected.search(string)
+            stdlib_match = compiled.search(string)
+            self.assertEqual(
+                regex_match and regex_match.span(1),
+                stdlib_match and stdlib_match.span(1),
+                msg=string,
+            )
+
+    def test_substitutions(self):
+        pattern = BOUNDED_REGEX.format(r'(?:Nexus|Galaxy) (\w+)')
+        user_agent = 'Android; Nexus 5X'
+        stdlib_match = compile_regex(pattern, regex.IGNORECASE).search(user_agent)
+        regex_match = regex.compile(pattern, regex.IGNORECASE).search(user_agent)
+        for template in ('Nexus \\g<1>', 'Nexus', 'Nexus \\g<2>'):
+            self.assertEqual(
+                perform_substitutions(template, stdlib_match, ' '),
+                perform_substitutions(template, regex_match, ' '),
+                msg=template,
+            )
+
+
+class TestRegexFolded(TestCase):
+    def test_fold_pattern(self):
+        self.assertEqual(fold_pattern(r'Nexus (\d+)[A-F]?\W'), r'nexus (\d+)[a-f]?\W')
+        self.assertEqual(fold_pattern(r'[]A-Z][^]a-z]'), r'[]a-z][^]a-z]')
+        self.assertEqual(fold_pattern(r'(?<=X)Y(?!Z)'), r'(?<=x)y(?!z)')
+        for pattern in (
+            r'(?i)Nexus',
+            r'(?P<name>Nexus)',
+            r'(?<name>Nexus)',
+            r'Nexus\x41',
+            r'\p{Lu}',
+            r'[A-z]',
+            r'[!-~]',
+            r'[A-\]]',
+            r'[\.-Z]',
+            r'[[:upper:]]',
+            'Nexus\u00e9',
+        ):
+            self.assertIsNone(fold_pattern(pattern), msg=pattern)
+
+    def test_bounded_regex(self):
+        self.assertIsInstance(bounded_regex(r'Nexus (\d+)', folded=True), RegexFolded)
+        self.assertIsInstance(bounded_regex(r'Nexus (\d+)'), RegexLazyIgnore)
+        self.assertIsInstance(bounded_regex(r'(?i)Nexus (\d+)', folded=True), RegexLazyIgnore)
+        self.assertIsInstance(bounded_regex('Nexus', folded=True), RegexLiteral)
+
+    def test_search(self):
+        regex_folded = bounded_regex(r'(?:Nexus|Galaxy) ([A-Z]+\d*)', folded=True)
+        expected = regex_folded.regex
+        for string in ('Android; NEXUS Hx5', 'galaxy tab', 'MyGalaxy S2', 'Galaxy É', 'Nexus'):
+            folded_match = regex_folded.search(string)
+            regex_match = expected.search(string)
+            self.assertEqual(folded_match is None, regex_match is None, msg=string)
+            if regex_match:
+                self.assertEqual(folded_match.span(), regex_match.span(), msg=string)
+                self.assertEqual(folded_match.groups(), regex_match.groups(), msg=string)
+
+        folded_match = regex_folded.search('Android; NEXUS Hx5')
+        self.assertIsInstance(folded_match, FoldedMatch)
+        self.assertEqual(folded_match.group(1), 'Hx5')
+        self.assertEqual(folded_match[0], ' NEXUS Hx5')
+        # non-ASCII strings are searched with the regex
+        self.assertIsInstance(regex_folded.search('Galaxy Ñ1 Galaxy B1'), regex.Match)
+
+    def test_substitutions(self):
+        regex_folded = bounded_regex(r'(?:Nexus|Galaxy) ([A-Z]+)(\d)?', folded=True)
+        user_agent = 'Android; NEXUS Hx'
+        folded_match = regex_folded.search(user_agent)
+        regex_match = regex_folded.regex.search(user_agent)
+        for template in ('Nexus \\g<1>', 'Nexus \\g<2>', 'Nexus', 'Nexus \\g<3>', 'Nexus \\1'):
+            self.assertEqual(
+                perform_substitutions(template, folded_match, ' '),
+                perform_substitutions(template, regex_match, ' '),
+                msg=template,
+            )
+
+    def test_scan(self):
+        regex_folded = bounded_regex(r'(?:Nexus|Galaxy) ([A-Z]+\d*)', folded=True)
+        self.assertTrue(regex_folded.scan)
+        self.assertFalse(bounded_regex(r'.*Nexus ([A-Z]+)', folded=True).scan)
+
+        expected = regex_folded.regex
+        for context in BOUNDARY_CONTEXTS:
+            for string in (f'{context}Nexus A1', f'X{context}Galaxy Nexus B2 {context}Nexus C3'):
+                folded_match = regex_folded.search(string)
+                regex_match = expected.search(string)
+                self.assertEqual(folded_match is None, regex_match is None, msg=string)
+                if regex_match:
+                    self.assertEqual(folded_match.span(), regex_match.span(), msg=string)
+                    self.assertEqual(folded_match.group(), regex_match.group(), msg=string)
+                    self.assertEqual(folded_match.span(1), regex_match.span(1), msg=string)
+
+    def test_scan_engine(self):
+        # stdlib \s also matches \x1f, the regex module doesn't
+        regex_folded = bounded_regex(r'DUKE\s+II(?:[);/ ]|$)', folded=True)
+        self.assertIsInstance(regex_folded.scan, regex.Pattern)
+        self.assertIsNone(regex_folded.search('Android 4.2; Duke\x1fII) Mobile'))
+        self.assertIsNotNone(regex_folded.search('Android 4.2; Duke II) Mobile'))
+        regex_folded = bounded_regex(r'(?:Nexus|Galaxy) ([A-Z]+\d*)', folded=True)
+        self.assertIsInstance(regex_folded.scan, re.Pattern)
+
+    def test_boundary_start(self):
+        for context in BOUNDARY_CONTEXTS:
+            string = f'{context}bot'.lower()
+            if bounded_start(string, len(context)):
+                regex_match = regex.search(BOUNDED_REGEX.format('bot'), string, regex.IGNORECASE)
+                self.assertEqual(
+                    boundary_start(string, len(context)), regex_match.start(), msg=string
+                )
+
+
+class TestRegexFoldedFixtures(ParserBaseTest):
+    """
+    Folded console regexes must match the fixture UAs like the regexes.
+    """
+
+    fixture_files = [
+        'tests/fixtures/upstream/console.yml',
+    ]
+
+    def test_parsing(self):
+        class FoldedConsole(Console):
+            CASE_FOLDED_REGEXES = True
+
+        regexes = [
+            regex_folded
+            for ua_data in FoldedConsole('', None).regex_list
+            for regex_folded in [
+                ua_data['regex'],
+                *(model['regex'] for model in ua_data.get('models', [])),
+            ]
+            if isinstance(regex_folded, RegexFolded)
+        ]
+        self.assertTrue(regexes)
+
+        for fixture in self.load_fixtures():
+            user_agent = unquote(fixture['user_agent'])
+            for regex_folded in regexes:
+                folded_match = regex_folded.search(user_agent)
+                regex_match = regex_folded.regex.search(user_agent)
+                self.assertEqual(
+                    folded_match and (folded_match.span(), folded_match.groups()),
+                    regex_match and (regex_match.span(), regex_match.groups()),
+                    msg=f'{regex_folded.pattern!r} {user_agent!r}',
+                )
+
+
+class TestRegexLiteralFixtures(TestCase):
+    """
+    Literal bot regexes must match the same strings as the regexes.
+    """
+
+    def test_bot_literals(self):
+        for ua_data in Bot('', None).regex_list:
+            regex_literal = ua_data['regex']
+            if not isinstance(regex_literal, RegexLiteral):
+                continue
+            for literal in regex_literal.literals:
+                for context in BOUNDARY_CONTEXTS:
+                    string = f'Mozilla/5.0 {context}{literal.upper()}/1.0'
+                    self.assertEqual(
+                        regex_literal.search(string) is not None,
+                        regex_literal.regex.search(string) is not None,
+                        msg=f'{regex_literal.pattern!r} {string!r}',
+                    )
+
+
+__all__ = [
+    'TestRegexEngines',
+    'TestRegexFolded',
+    'TestRegexFoldedFixtures',
+    'TestRegexLazy',
+    'TestRegexLiteral',
+    'TestRegexLiteralFixtures',
+]
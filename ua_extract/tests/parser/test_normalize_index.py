@@ -0,0 +1,76 @@
+from unittest import TestCase
+from urllib.parse import unquote
+
+from ..base import ParserBaseTest
+from ...device_detector import DeviceDetector
+from ...lazy_regex import RegexLazyIgnore
+from ...normalize_index import NORMALIZE_OWNER, NormalizeIndex
+from ...yaml_loader import normalized_literal_index, normalized_regex_list
+
+
+def substitute_all(regex_list, user_agent):
+    for nr in regex_list:
+        if (normalized := nr['regex'].sub(nr['groups'], user_agent)) != user_agent:
+            return normalized
+    return ''
+
+
+# -----------------------------------------------------------------------
+class TestNormalizeIndex(TestCase):
+
+    def test_candidates(self):
+        regex_list = [
+            {'regex': RegexLazyIgnore(r'^@([\d\w]{20,})$'), 'groups': 'Gibberish'},
+            {'regex': RegexLazyIgnore(r'([A-Z]+_[\d+\.]+)_(?:.*)'), 'groups': r'\g<1>'},
+            {'regex': RegexLazyIgnore(r'(^\d+)[a-zA-Z0-9]{20,}'), 'groups': 'Gibberish'},
+        ]
+        index = NormalizeIndex(regex_list)
+        self.assertEqual(list(index.candidates('mozilla/5.0 (linux)')), [])
+        self.assertEqual(list(index.candidates('@abc_1.0_')), [0, 1])
+        self.assertEqual(list(index.candidates('123abc')), [2])
+        self.assertEqual(list(index.candidates('')), [])
+        # Literal analysis only holds for ASCII
+        self.assertEqual(list(index.candidates('ü')), [0, 1, 2])
+
+    def test_first_change(self):
+        regex_list = [
+            # matches, but doesn't change the UA
+            {'regex': RegexLazyIgnore(r'(AVG\d+)(?:.*)'), 'groups': r'\g<1>'},
+            {'regex': RegexLazyIgnore(r'^(AVG\d+)'), 'groups': 'AVG'},
+        ]
+        index = NormalizeIndex(regex_list)
+        self.assertEqual(index.normalize('AVG2024'), 'AVG')
+        self.assertEqual(index.normalize('AVG2024 Setup'), 'AVG2024')
+        self.assertEqual(index.normalize('Mozilla/5.0'), '')
+
+
+class TestNormalizeIndexFixtures(ParserBaseTest):
+    """
+    The normalize index must change fixture UAs the same way as
+    substituting every normalizing regex one after another.
+    """
+
+    fixture_files = [
+        'tests/fixtures/local/normalize.yml',
+        'tests/fixtures/local/app_names.yml',
+        'tests/fixtures/upstream/desktop.yml',
+        'tests/fixtures/upstream/smartphone.yml',
+    ]
+
+    def test_normalize(self):
+        fixture_files = DeviceDetector.fixture_files
+        regex_list = normalized_regex_list(fixture_files)
+        index = normalized_literal_index(fixture_files)
+
+        for fixture in self.load_fixtures():
+            dd = DeviceDetector(unquote(fixture['user_agent']))
+            user_agent = dd.user_agent
+            expected = substitute_all(regex_list, user_agent)
+            for found_literals in (None, dd.prefilter_hits().literals(NORMALIZE_OWNER)):
+                self.assertEqual(index.normalize(user_agent, found_literals), expected, msg=user_agent)
+
+
+__all__ = [
+    'TestNormalizeIndex',
+    'TestNormalizeIndexFixtures',
+]
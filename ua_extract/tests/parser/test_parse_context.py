@@ -0,0 +1,106 @@
+from unittest import TestCase
+from urllib.parse import unquote
+
+from ..base import ParserBaseTest
+from ...device_detector import DeviceDetector
+from ...parser import (
+    OS,
+    AdobeCC,
+    ApplicationIDExtractor,
+    Browser,
+    ClientHints,
+    DictUA,
+    HbbTv,
+    Messaging,
+    MobileApp,
+    NameVersionExtractor,
+    ParseContext,
+    ShellTv,
+)
+from ...parser.key_value_pairs import key_value_pairs
+
+
+# -----------------------------------------------------------------------
+class TestParseContext(TestCase):
+
+    def test_derived_details(self):
+        headers = {'sec-ch-ua': '"Chromium";v="124", "Google Chrome";v="124"'}
+        client_hints = ClientHints.new(headers)
+        context = ParseContext('Mozilla/5.0 (Linux; Android 14) Chrome/124.0', client_hints)
+        self.assertEqual(context.user_agent_lower, 'mozilla/5.0 (linux; android 14) chrome/124.0')
+        self.assertEqual(context.ch_client_data, client_hints.client_data())
+        self.assertIsNone(context.prefilter_hits)
+
+    def test_memoized(self):
+        user_agent = 'HotelSearch/187 CFNetwork/1410.0.3 Darwin/22.6.0'
+        context = ParseContext(user_agent, None)
+        pairs = context.key_value_pairs()
+        self.assertEqual(pairs, key_value_pairs(user_agent))
+        self.assertIs(context.key_value_pairs(), pairs)
+        self.assertTrue(context.ends_with_darwin())
+        self.assertFalse(context.is_ios_fragment())
+        self.assertTrue(ParseContext('iPhone14mini', None).is_ios_fragment())
+
+    def test_shared_by_parsers(self):
+        user_agent = 'HotelSearch/187 CFNetwork/1410.0.3 Darwin/22.6.0'
+        context = ParseContext(user_agent, None)
+        for Parser in (OS, Browser, MobileApp, NameVersionExtractor):
+            shared = Parser(user_agent, None, context=context).parse()
+            alone = Parser(user_agent, None).parse()
+            self.assertIs(shared.context, context)
+            self.assertEqual(shared.ua_data, alone.ua_data, msg=Parser.__name__)
+
+    def test_device_detector(self):
+        user_agent = 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) Mobile/15E148'
+        dd = DeviceDetector(user_agent, skip_bot_detection=True).parse()
+        context = dd.parse_context()
+        self.assertIs(dd.os.context, context)
+        self.assertIs(dd.device.context, context)
+        self.assertIs(context.prefilter_hits, dd.prefilter_hits())
+
+
+class TestCanMatch(ParserBaseTest):
+    """
+    Parsers that can't match a UA, according to its context,
+    must not parse any data from it.
+    """
+
+    fixture_files = [
+        'tests/parser/fixtures/local/client/adobe_cc.yml',
+        'tests/parser/fixtures/local/client/dictua.yml',
+        'tests/parser/fixtures/upstream/client/browser.yml',
+        'tests/fixtures/upstream/tv.yml',
+        'tests/fixtures/upstream/tv-1.yml',
+        'tests/fixtures/local/normalize.yml',
+    ]
+
+    def test_can_match(self):
+        parsers = (AdobeCC, DictUA, Messaging, HbbTv, ShellTv)
+        matched = {Parser: 0 for Parser in parsers}
+        for fixture in self.load_fixtures():
+            user_agent = unquote(fixture['user_agent'])
+            context = ParseContext(user_agent, None)
+            for Parser in parsers:
+                parsed = Parser(user_agent, None, context=context).parse()
+                if not Parser.can_match(context):
+                    self.assertEqual(parsed.ua_data, {}, msg=f'{Parser.__name__}: {user_agent}')
+                elif parsed.ua_data:
+                    matched[Parser] += 1
+
+        for Parser in (AdobeCC, DictUA, HbbTv, ShellTv):
+            self.assertTrue(matched[Parser], msg=Parser.__name__)
+
+    def test_slots(self):
+        for parser in (
+            OS('Mozilla/5.0', None),
+            MobileApp('Mozilla/5.0', None),
+            ShellTv('Mozilla/5.0', None),
+            ApplicationIDExtractor('Mozilla/5.0'),
+        ):
+            self.assertFalse(hasattr(parser, '__dict__'), msg=repr(parser))
+
+
+__all__ = [
+    'TestCanMatch',
+    'TestParseContext',
+]
@@ -0,0 +1,63 @@
+from unittest import TestCase
+from urllib.parse import unquote
+
+from ..base import ParserBaseTest
+from ...device_detector import DeviceDetector
+from ...prefilter import SharedPrefilter
+
+
+# -----------------------------------------------------------------------
+class TestSharedPrefilter(TestCase):
+
+    def test_hits_per_owner(self):
+        prefilter = SharedPrefilter(
+            words={'Bot': ['bot', 'crawler'], 'Console': ['xbox', 'bot'], 'Empty': []},
+            literals={'Bot': ['crawler/', 'spider']},
+        )
+        hits = prefilter.scan('mozilla/5.0 (xbox) crawler/1.0')
+
+        self.assertEqual(sorted(hits.words('Bot')), ['crawler'])
+        self.assertEqual(hits.words('Console'), ['xbox'])
+        self.assertEqual(hits.literals('Bot'), ['crawler/'])
+
+        # no patterns in the shared automaton, so must be scanned by the owner
+        self.assertIsNone(hits.words('Empty'))
+        self.assertIsNone(hits.literals('Console'))
+
+    def test_no_hits(self):
+        prefilter = SharedPrefilter(words={'Bot': ['bot']}, literals={})
+        self.assertEqual(prefilter.scan('mozilla/5.0').words('Bot'), [])
+
+
+class TestSharedPrefilterParsing(ParserBaseTest):
+    """
+    Parsers using the shared prefilter must return the same
+    details as parsers scanning the UA with their own automaton.
+    """
+
+    fixture_files = [
+        'tests/fixtures/upstream/camera.yml',
+        'tests/fixtures/upstream/car_browser.yml',
+        'tests/fixtures/upstream/feed_reader.yml',
+    ]
+
+    def test_parsing(self):
+        for fixture in self.load_fixtures():
+            user_agent = unquote(fixture['user_agent'])
+            dd = DeviceDetector(user_agent)
+            context = dd.parse_context()
+
+            for Parser in dd.prefilter_parsers():
+                expected = Parser(dd.user_agent, None).parse().ua_data
+                if dd.skip_parser(Parser):
+                    self.assertEqual(expected, {}, msg=f'{Parser.__name__}: {user_agent}')
+                    continue
+
+                parser = Parser(dd.user_agent, None, context=context).parse()
+                self.assertEqual(parser.ua_data, expected, msg=f'{Parser.__name__}: {user_agent}')
+
+
+__all__ = [
+    'TestSharedPrefilter',
+    'TestSharedPrefilterParsing',
+]
@@ -0,0 +1,141 @@
+from unittest import TestCase
+from urllib.parse import unquote
+
+from ..base import ParserBaseTest
+from ... import DeviceDetector
+from ...lazy_regex import bounded_regex
+from ...parser import Browser, OS
+from ...regex_batch import MIN_BUFFERED_UAS, UABuffer, batch_first_matches, batch_regex, parse_batch
+from ...regex_literals import LiteralIndex
+from ...settings import DDCache
+
+
+def first_matches(regexes, user_agents):
+    return [
+        next(
+            (position for position, regex in enumerate(regexes) if regex and regex.search(user_agent)),
+            None,
+        )
+        for user_agent in user_agents
+    ]
+
+
+# -----------------------------------------------------------------------
+class TestUABuffer(TestCase):
+
+    def test_matching_indexes(self):
+        user_agents = ['chrome/100', 'safari', 'opera', 'chrome/99']
+        buffer = UABuffer(user_agents, [0, 1, 3])
+        self.assertEqual(buffer.text, 'chrome/100\nsafari\nchrome/99')
+        self.assertEqual(buffer.starts, [0, 11, 18])
+
+        compiled = batch_regex(bounded_regex('Chrome/(\\d+)', folded=True))
+        self.assertEqual(buffer.matching_indexes(compiled), {0, 3})
+
+        # a match that runs past the end of a UA includes the UAs it runs into
+        compiled = batch_regex(bounded_regex('safari[^/]+chrome', folded=True))
+        self.assertEqual(buffer.matching_indexes(compiled), {1, 3})
+
+    def test_unbatched_regexes(self):
+        self.assertIsNone(batch_regex(bounded_regex('Chrome|Safari')))
+        self.assertIsNone(batch_regex(bounded_regex('Chrome(?!/100)')))
+        self.assertIsNotNone(batch_regex(bounded_regex('Chrome/(\\d+)')))
+
+
+class TestBatchFirstMatches(TestCase):
+
+    def first_matches(self, patterns, user_agents):
+        regexes = [bounded_regex(pattern, folded=True) for pattern in patterns]
+        index = LiteralIndex([regex.pattern for regex in regexes])
+        found = batch_first_matches(regexes, user_agents, index)
+        self.assertEqual(found, first_matches(regexes, user_agents))
+        return found
+
+    def test_lowest_index_wins(self):
+        user_agents = ['Mozilla/5.0 Chrome/100 Safari/537', 'Mozilla/5.0 Chrome/100', 'Opera/9.80']
+        user_agents *= MIN_BUFFERED_UAS
+        found = self.first_matches(
+            [r'Safari/(\d+)', r'(Chrome)/(\d+)', r'Mozilla/(\d+)'], user_agents
+        )
+        self.assertEqual(found[:3], [0, 1, None])
+
+    def test_matches_across_user_agents(self):
+        # the buffer matches span UAs, which are confirmed one by one
+        user_agents = ['Foo Safari', 'Chrome Bar', 'Chrome/1', 'Foo'] * MIN_BUFFERED_UAS
+        found = self.first_matches(
+            [r'Safari[^/]+Chrome', r'Bar$', r'^Chrome', r'Safari\s*$'], user_agents
+        )
+        self.assertEqual(found[:4], [3, 1, 2, None])
+
+    def test_unbuffered_user_agents(self):
+        user_agents = ['Mozilla/5.0 İ Chrome/100', 'Chrome\n/100', 'Chrome/100'] * MIN_BUFFERED_UAS
+        found = self.first_matches([r'İ Chrome/(\d+)', r'Chrome/(\d+)'], user_agents)
+        self.assertEqual(found[:3], [0, None, 1])
+
+
+class TestRegexBatchFixtures(ParserBaseTest):
+    """
+    Searching the regexes in batches of fixture UAs must find the same
+    first matching regex as searching each UA in order.
+    """
+
+    parser_fixtures = (
+        (OS, 'tests/parser/fixtures/upstream/oss.yml'),
+        (Browser, 'tests/parser/fixtures/upstream/client/browser.yml'),
+    )
+
+    def test_first_matches(self):
+        for Parser, fixture_file in self.parser_fixtures:
+            self.fixture_files = [fixture_file]
+            parser = Parser('', None)
+            regexes = [ua_data.get('regex') for ua_data in parser.regex_list]
+            user_agents = [unquote(fixture['user_agent']) for fixture in self.load_fixtures()]
+
+            found = batch_first_matches(regexes, user_agents, parser.literal_index)
+            expected = first_matches(regexes, user_agents)
+            for user_agent, position, expected_position in zip(user_agents, found, expected):
+                self.assertEqual(position, expected_position, msg=f'{Parser.__name__}: {user_agent}')
+
+
+class TestParseBatch(TestCase):
+
+    def test_parse_batch(self):
+        user_agents = [
+            'Mozilla/5.0 (Linux; Android 12; SM-G991B) AppleWebKit/537.36 (KHTML, like Gecko) '
+            'Chrome/108.0.0.0 Mobile Safari/537.36',
+            'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/115.0',
+            'Googlebot/2.1 (+http://www.google.com/bot.html)',
+            'Mozilla/5.0 (iPhone; CPU iPhone OS 16_5 like Mac OS X) AppleWebKit/605.1.15 '
+            '(KHTML, like Gecko) Version/16.5 Mobile/15E148 Safari/604.1',
+            'curl/7.88.1',
+            '',
+        ] * 3
+
+        devices = parse_batch(user_agents, batch_size=4)
+        self.assertEqual(len(devices), len(user_agents))
+        for device in devices:
+            self.assertIsNone(device.parse_context().batch_matches)
+
+        for user_agent, device in zip(user_agents, devices):
+            expected = DeviceDetector(user_agent).parse()
+            self.assertEqual(device.all_details, expected.all_details, msg=user_agent)
+
+    def test_batch_matches_of_context(self):
+        user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/115.0'
+
+        # a batch that found no OS regex matching the UA
+        device = DeviceDetector(user_agent, skip_bot_detection=True)
+        device.parse_context().batch_matches = {'OS': {device.user_agent: None}}
+        self.assertEqual(device.parse().os_name(), '')
+        DDCache['user_agents'].pop(device.ua_hash)
+
+        # detectors outside the batch are not affected
+        self.assertEqual(DeviceDetector(user_agent).parse().os_name(), 'Windows')
+
+
+__all__ = [
+    'TestBatchFirstMatches',
+    'TestParseBatch',
+    'TestRegexBatchFixtures',
+    'TestUABuffer',
+]
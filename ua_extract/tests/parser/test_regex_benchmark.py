@@ -0,0 +1,33 @@
+from unittest import TestCase
+
+from ...parser import Camera
+from ...regex_benchmark import benchmark_fixture_files, fixture_patterns, parser_searches
+
+
+# -----------------------------------------------------------------------
+class TestRegexBenchmark(TestCase):
+
+    def test_parser_searches(self):
+        patterns = fixture_patterns(Camera, 'upstream/device/cameras.yml')
+        user_agents = [
+            'Mozilla/5.0 (Linux; U; Android 2.3.3; ja-jp; COOLPIX S800c Build/CP01_WW)',
+            'Mozilla/5.0 (Windows NT 10.0; Win64; x64)',
+        ]
+        searches = parser_searches(patterns, user_agents)
+        self.assertEqual([user_agent for _, user_agent in searches], user_agents[:1])
+
+    def test_benchmark_fixture_files(self):
+        messages: list[str] = []
+        benchmarks = benchmark_fixture_files(
+            ['Mozilla/5.0 (Linux; U; Android 2.3.3; ja-jp; COOLPIX S800c Build/CP01_WW)'],
+            parsers=(Camera,),
+            message_callback=messages.append,
+        )
+        self.assertEqual([benchmark.fixture for benchmark in benchmarks], Camera.fixture_files)
+        self.assertEqual(len(messages), len(benchmarks))
+        self.assertEqual(sum(benchmark.searches for benchmark in benchmarks), 1)
+
+
+__all__ = [
+    'TestRegexBenchmark',
+]
@@ -0,0 +1,144 @@
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from ...lazy_regex import RegexLazyIgnore
+from ...parser import Library
+from ...regex_conflicts import (
+    ORDERED_CACHES,
+    ConflictGraph,
+    build_regex_orders,
+    disjoint_anchors,
+    load_regex_orders,
+    regex_anchors,
+    save_regex_orders,
+)
+from ...settings import BOUNDED_REGEX, DDCache
+
+
+# -----------------------------------------------------------------------
+class TestRegexAnchors(TestCase):
+
+    def test_regex_anchors(self):
+        anchors = regex_anchors(BOUNDED_REGEX.format(r'^(?:Apple-)?iPhone/(\d+)'))
+        self.assertEqual(anchors.prefixes, frozenset(('apple-iphone/', 'iphone/')))
+        self.assertIsNone(anchors.suffixes)
+
+        anchors = regex_anchors(BOUNDED_REGEX.format(r'Google$'))
+        self.assertIsNone(anchors.prefixes)
+        self.assertEqual(anchors.suffixes, frozenset(('google',)))
+
+        self.assertEqual(regex_anchors(BOUNDED_REGEX.format('Chrome')), (None, None))
+
+    def test_disjoint_anchors(self):
+        def anchors(pattern):
+            return regex_anchors(BOUNDED_REGEX.format(pattern))
+
+        self.assertTrue(disjoint_anchors(anchors('^Dalvik'), anchors('^okhttp')))
+        self.assertTrue(disjoint_anchors(anchors('Bot$'), anchors('Spider$')))
+        self.assertFalse(disjoint_anchors(anchors('^Dalvik'), anchors('^dalvik/2')))
+        self.assertFalse(disjoint_anchors(anchors('Bot$'), anchors('Robot$')))
+        self.assertFalse(disjoint_anchors(anchors('^Dalvik'), anchors('okhttp')))
+        self.assertFalse(disjoint_anchors(anchors('^Dalvik'), anchors('Bot$')))
+
+
+class TestConflictGraph(TestCase):
+
+    def graph(self, *patterns):
+        regexes = [RegexLazyIgnore(BOUNDED_REGEX.format(pattern)) for pattern in patterns]
+        return ConflictGraph(regexes)
+
+    def test_conflicts(self):
+        graph = self.graph('^Dalvik', '^okhttp', 'Chrome', '^curl')
+        self.assertFalse(graph.conflicts(0, 1))
+        self.assertFalse(graph.conflicts(3, 0))
+        self.assertTrue(graph.conflicts(0, 2))
+        self.assertTrue(graph.conflicts(1, 2))
+        self.assertEqual(graph.refuted, [])
+
+    def test_reorder(self):
+        graph = self.graph('^Dalvik', '^okhttp', '^curl', 'Chrome', '^Wget')
+        # the hot regexes move ahead of the regexes they can't conflict with
+        self.assertEqual(graph.reorder({2: 10, 1: 5}), [2, 1, 0, 3, 4])
+        # but never ahead of a regex that may match the same UA
+        self.assertEqual(graph.reorder({4: 10}), [0, 1, 2, 3, 4])
+        self.assertEqual(graph.reorder({}), [0, 1, 2, 3, 4])
+
+
+class TestRegexOrders(TestCase):
+
+    def setUp(self):
+        self.caches = {cache: DDCache[cache] for cache in (*ORDERED_CACHES, 'regex_orders')}
+        for cache in self.caches:
+            DDCache[cache] = {}
+
+    def tearDown(self):
+        for cache, value in self.caches.items():
+            DDCache[cache] = value
+
+    def patterns(self):
+        return [ua_data['regex'].pattern for ua_data in Library('', None).regex_list]
+
+    def hot_position(self):
+        """
+        Position of the last anchored regex, which can move ahead.
+        """
+        return [
+            position
+            for position, ua_data in enumerate(Library('', None).regex_list)
+            if regex_anchors(ua_data['regex'].pattern).prefixes
+        ][-1]
+
+    def load_orders(self, orders):
+        with TemporaryDirectory() as directory:
+            orders_path = path.join(directory, 'orders.json')
+            save_regex_orders(orders, orders_path)
+            load_regex_orders(orders_path)
+
+    def test_build_load_orders(self):
+        regex_list = Library('', None).regex_list
+        patterns = self.patterns()
+        hot = self.hot_position()
+
+        messages: list[str] = []
+        orders = build_regex_orders([Library], {'Library': {hot: 1}}, messages.append)
+        self.assertEqual(messages, [f'Library: 2 of {len(regex_list)} regexes moved'])
+        order = orders['Library']['order']
+        self.assertEqual(sorted(order), list(range(len(regex_list))))
+        self.assertLess(order.index(hot), hot)
+
+        self.load_orders(orders)
+        self.assertNotIn('Library', DDCache['regexes'])
+        self.assertEqual(self.patterns(), [patterns[position] for position in order])
+
+        # regex lists of other regexes aren't reordered
+        DDCache['regex_orders']['Library']['checksum'] = ''
+        DDCache['regexes'] = {}
+        self.assertEqual(self.patterns(), patterns)
+
+    def test_load_orders_after_use(self):
+        orders = build_regex_orders([Library], {'Library': {self.hot_position(): 1}}, [].append)
+
+        # caches by the positions of the regexes in the files
+        library = Library('PHP-SOAP/8.5.6', None)
+        self.assertEqual(library.match_regex_list()[1]['name'], 'PHP-SOAP')
+        library.regex_profile.record(0)
+        self.assertIsNotNone(library.fragment_table)
+        self.assertIsNotNone(library.model_index)
+        for cache in ('literal_index', 'fragment_tables', 'model_index', 'regex_hits'):
+            self.assertIn('Library', DDCache[cache], msg=cache)
+
+        self.load_orders(orders)
+        for cache in ORDERED_CACHES:
+            self.assertNotIn('Library', DDCache[cache], msg=cache)
+
+        library = Library('PHP-SOAP/8.5.6', None)
+        self.assertEqual(library.match_regex_list()[1]['name'], 'PHP-SOAP')
+        self.assertFalse(library.regex_profile.hits)
+
+
+__all__ = [
+    'TestConflictGraph',
+    'TestRegexAnchors',
+    'TestRegexOrders',
+]
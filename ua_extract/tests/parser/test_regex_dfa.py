@@ -0,0 +1,132 @@
+from unittest import TestCase
+from urllib.parse import unquote
+
+from ..base import ParserBaseTest
+from ...lazy_regex import RegexLazyIgnore
+from ...parser import Bot, Browser, OS
+from ...regex_dfa import IrregularPattern, RegexDFA, RegexNFA
+from ...settings import BOUNDED_REGEX
+
+
+# -----------------------------------------------------------------------
+class TestRegexNFA(TestCase):
+
+    def test_irregular_patterns(self):
+        nfa = RegexNFA()
+        nfa.add_pattern('Chrome/(\\d+)', 0)
+        size = len(nfa.kinds)
+
+        for pattern in (r'(a)\1', r'(?<!x)Chrome', r'\bChrome', r'(?i:Chrome)', r'(?>a+)b'):
+            with self.subTest(pattern=pattern):
+                with self.assertRaises(IrregularPattern):
+                    nfa.add_pattern(pattern, 1)
+                # the states of the failed pattern are removed
+                self.assertEqual(len(nfa.kinds), size)
+                self.assertEqual(len(nfa.positions), size)
+
+    def test_character_set(self):
+        nfa = RegexNFA()
+        self.assertEqual(nfa.character_set('[A-C]'), frozenset('abc'))
+        self.assertNotIn('A', nfa.character_set('.'))
+        self.assertNotIn('\n', nfa.character_set('[^x]'))
+
+
+class TestRegexDFA(TestCase):
+
+    def dfa(self, *patterns):
+        return RegexDFA([RegexLazyIgnore(BOUNDED_REGEX.format(pattern)) for pattern in patterns])
+
+    def test_lowest_index_wins(self):
+        dfa = self.dfa(r'Safari/(\d+)', r'(Chrome)/(\d+)', r'Mozilla/(\d+)')
+
+        position, matched = dfa.first_match('Mozilla/5.0 Chrome/100 Safari/537')
+        self.assertEqual(position, 0)
+        self.assertEqual(matched.group(1), '537')
+
+        # captures are those of the winning regex
+        position, matched = dfa.first_match('Mozilla/5.0 Chrome/100')
+        self.assertEqual(position, 1)
+        self.assertEqual(matched.groups(), ('Chrome', '100'))
+
+        self.assertEqual(dfa.first_match('Mozilla/5.0')[0], 2)
+        self.assertIsNone(dfa.first_match('Opera/9.80'))
+        self.assertIsNone(dfa.first_match('xMozilla/5.0'))
+
+    def test_anchors(self):
+        dfa = self.dfa('^Opera', 'Mini$', 'Opera')
+        self.assertEqual(dfa.first_match('Opera Mini')[0], 0)
+        self.assertEqual(dfa.first_match('Mozilla Opera Mini')[0], 1)
+        self.assertEqual(dfa.first_match('Mozilla Opera Mini/8')[0], 2)
+
+    def test_irregular_regexes(self):
+        dfa = self.dfa(r'(Chrome)/\1', 'Chrome', r'(?<!Headless)Safari')
+        self.assertEqual(dfa.first_match('Chrome/Chrome')[0], 0)
+        self.assertEqual(dfa.first_match('Chrome/1 Safari')[0], 1)
+        self.assertEqual(dfa.first_match('Safari')[0], 2)
+        self.assertIsNone(dfa.first_match('HeadlessSafari'))
+
+        # only the irregular candidates are searched
+        self.assertEqual(dfa.first_match('Chrome/Chrome', candidates=[1])[0], 1)
+
+    def test_non_ascii(self):
+        dfa = self.dfa('Straße', 'Chrome')
+        self.assertEqual(dfa.first_match('STRASSE Chrome')[0], 1)
+        self.assertEqual(dfa.first_match('Straße Chrome')[0], 0)
+        self.assertEqual(dfa.first_match('Chrome\nMozilla')[0], 1)
+
+    def test_state_limit(self):
+        dfa = self.dfa('Chrome', 'Safari')
+        dfa.first_match('Safari Chrome')
+        states = len(dfa.transitions)
+        self.assertGreater(states, 1)
+
+        # matching the same UA again builds no states
+        self.assertEqual(dfa.first_match('Safari Chrome')[0], 0)
+        self.assertEqual(len(dfa.transitions), states)
+
+        dfa.reset()
+        self.assertEqual(len(dfa.transitions), 1)
+        self.assertEqual(dfa.first_match('Safari Chrome')[0], 0)
+
+
+class TestRegexDFAFixtures(ParserBaseTest):
+    """
+    The DFA must find the same first matching regex as searching
+    every regex of the fixture files one by one.
+    """
+
+    parser_fixtures = (
+        (Bot, 'tests/fixtures/upstream/bots.yml'),
+        (OS, 'tests/parser/fixtures/upstream/oss.yml'),
+        (Browser, 'tests/parser/fixtures/upstream/client/browser.yml'),
+    )
+
+    def test_parsing(self):
+        for Parser, fixture_file in self.parser_fixtures:
+            self.fixture_files = [fixture_file]
+            parser = Parser('', None)
+            regexes = [ua_data['regex'] for ua_data in parser.regex_list]
+            dfa = parser.regex_dfa
+
+            for fixture in self.load_fixtures():
+                user_agent = unquote(fixture['user_agent'])
+                expected = next(
+                    (
+                        (position, matched.span(), matched.groups())
+                        for position, regex in enumerate(regexes)
+                        if (matched := regex.search(user_agent))
+                    ),
+                    None,
+                )
+                if found := dfa.first_match(user_agent):
+                    position, matched = found
+                    found = (position, matched.span(), matched.groups())
+
+                self.assertEqual(found, expected, msg=f'{Parser.__name__}: {user_agent}')
+
+
+__all__ = [
+    'TestRegexDFA',
+    'TestRegexDFAFixtures',
+    'TestRegexNFA',
+]
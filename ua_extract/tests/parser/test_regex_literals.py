@@ -0,0 +1,287 @@
+from unittest import TestCase
+from urllib.parse import unquote
+
+from ..base import ParserBaseTest
+from ...lazy_regex import RegexLazyIgnore
+from ...parser import Bot, OS
+from ...settings import BOUNDED_REGEX
+from ...regex_literals import (
+    MAX_REQUIRED_LITERALS,
+    MIN_INDEXED_MODELS,
+    LiteralIndex,
+    ModelIndex,
+    anchored_affixes,
+    anchored_exact,
+    anchored_first_characters,
+    required_characters,
+    required_literals,
+    shrink_literals,
+    starts_with_literal,
+    top_level_alternatives,
+)
+
+
+# -----------------------------------------------------------------------
+class TestRequiredLiterals(TestCase):
+    def test_required_literals(self):
+        for pattern, literals in (
+            (r'WireReaderBot', {'wirereaderbot'}),
+            (r'(?:Chrome|CriOS)/(\d+[\.\d]+)', {'chrome/', 'crios/'}),
+            (r'Fire(?:fox)?/(\d+)', {'fire/', 'firefox/'}),
+            (
+                r'[Ss]amsung[ _-]?Browser',
+                {'samsungbrowser', 'samsung browser', 'samsung_browser', 'samsung-browser'},
+            ),
+            (r'(?:SAMSUNG|GT-|SM-)', {'samsung', 'gt-', 'sm-'}),
+            (r'MZ-(?:Mobile)?', {'mz-'}),
+            (r'Opera(?! Mini)(?:/| )(\d+)', {'opera/', 'opera '}),
+            # characters without case variants only match themselves
+            (r'(?:붉은별|Fedora)', {'붉은별', 'fedora'}),
+        ):
+            self.assertEqual(required_literals(pattern), literals, msg=pattern)
+
+    def test_large_alternation(self):
+        # too many alternatives for a requirement, so shortened to prefixes
+        pattern = '|'.join(f'(?:Model-{number}[AB])' for number in range(200, 400))
+        literals = required_literals(pattern)
+        self.assertLessEqual(len(literals), MAX_REQUIRED_LITERALS)
+        self.assertTrue(all(literal.startswith('model-') for literal in literals))
+
+    def test_shrink_literals(self):
+        literals = frozenset(f'abc{number:03}' for number in range(MAX_REQUIRED_LITERALS + 1))
+        self.assertEqual(shrink_literals(literals), frozenset(lit[:5] for lit in literals))
+        self.assertEqual(shrink_literals(frozenset({'abc'})), frozenset({'abc'}))
+
+    def test_no_usable_literals(self):
+        for pattern in (
+            r'(\d+)\.(\d+)',
+            r'.*',
+            r'(?:Chrome|\w+)/',
+            r'a|b',
+            # cased non-ASCII letters match other letters case-insensitively
+            r'Подкасты/',
+            # regex module syntax that can't be parsed by the stdlib
+            r'Galaxy\p{Lu}',
+        ):
+            self.assertIsNone(required_literals(pattern), msg=pattern)
+
+
+# -----------------------------------------------------------------------
+class TestAnchoredAffixes(TestCase):
+    def test_prefixes(self):
+        for pattern, prefixes in (
+            (r'^Client/([\d.]+)', {'client/'}),
+            (r'^^%([\d\w\-\|%]{20,})%$', {'%'}),
+            (r'^(?:Apple-)?iPhone', {'apple-iphone', 'iphone'}),
+            (r'(?:^Podcasts/|^Balados/)([\d.]+)?', {'podcasts/', 'balados/'}),
+            (BOUNDED_REGEX.format(r'^Lightpanda/([\d.]+)'), {'lightpanda/'}),
+        ):
+            self.assertEqual(anchored_affixes(pattern), prefixes, msg=pattern)
+
+    def test_suffixes(self):
+        for pattern, suffixes in (
+            (r'Google$', {'google'}),
+            (BOUNDED_REGEX.format(r'(?:Moat|AutodeskClient)$'), {'moat', 'autodeskclient'}),
+            (r' (?:Darwin|CFNetwork)$', {' darwin', ' cfnetwork'}),
+        ):
+            self.assertEqual(anchored_affixes(pattern, suffix=True), suffixes, msg=pattern)
+
+    def test_not_anchored(self):
+        for pattern in (
+            r'Client/',
+            r'^(\d+)/',
+            r'(?:^Podcasts/|AirPodcasts/)',
+            r'(?:^Foo)?Bar',
+            r'(?m)^Foo',
+            r'(?=^Foo)',
+        ):
+            self.assertIsNone(anchored_affixes(pattern), msg=pattern)
+
+
+class TestAnchoredExact(TestCase):
+    def test_exact(self):
+        for pattern, exact in (
+            (r'^Google$', {'google'}),
+            (r'^(?:chrome|Node\.js|Report Runner)$', {'chrome', 'node.js', 'report runner'}),
+            (r'^Zm[Ee]u$', {'zmeu'}),
+        ):
+            self.assertEqual(anchored_exact(pattern), exact, msg=pattern)
+
+    def test_not_exact(self):
+        for pattern in (
+            r'^Google',
+            r'Google$',
+            r'^Google/\d+$',
+            r'^$',
+            r'(?m)^Google$',
+            r'^Google$|Bot',
+        ):
+            self.assertIsNone(anchored_exact(pattern), msg=pattern)
+
+
+class TestRequiredCharacters(TestCase):
+    def test_required_characters(self):
+        for pattern, characters in (
+            (r'([A-Z]+_[\d+\.]+)_(?:.*)', {'_'}),
+            (r'^(.{0,})[:/ #\({](?:\w{4,8}-)(?:\w{4,8}-)+', {'-'}),
+            (r'(?:EIS|EAV) Update', {'e', ' ', 'u', 'p', 'd', 'a', 't'}),
+            (r'^(FC3|OTA)[a-zA-Z0-9]*$', set()),
+            (r'x?y*[z]', {'z'}),
+        ):
+            self.assertEqual(required_characters(pattern), characters, msg=pattern)
+
+
+class TestAnchoredFirstCharacters(TestCase):
+    def test_first_characters(self):
+        for pattern, characters in (
+            (r'^@([\d\w]{20,})$', {'@'}),
+            (r'^^%([\d\w]{20,})%$', {'%'}),
+            (r'(^\d+)[a-zA-Z0-9]{20,}', set('0123456789')),
+            (r'^(ios|Mobile|client)/[\d\.]+', {'i', 'm', 'c'}),
+            (r'^[\d\.,]+ CFNetwork', set('0123456789.,')),
+        ):
+            self.assertEqual(anchored_first_characters(pattern), characters, msg=pattern)
+
+    def test_no_first_characters(self):
+        for pattern in (
+            r'Android',
+            r'^(.*) user:',
+            r'^A?ndroid',
+            r'^[^a]ndroid',
+            r'(?m)^Android',
+            r'^Android|Linux',
+        ):
+            self.assertIsNone(anchored_first_characters(pattern), msg=pattern)
+
+
+class TestTopLevelAlternatives(TestCase):
+    def test_alternatives(self):
+        for pattern, alternatives in (
+            (r'nuhk|grub-client|^xenu', ['nuhk', 'grub-client', '^xenu']),
+            (r'(?:a|b)c|[|]d|e\|f', ['(?:a|b)c', '[|]d', 'e\\|f']),
+            (r'[^]|]x|y', ['[^]|]x', 'y']),
+        ):
+            self.assertEqual(top_level_alternatives(pattern), alternatives, msg=pattern)
+
+    def test_not_split(self):
+        for pattern in (
+            r'WireReaderBot',
+            r'(Chrome|CriOS)/(\d+)',
+            r'(?i)Chrome|Safari',
+            r'(a)x|\1y',
+            r'Galaxy\p{Lu}|Tab',
+        ):
+            self.assertEqual(top_level_alternatives(pattern), [pattern], msg=pattern)
+
+
+# -----------------------------------------------------------------------
+class TestStartsWithLiteral(TestCase):
+    def test_starts_with_literal(self):
+        for pattern in (
+            r'Client/([\d.]+)',
+            r'(?:chrome|crios)/',
+            r'(?:Model-(\d+))',
+            r'[ _]Build',
+            r'(?:TikTok[/ ]|musical_ly)',
+        ):
+            self.assertTrue(starts_with_literal(pattern), msg=pattern)
+
+    def test_no_leading_literal(self):
+        for pattern in (
+            r'.*Chrome',
+            r'(?:Apple-)?iPhone',
+            r'(?:[ _]Build|Model)',
+            r'(?i:Model)',
+            r'^Client',
+            r'\d+',
+            r'',
+            r'Galaxy\p{Lu}',
+        ):
+            self.assertFalse(starts_with_literal(pattern), msg=pattern)
+
+
+# -----------------------------------------------------------------------
+class TestLiteralIndex(TestCase):
+    def test_candidates_in_order(self):
+        index = LiteralIndex([r'Chrome/', r'(\d+)', r'CriOS|Chrome', None])
+        self.assertEqual(list(index.candidates('mozilla chrome/100')), [0, 1, 2, 3])
+        self.assertEqual(list(index.candidates('crios/100')), [1, 2, 3])
+        self.assertEqual(list(index.candidates('firefox/100')), [1, 3])
+
+    def test_anchored_candidates(self):
+        index = LiteralIndex([r'Client/', r'^Client/', r'Google$', r'^Podcasts/'])
+        self.assertEqual(list(index.candidates('client/1.0 google')), [0, 1, 2])
+        self.assertEqual(list(index.candidates('app client/1.0')), [0])
+        self.assertEqual(list(index.candidates('google\n')), [2])
+        self.assertEqual(list(index.candidates('podcasts/1.0')), [3])
+
+    def test_non_ascii_user_agent(self):
+        index = LiteralIndex([r'Chrome/', r'Safari/'])
+        self.assertEqual(list(index.candidates('K chrome/100')), [0, 1])
+
+
+# -----------------------------------------------------------------------
+class TestModelIndex(TestCase):
+    @staticmethod
+    def regex_list(*entries):
+        return [
+            {'models': [{'regex': RegexLazyIgnore(model), 'model': model} for model in models]}
+            for models in entries
+        ]
+
+    def test_candidates_by_entry(self):
+        index = ModelIndex(self.regex_list(['SM-G991B', 'SM-A'], [], ['Pixel 7', 'SM-X']))
+        candidates = index.candidates('sm-g991b')
+        self.assertEqual(list(candidates), [0])
+        self.assertEqual([model['model'] for model in candidates[0]], ['SM-G991B'])
+        self.assertEqual(list(index.candidates('pixel 7')), [2])
+
+    def test_entry_candidates(self):
+        models = [f'Model-{number}' for number in range(MIN_INDEXED_MODELS)] + [r'(\d+)']
+        index = ModelIndex(self.regex_list(['Pixel 7'], models))
+        found = index.entry_candidates(1, 'mozilla/5.0 (linux; android 14; model-3 build/x)')
+        self.assertEqual([model['model'] for model in found], ['Model-3', r'(\d+)'])
+        self.assertEqual(len(index.entry_candidates(0, 'no model')), 1)
+
+
+class TestLiteralIndexFixtures(ParserBaseTest):
+    """
+    Every fixture regex that matches a fixture UA must be a candidate.
+    """
+
+    fixture_files = [
+        'tests/fixtures/upstream/bots.yml',
+        'tests/parser/fixtures/upstream/oss.yml',
+    ]
+
+    def test_parsing(self):
+        fixtures = self.load_fixtures()
+
+        for Parser in (Bot, OS):
+            parser = Parser('', None)
+            regex_list = parser.regex_list
+            index = parser.literal_index
+
+            for fixture in fixtures:
+                user_agent = unquote(fixture['user_agent'])
+                candidates = set(index.candidates(user_agent.lower()))
+                for position, ua_data in enumerate(regex_list):
+                    if position not in candidates:
+                        self.assertIsNone(
+                            ua_data['regex'].search(user_agent),
+                            msg=f'{ua_data["regex"].pattern!r} matches {user_agent!r}',
+                        )
+
+
+__all__ = [
+    'TestAnchoredAffixes',
+    'TestAnchoredExact',
+    'TestAnchoredFirstCharacters',
+    'TestLiteralIndex',
+    'TestLiteralIndexFixtures',
+    'TestModelIndex',
+    'TestRequiredCharacters',
+    'TestRequiredLiterals',
+    'TestStartsWithLiteral',
+    'TestTopLevelAlternatives',
+]
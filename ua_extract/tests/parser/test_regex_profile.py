@@ -0,0 +1,141 @@
+from collections import Counter
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from urllib.parse import unquote
+
+from ..base import ParserBaseTest
+from ...lazy_regex import RegexLazyIgnore
+from ...parser import Browser, OS
+from ...regex_profile import RegexProfile, load_regex_profiles, save_regex_profiles
+from ...settings import BOUNDED_REGEX, DDCache
+
+
+# -----------------------------------------------------------------------
+class TestRegexProfile(TestCase):
+
+    def profile(self, *patterns, hits=None):
+        regexes = [RegexLazyIgnore(BOUNDED_REGEX.format(pattern)) for pattern in patterns]
+        return RegexProfile(regexes, Counter(hits))
+
+    def test_hot_regexes_first(self):
+        profile = self.profile(
+            r'Safari/(\d+)', r'(Chrome)/(\d+)', r'Mozilla/(\d+)', hits={2: 5, 1: 3}
+        )
+        self.assertEqual(profile.hot_positions(), (2, 1))
+
+        # an earlier regex that also matches wins over the hot regexes
+        position, matched = profile.first_match('Mozilla/5.0 Chrome/100 Safari/537')
+        self.assertEqual(position, 0)
+        self.assertEqual(matched.group(1), '537')
+
+        position, matched = profile.first_match('Mozilla/5.0 Chrome/100')
+        self.assertEqual(position, 1)
+        self.assertEqual(matched.groups(), ('Chrome', '100'))
+
+        self.assertEqual(profile.first_match('Mozilla/5.0')[0], 2)
+        self.assertEqual(profile.first_match('Safari/537')[0], 0)
+        self.assertIsNone(profile.first_match('Opera/9.80'))
+
+    def test_candidates(self):
+        profile = self.profile('Chrome', 'Safari', hits={1: 1})
+        self.assertEqual(profile.first_match('Chrome Safari', candidates=[1])[0], 1)
+        self.assertIsNone(profile.first_match('Chrome Safari', candidates=[]))
+
+    def test_record(self):
+        profile = self.profile('Chrome', 'Safari')
+        self.assertEqual(profile.hot_positions(), ())
+
+        profile.record(1)
+        profile.record(1)
+        profile.record(0)
+        # the hot regexes are chosen again after PROFILE_REFRESH matches
+        self.assertEqual(profile.hot_positions(), ())
+        profile.hot = None
+        self.assertEqual(profile.hot_positions(), (1, 0))
+
+
+class TestRegexProfiles(TestCase):
+
+    def setUp(self):
+        self.hits = DDCache['regex_hits']
+        self.profiles = DDCache['regex_profiles']
+        DDCache['regex_hits'] = {}
+        DDCache['regex_profiles'] = {}
+
+    def tearDown(self):
+        DDCache['regex_hits'] = self.hits
+        DDCache['regex_profiles'] = self.profiles
+
+    def test_record_save_load(self):
+        class RecordingOS(OS):
+            RECORD_REGEX_PROFILE = True
+            SPECULATIVE_REGEXES = True
+
+        for user_agent in (
+            'Mozilla/5.0 (Windows NT 10.0; Win64; x64)',
+            'Mozilla/5.0 (X11; Linux x86_64)',
+        ):
+            RecordingOS(user_agent, None).parse()
+        hits = DDCache['regex_hits']['RecordingOS']
+        self.assertEqual(sum(hits.values()), 2)
+
+        with TemporaryDirectory() as directory:
+            profile_path = path.join(directory, 'profile.json')
+            save_regex_profiles(profile_path)
+            DDCache['regex_hits'] = {}
+            load_regex_profiles(profile_path)
+
+        self.assertEqual(DDCache['regex_hits']['RecordingOS'], hits)
+        self.assertNotIn('RecordingOS', DDCache['regex_profiles'])
+        self.assertEqual(RecordingOS('', None).regex_profile.hits, hits)
+
+
+class TestRegexProfileFixtures(ParserBaseTest):
+    """
+    Speculating with the profile of the fixture UAs must find the same
+    first matching regex as searching the candidate regexes in order.
+    """
+
+    parser_fixtures = (
+        (OS, 'tests/parser/fixtures/upstream/oss.yml'),
+        (Browser, 'tests/parser/fixtures/upstream/client/browser.yml'),
+    )
+
+    def test_parsing(self):
+        for Parser, fixture_file in self.parser_fixtures:
+            self.fixture_files = [fixture_file]
+            parser = Parser('', None)
+            regexes = [ua_data['regex'] for ua_data in parser.regex_list]
+            user_agents = [unquote(fixture['user_agent']) for fixture in self.load_fixtures()]
+
+            expected = []
+            hits: Counter[int] = Counter()
+            for user_agent in user_agents:
+                found = next(
+                    (
+                        (position, matched.span(), matched.groups())
+                        for position, regex in enumerate(regexes)
+                        if (matched := regex.search(user_agent))
+                    ),
+                    None,
+                )
+                expected.append(found)
+                if found:
+                    hits[found[0]] += 1
+
+            profile = RegexProfile(regexes, hits)
+            for user_agent, expected_found in zip(user_agents, expected):
+                parser.user_agent_lower = user_agent.lower()
+                if found := profile.first_match(user_agent, parser.regex_candidates()):
+                    position, matched = found
+                    found = (position, matched.span(), matched.groups())
+
+                self.assertEqual(found, expected_found, msg=f'{Parser.__name__}: {user_agent}')
+
+
+__all__ = [
+    'TestRegexProfile',
+    'TestRegexProfileFixtures',
+    'TestRegexProfiles',
+]
@@ -0,0 +1,78 @@
+from unittest import TestCase
+import regex
+
+from ...lazy_regex import RegexLazyIgnore, bounded_regex
+from ...parser.parser import perform_substitutions
+from ...settings import BOUNDED_REGEX, DDCache
+from ...substitution_template import SubstitutionTemplate, substitution_template
+from ...yaml_loader import RegexLoader
+
+
+# -----------------------------------------------------------------------
+class TestSubstitutionTemplate(TestCase):
+
+    def test_pieces(self):
+        template = SubstitutionTemplate(r'Tbook \g<1> \g<2>_Pro')
+        self.assertEqual(template.pieces, ('Tbook ', ' ', '_Pro'))
+        self.assertEqual(template.groups, (1, 2))
+        self.assertTrue(template.expandable)
+        self.assertFalse(SubstitutionTemplate(r'\1 Pro').expandable)
+
+    def test_expand(self):
+        match = regex.search(r'Tbook[_ -]([^;/]+)(?:/(\d+))?', 'Tbook_10 S;')
+        self.assertEqual(SubstitutionTemplate(r'Tbook \g<1>').expand(match), 'Tbook 10 S')
+        self.assertEqual(SubstitutionTemplate(r'\g<1>.\g<2>').expand(match), '10 S.')
+        self.assertEqual(SubstitutionTemplate('Tbook').expand(match), 'Tbook')
+        with self.assertRaises(IndexError):
+            SubstitutionTemplate(r'\g<3>').expand(match)
+
+    def test_cached(self):
+        self.assertIs(substitution_template(r'\g<1> Pro'), substitution_template(r'\g<1> Pro'))
+
+
+class TestPerformSubstitutions(TestCase):
+
+    def test_match_types(self):
+        user_agent = 'Mozilla/5.0 (Linux; Android 10; Tbook_10 S(E6N7) Build/QP1A)'
+        pattern = r'Tbook[_ -]([^;/]+)(?: Build|[;)]|$)'
+        matches = (
+            bounded_regex(pattern, folded=True).search(user_agent),
+            RegexLazyIgnore(BOUNDED_REGEX.format(pattern)).search(user_agent),
+        )
+        for template in ('Tbook_\\g<1>', 'Tbook', '\\g<0>'):
+            values = {perform_substitutions(template, match, ' ') for match in matches}
+            self.assertEqual(len(values), 1, msg=template)
+
+        self.assertEqual(perform_substitutions('Tbook \\g<1>', matches[0], ' '), 'Tbook 10 S(E6N7)')
+
+    def test_invalid_group(self):
+        match = bounded_regex('Classilla/').search('Mozilla/5.0 Classilla/3.2')
+        self.assertEqual(perform_substitutions('\\g<1>', match, '.'), '\\g<1>')
+
+    def test_escapes(self):
+        match = regex.search('(Pro)_(Max)', 'Pro_Max')
+        self.assertEqual(perform_substitutions('\\2 \\1', match, ' '), 'Max Pro')
+
+    def test_loaded_templates(self):
+        class TemplateMobiles(RegexLoader):
+            fixture_files = ['upstream/device/mobiles.yml']
+
+        templates = DDCache['substitution_templates']
+        DDCache['substitution_templates'] = {}
+        try:
+            entries = TemplateMobiles().regex_list
+            parsed = DDCache['substitution_templates']
+        finally:
+            DDCache['substitution_templates'] = templates
+            DDCache['regexes'].pop('TemplateMobiles', None)
+
+        models = [model['model'] for entry in entries for model in entry.get('models', [])]
+        self.assertTrue(models)
+        for template in models:
+            self.assertTrue(parsed[template].expandable, msg=template)
+
+
+__all__ = [
+    'TestPerformSubstitutions',
+    'TestSubstitutionTemplate',
+]
@@ -10,6 +10,7 @@ from pathlib import Path
 from datetime import datetime, timezone
 from typing import Optional, Callable, Dict, List
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from .ahocorasick_words import build_ahocorasick_words
 
 ROOT_PATH = Path(__file__).resolve().parent
 
@@ -69,6 +70,7 @@ class Regexes:
         / "fixtures"
         / "upstream"
         / "device",
+        ahocorasick_path: str = ROOT_PATH / "regexes" / "ahocorasick",
         github_token: Optional[str] = None,
         message_callback: Optional[Callable[[str], None]] = None,
     ):
@@ -82,6 +84,7 @@ class Regexes:
         self.client_upstream_dir = self._validate_path(client_upstream_dir)
         self.sparse_device_dir = sparse_device_dir
         self.device_upstream_dir = self._validate_path(device_upstream_dir)
+        self.ahocorasick_path = self._validate_path(ahocorasick_path)
         self.github_token = github_token
         self.message_callback = message_callback or (lambda _: None)
 
@@ -104,6 +107,7 @@ class Regexes:
             self.fixtures_upstream_path,
             self.client_upstream_dir,
             self.device_upstream_dir,
+            self.ahocorasick_path,
         ):
             self._backup_directory(p)
 
@@ -125,6 +129,7 @@ class Regexes:
             self.fixtures_upstream_path,
             self.client_upstream_dir,
             self.device_upstream_dir,
+            self.ahocorasick_path,
         ):
             self._restore_directory(p)
         self._notify("Rollback complete")
@@ -152,6 +157,8 @@ class Regexes:
 
         try:
             updater(self)
+            # Words of the AhoCorasick prefilter must cover the new regexes
+            build_ahocorasick_words(message_callback=self._notify)
         except Exception:
             self._notify("Update failed — restoring backups")
             self.rollback_regexes()
@@ -1,4 +1,3 @@
-from collections import Counter
 from hashlib import blake2s
 from string import punctuation
 from urllib.parse import unquote
@@ -7,8 +6,9 @@ from .lazy_regex import RegexLazy, RegexLazyIgnore
 
 PUNC_SPACE = f'{punctuation} '
 trans_tbl = str.maketrans(dict.fromkeys(PUNC_SPACE, ''))
-punctuation_tbl = str.maketrans(dict.fromkeys(' /.', ''))
-number_table = str.maketrans(dict.fromkeys('0123456789', ''))
+# bytes.translate deletes characters of ASCII UAs much faster than str.translate
+PUNC_SPACE_BYTES = PUNC_SPACE.encode()
+NUMBER_BYTES = b'0123456789'
 REPEATED_CHARACTERS = RegexLazy(r'(.)(\1{11,})')
 
 TRIM_LONG_COMBO_EXTENSIONS = RegexLazyIgnore(
@@ -101,6 +101,19 @@ TWO_SEGMENT_UUID = RegexLazyIgnore(r"^(\w{4,8}-)(\w{4,8})$")
 INTEGER = RegexLazyIgnore(r"\d")
 MIN_WORD_LENGTH = 7
 
+# Lookup tables of the n-gram regexes, matched against lowercased ASCII UAs
+LEGAL_BIGRAM_TABLE = frozenset(LEGAL_BIGRAMS.pattern.strip('()').split('|'))
+COMMON_BIGRAM_TABLE = frozenset(COMMON_BIGRAMS.pattern.split('|'))
+COMMON_TRIGRAM_TABLE = frozenset(COMMON_TRIGRAMS.pattern.strip('()').split('|'))
+COMMON_QUADRIGRAM_TABLE = frozenset(COMMON_QUADRIGRAMS.pattern.strip('()').split('|'))
+COMMON_QUADRIGRAM_LENGTHS = sorted({len(ngram) for ngram in COMMON_QUADRIGRAM_TABLE})
+# ASCII digits become 0, lowercase vowels a and all other ASCII characters b
+CHARACTER_CLASSES = str.maketrans({
+    chr(code): '0' if chr(code).isdigit() else 'a' if chr(code) in 'aeiou' else 'b'
+    for code in range(128)
+})
+GIBBERISH_PREFIXES = ('holav1_', 'hkum_')
+
 
 def ua_hash_key(user_agent: str, headers: dict[str, str] | None = None) -> str:
     """
@@ -124,8 +137,7 @@ def long_ua_no_punctuation(user_agent: str) -> bool:
     """
     if len(user_agent) < 65:
         return False
-    punc_removed = user_agent.translate(punctuation_tbl)
-    return punc_removed == user_agent
+    return ' ' not in user_agent and '/' not in user_agent and '.' not in user_agent
 
 
 def only_numerals_and_punctuation(user_agent: str) -> bool:
@@ -136,6 +148,8 @@ def only_numerals_and_punctuation(user_agent: str) -> bool:
     21/4.35.1.2
     5.0.6
     """
+    if user_agent.isascii():
+        return user_agent.encode().translate(None, PUNC_SPACE_BYTES).isdigit()
     return user_agent.translate(trans_tbl).isdigit()
 
 
@@ -153,10 +167,10 @@ def mostly_numerals(user_agent: str) -> bool:
     except ValueError:
         pass
 
-    alphabetic_chars = 0
-    for char in user_agent:
-        if not char.isnumeric():
-            alphabetic_chars += 1
+    if user_agent.isascii():
+        alphabetic_chars = len(user_agent.encode().translate(None, NUMBER_BYTES))
+    else:
+        alphabetic_chars = sum(not char.isnumeric() for char in user_agent)
 
     return alphabetic_chars / len(user_agent) < 0.33
 
@@ -211,8 +225,7 @@ def mostly_repeating_characters(user_agent: str) -> bool:
     if not user_agent or len(user_agent) > 100:
         return False
 
-    counts = Counter(user_agent)
-    return len(counts) / len(user_agent) < 0.15
+    return len(set(user_agent)) / len(user_agent) < 0.15
 
 
 def random_alphanumeric_string(user_agent: str) -> bool:
@@ -225,73 +238,33 @@ def random_alphanumeric_string(user_agent: str) -> bool:
     ziNICEarE9VlaPSkhDAyZrkZSpuEkIA
     vVNYZaiXO9Hd5zAi
     """
-    if not user_agent or not user_agent.isascii() or good_ngram_matches(user_agent):
+    if not user_agent or not user_agent.isascii():
         return False
 
     # holav1_10593F39DD2DAEBC
     # HKUM_XBw3S
     # HKUM_fXHH8t9R
-    if user_agent.startswith(('holav1_', 'hkum_')):
-        return True
+    generated_prefix = user_agent.startswith(GIBBERISH_PREFIXES)
 
-    # strings with adequate spaces / punctuation are not handled
-    if (ua_length := len(user_agent)) <= MIN_WORD_LENGTH:
+    # strings with adequate spaces / punctuation are not handled,
+    # which are most UAs, so check them before the n-grams
+    ua_length = len(user_agent)
+    if not generated_prefix and (
+        ua_length <= MIN_WORD_LENGTH or well_punctuated(user_agent, ua_length)
+    ):
         return False
 
-    if well_punctuated(user_agent, ua_length):
+    if good_ngram_matches(user_agent):
         return False
 
-    vowels = 'aeiou'
-    previous_is_int = user_agent[0].isnumeric()
-
-    intermingled_integers = 1 if previous_is_int else 0
-
-    longest_consonant_sequence = 0
-    longest_vowel_sequence = 0
-
-    current_consonant_sequence = 0
-    current_vowel_sequence = 0
-
-    for char in user_agent:
-        char_is_numerical = char.isnumeric()
-
-        if char_is_numerical:
-            if not previous_is_int:
-                intermingled_integers += 1
-            reset_vowels = reset_consonants = previous_is_int = True
-
-        elif char in vowels:
-            current_vowel_sequence += 1
-            reset_vowels, reset_consonants = False, True
+    if generated_prefix:
+        return True
 
-        else:
-            current_consonant_sequence += 1
-            reset_vowels, reset_consonants = True, False
-
-        if reset_vowels:
-            current_vowel_sequence, longest_vowel_sequence = reset_sequences(
-                current_vowel_sequence,
-                longest_vowel_sequence,
-            )
-
-        if reset_consonants:
-            current_consonant_sequence, longest_consonant_sequence = reset_sequences(
-                current_consonant_sequence,
-                longest_consonant_sequence,
-            )
-
-        if not char_is_numerical and previous_is_int:
-            previous_is_int = False
-
-    # update longest sequences after all chars are seen
-    current_consonant_sequence, longest_consonant_sequence = reset_sequences(
-        current_consonant_sequence,
-        longest_consonant_sequence,
-    )
-    current_vowel_sequence, longest_vowel_sequence = reset_sequences(
-        current_vowel_sequence,
-        longest_vowel_sequence,
-    )
+    # The runs of digits, vowels and consonants of the character classes
+    classes = user_agent.translate(CHARACTER_CLASSES)
+    longest_consonant_sequence = max(map(len, classes.replace('0', 'a').split('a')))
+    longest_vowel_sequence = max(map(len, classes.replace('0', 'b').split('b')))
+    intermingled_integers = (classes[0] == '0') + classes.count('a0') + classes.count('b0')
 
     short_ua_len = 17
     alphabetic_threshold = 4 if ua_length < short_ua_len else 5
@@ -314,7 +287,11 @@ def well_punctuated(user_agent: str, ua_length: int) -> bool:
     User Agents should have a number of spaces & punctuation characters.
     UAs with adequate spaces / punctuation are not gibberish.
     """
-    punctuation_removed_diff = ua_length - len(user_agent.translate(trans_tbl))
+    if user_agent.isascii():
+        punctuation_removed = user_agent.encode().translate(None, PUNC_SPACE_BYTES)
+    else:
+        punctuation_removed = user_agent.translate(trans_tbl)
+    punctuation_removed_diff = ua_length - len(punctuation_removed)
     if ua_length <= 20:
         delta = 1
     elif ua_length <= 35:
@@ -325,6 +302,22 @@ def well_punctuated(user_agent: str, ua_length: int) -> bool:
     return punctuation_removed_diff >= delta
 
 
+def count_ngrams(user_agent: str, ngrams: frozenset[str], size: int) -> int:
+    """
+    Count the ngrams of one size in the lowercased ASCII UA, without
+    overlaps from left to right, like findall of their alternation.
+    """
+    count = position = 0
+    last = len(user_agent) - size
+    while position <= last:
+        if user_agent[position : position + size] in ngrams:
+            count += 1
+            position += size
+        else:
+            position += 1
+    return count
+
+
 def ngram_analysis_gibberish(user_agent: str) -> bool:
     """
     Analyze legal ngrams to see if it's likely that UA is gibberish.
@@ -344,8 +337,7 @@ def ngram_analysis_gibberish(user_agent: str) -> bool:
     else:
         bigram_threshold = 15
 
-    legal_bigram_matches = LEGAL_BIGRAMS.findall(user_agent)
-    unique_bigrams = len(legal_bigram_matches)
+    unique_bigrams = count_ngrams(user_agent.lower(), LEGAL_BIGRAM_TABLE, 2)
 
     return bigram_threshold > unique_bigrams
 
@@ -363,13 +355,17 @@ def good_ngram_matches(user_agent: str) -> bool:
        - ZipsCarWash
        - JQSmartBand
     """
-    if COMMON_QUADRIGRAMS.search(user_agent):
-        return True
-
-    trigram_match = COMMON_TRIGRAMS.findall(user_agent)
+    user_agent = user_agent.lower()
     ua_length = len(user_agent)
 
-    if ua_length < 24 and trigram_match or len(trigram_match) >= 2:
+    for size in COMMON_QUADRIGRAM_LENGTHS:
+        for position in range(ua_length - size + 1):
+            if user_agent[position : position + size] in COMMON_QUADRIGRAM_TABLE:
+                return True
+
+    trigram_matches = count_ngrams(user_agent, COMMON_TRIGRAM_TABLE, 3)
+
+    if ua_length < 24 and trigram_matches or trigram_matches >= 2:
         return True
 
     if ua_length <= 12:
@@ -381,17 +377,7 @@ def good_ngram_matches(user_agent: str) -> bool:
     else:
         bigram_threshold = 8
 
-    common_bigram_match = COMMON_BIGRAMS.findall(user_agent)
-
-    return len(common_bigram_match) >= bigram_threshold
-
-
-def reset_sequences(current: int, longest: int) -> tuple[int, int]:
-    """
-    Set longest sequence to current if it's shorter
-    and reset current sequence to zero.
-    """
-    return 0, current if current > longest else longest
+    return count_ngrams(user_agent, COMMON_BIGRAM_TABLE, 2) >= bigram_threshold
 
 
 def uuid_like_name(value: str) -> bool:
@@ -403,7 +389,8 @@ def uuid_like_name(value: str) -> bool:
     5FAEB6ED-AE46-4A26-BA1B
     ea1866cb-c89a-6d5d-89b8-afdcdb715237
     """
-    if not INTEGER.search(value):
+    # all UUID-like names have dashes between their sections
+    if '-' not in value or not INTEGER.search(value):
         return False
 
     if UUID_LIKE_NAME.search(value) or LONG_UUID.search(value) or SHORT_UUID.search(value):
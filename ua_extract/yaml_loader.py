@@ -1,4 +1,4 @@
-from collections import defaultdict
+from collections import Counter, defaultdict
 from typing import Any, TypedDict
 import yaml
 import ahocorasick_rs
@@ -16,8 +16,16 @@ except ImportError:
     from yaml import SafeLoader  # type: ignore[assignment]
 
 import ua_extract
-from .lazy_regex import RegexLazyIgnore
-from .settings import BOUNDED_REGEX, DDCache, ROOT
+from .lazy_regex import RegexLazyIgnore, bounded_regex
+from .combined_regex import CombinedRegex
+from .fragment_scanner import FragmentTable
+from .normalize_index import NormalizeIndex
+from .regex_literals import LiteralIndex, ModelIndex
+from .regex_conflicts import regex_list_checksum
+from .regex_dfa import RegexDFA
+from .regex_profile import RegexProfile
+from .settings import DDCache, ROOT
+from .substitution_template import parse_templates
 from .enums import AppType
 
 
@@ -28,6 +36,13 @@ class RegexLoader:
     # Constant used as value for unknown browser / os
     UNKNOWN = 'UNK'
 
+    # Search the lowercased regexes case-sensitively in the lowercased
+    # UA, instead of searching the regexes case-insensitively, for
+    # every regex that can be lowercased. See RegexFolded for details.
+    CASE_FOLDED_REGEXES = False
+
+    __slots__ = ()
+
     @property
     def cache_name(self) -> str:
         """Class name, used for cache key"""
@@ -84,27 +99,128 @@ class RegexLoader:
 
             for regex in regexes:
                 if 'regex' in regex:
-                    regex['regex'] = RegexLazyIgnore(BOUNDED_REGEX.format(regex['regex']))
+                    regex['regex'] = bounded_regex(regex['regex'], self.CASE_FOLDED_REGEXES)
+                parse_templates(regex)
                 for model in regex.get('models', []):
-                    model['regex'] = RegexLazyIgnore(BOUNDED_REGEX.format(model['regex']))
+                    model['regex'] = bounded_regex(model['regex'], self.CASE_FOLDED_REGEXES)
+                    parse_templates(model)
                 for version in regex.get('versions', []):
-                    version['regex'] = RegexLazyIgnore(BOUNDED_REGEX.format(version['regex']))
+                    version['regex'] = bounded_regex(version['regex'], self.CASE_FOLDED_REGEXES)
+                    parse_templates(version)
 
             all_regexes.extend(regexes)
 
+        # Order of build_regex_orders that keeps the first matching regex
+        order = DDCache['regex_orders'].get(self.cache_name)
+        if order is not None and order['checksum'] == regex_list_checksum(all_regexes):
+            all_regexes = [all_regexes[position] for position in order['order']]
+
         DDCache['regexes'][self.cache_name] = all_regexes
 
         return all_regexes
 
-    def load_ahocorasick_patterns(self) -> ahocorasick_rs.AhoCorasick | None:
+    @property
+    def literal_index(self) -> LiteralIndex:
         """
-        Load AhoCorasick words from file, or expand from regexes.
+        Index of the literals each regex in regex_list requires,
+        to select the regexes that can possibly match a UA.
         """
         try:
-            return DDCache['corasick'][self.cache_name]
+            return DDCache['literal_index'][self.cache_name]
+        except KeyError:
+            pass
+
+        index = LiteralIndex([
+            ua_data['regex'].pattern if 'regex' in ua_data else None for ua_data in self.regex_list
+        ])
+        DDCache['literal_index'][self.cache_name] = index
+
+        return index
+
+    @property
+    def model_index(self) -> ModelIndex:
+        """
+        Index of the literals each model regex in regex_list requires,
+        to select the models that can possibly match a UA or model name.
+        """
+        try:
+            return DDCache['model_index'][self.cache_name]
+        except KeyError:
+            pass
+
+        index = ModelIndex(self.regex_list)
+        DDCache['model_index'][self.cache_name] = index
+
+        return index
+
+    @property
+    def fragment_table(self) -> FragmentTable:
+        """
+        Scanner of the fragment regexes of the entries of regex_list,
+        for fixture files listing 'regexes' of each entry.
+        """
+        try:
+            return DDCache['fragment_tables'][self.cache_name]
+        except KeyError:
+            pass
+
+        table = FragmentTable(self.regex_list)
+        DDCache['fragment_tables'][self.cache_name] = table
+
+        return table
+
+    @property
+    def combined_regex(self) -> CombinedRegex:
+        """
+        All regexes of regex_list joined into chunked alternations.
+        """
+        try:
+            return DDCache['combined_regexes'][self.cache_name]
+        except KeyError:
+            pass
+
+        combined = CombinedRegex([ua_data.get('regex') for ua_data in self.regex_list])
+        DDCache['combined_regexes'][self.cache_name] = combined
+
+        return combined
+
+    @property
+    def regex_dfa(self) -> RegexDFA:
+        """
+        DFA of the regular regexes of regex_list, built while matching.
+        """
+        try:
+            return DDCache['regex_dfas'][self.cache_name]
+        except KeyError:
+            pass
+
+        dfa = RegexDFA([ua_data.get('regex') for ua_data in self.regex_list])
+        DDCache['regex_dfas'][self.cache_name] = dfa
+
+        return dfa
+
+    @property
+    def regex_profile(self) -> RegexProfile:
+        """
+        Profile of the regexes of regex_list that matched UAs.
+        """
+        try:
+            return DDCache['regex_profiles'][self.cache_name]
         except KeyError:
             pass
 
+        profile = RegexProfile(
+            [ua_data.get('regex') for ua_data in self.regex_list],
+            DDCache['regex_hits'].setdefault(self.cache_name, Counter()),
+        )
+        DDCache['regex_profiles'][self.cache_name] = profile
+
+        return profile
+
+    def load_ahocorasick_words(self) -> frozenset[str]:
+        """
+        Load AhoCorasick words of all fixture files and of this class.
+        """
         all_corasick_words: set[str] = set()
         for fixture in self.fixture_files:
             ac_fixture = f'regexes/ahocorasick/{fixture}'
@@ -114,6 +230,18 @@ class RegexLoader:
             if words := set(self.load_from_yaml(ac_fixture)):
                 all_corasick_words.update(words)  # type: ignore[arg-type]
 
+        return frozenset(all_corasick_words)
+
+    def load_ahocorasick_patterns(self) -> ahocorasick_rs.AhoCorasick | None:
+        """
+        Load AhoCorasick words from file, or expand from regexes.
+        """
+        try:
+            return DDCache['corasick'][self.cache_name]
+        except KeyError:
+            pass
+
+        all_corasick_words = self.load_ahocorasick_words()
         ac = ahocorasick_rs.AhoCorasick(all_corasick_words) if all_corasick_words else None
         DDCache['corasick'][self.cache_name] = ac
 
@@ -225,3 +353,21 @@ def normalized_regex_list(fixture_files: list[str]) -> list[dict[str, Any]]:
     DDCache[cache_key] = regexes
 
     return regexes
+
+
+def normalized_literal_index(fixture_files: list[str]) -> NormalizeIndex:
+    """
+    Index of the literals, anchored affixes and first characters each
+    normalizing regex requires, to select the regexes that can possibly
+    change a UA.
+    """
+    cache_key = 'normalize'
+    try:
+        return DDCache['literal_index'][cache_key]
+    except KeyError:
+        pass
+
+    index = NormalizeIndex(normalized_regex_list(fixture_files))
+    DDCache['literal_index'][cache_key] = index
+
+    return index